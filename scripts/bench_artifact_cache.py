@@ -0,0 +1,75 @@
+"""Replica startup time from the registry (cold) versus the node-local artifact cache."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from services.common.config import get_settings
+from services.model_training.data_prep import load_training_frame
+from services.model_training.train import build_pipeline
+from services.serving.app.artifact_cache import ArtifactCache
+from services.serving.app.model_manager import ModelManager
+from services.serving.app.registry import FileModelRegistry, build_registry
+
+console = Console()
+
+
+def _startup_seconds(registry, cache: ArtifactCache, name: str, alias: str) -> float:
+    start = time.perf_counter()
+    ModelManager(registry, name, alias, poll_interval_s=0, cache=cache).load_initial()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--registry",
+        choices=("file", "mlflow"),
+        default="file",
+        help="'mlflow' times a real download from MODEL_NAME@MODEL_ALIAS",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    settings = get_settings()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = Path(workdir)
+        if args.registry == "file":
+            features, target = load_training_frame()
+            registry = FileModelRegistry(root / "registry")
+            registry.register(settings.model_name, "1", build_pipeline().fit(features, target))
+            registry.set_alias(settings.model_name, settings.model_alias, "1")
+        else:
+            registry = build_registry(
+                settings.model_copy(update={"model_registry_backend": "mlflow"})
+            )
+
+        cold, warm = [], []
+        for run in range(args.runs):
+            cache = ArtifactCache(root / f"cache-{run}")
+            cold.append(
+                _startup_seconds(registry, cache, settings.model_name, settings.model_alias)
+            )
+            warm.append(
+                _startup_seconds(registry, cache, settings.model_name, settings.model_alias)
+            )
+
+    table = Table(title=f"Replica startup ({args.registry} registry, {args.runs} runs)")
+    table.add_column("path")
+    table.add_column("best ms", justify="right")
+    table.add_column("mean ms", justify="right")
+    for label, samples in (("cold (registry download)", cold), ("cache hit", warm)):
+        table.add_row(
+            label, f"{min(samples) * 1000:.1f}", f"{sum(samples) / len(samples) * 1000:.1f}"
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
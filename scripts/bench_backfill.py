@@ -0,0 +1,77 @@
+"""Backfill throughput from an in-memory topic into a null online store and parquet."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from rich.console import Console
+from rich.table import Table
+
+from services.common import wire
+from services.common.data import SyntheticEventGenerator
+from services.common.memory_broker import InMemoryBroker
+from services.common.pubsub import LocalPubSub
+from services.feature_service.ingestion.backfill import BackfillConfig, run_backfill
+from services.feature_service.ingestion.offline import PartitionedEventSink
+from services.feature_service.ingestion.stream_job import StreamIngestor
+
+console = Console()
+TOPIC = "transactions"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class NullStore:
+    def write_to_online_store(self, feature_view_name, df):
+        pass
+
+
+def _broker(events: int, wire_format: str) -> InMemoryBroker:
+    broker = InMemoryBroker(partitions=6)
+    broker.create_topic(TOPIC)
+    encode = wire.serializer(wire_format)
+    for event in SyntheticEventGenerator(seed=5).stream(batch_size=events):
+        broker.produce(TOPIC, encode(event), key=event.user_id.encode())
+    return broker
+
+
+def _live(broker: InMemoryBroker, events: int, batch: int) -> float:
+    ingestor = StreamIngestor(broker.consumer("bench"), NullStore(), LocalPubSub(), batch, 1)
+    ingestor.subscribe(TOPIC)
+    start = time.perf_counter()
+    while ingestor.messages_total < events:
+        ingestor.run_once()
+    return events / (time.perf_counter() - start)
+
+
+def _backfill(broker: InMemoryBroker, batch: int, offline: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = PartitionedEventSink(tmp) if offline else None
+        config = BackfillConfig(TOPIC, EPOCH, max_records=batch, max_rate=0.0)
+        report = run_backfill(broker.consumer(None), NullStore(), sink, config)
+    return report.rows_per_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--wire-format", choices=wire.WIRE_FORMATS, default="binary")
+    args = parser.parse_args()
+
+    broker = _broker(args.events, args.wire_format)
+    table = Table(title=f"Backfill throughput ({args.events:,} {args.wire_format} events)")
+    for column in ("mode", "batch", "rows/s"):
+        table.add_column(column, justify="right")
+    table.add_row("live consumer", "500", f"{_live(broker, args.events, 500):,.0f}")
+    for batch in (500, 10_000):
+        table.add_row(
+            "backfill, online only", f"{batch:,}", f"{_backfill(broker, batch, False):,.0f}"
+        )
+        table.add_row("backfill + parquet", f"{batch:,}", f"{_backfill(broker, batch, True):,.0f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Peak RSS of the batch job, buffered vs streaming, from 10k up to 100M rows."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def _run(rows: int, streaming: bool, root: Path, extra: list[str]) -> tuple[float, float]:
+    """(seconds, peak RSS MiB) of one batch job run in its own process."""
+    command = [sys.executable, "-m", "services.feature_service.ingestion.batch_job"]
+    command += ["--rows", str(rows), *(["--streaming", *extra] if streaming else [])]
+    env = {**os.environ, "OFFLINE_EVENTS_PATH": str(root)}
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env)  # noqa: S603 - fixed module and arguments
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status):
+        raise subprocess.CalledProcessError(os.waitstatus_to_exitcode(status), command)
+    return elapsed, usage.ru_maxrss / 1024  # ru_maxrss is KiB on Linux
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+    )
+    parser.add_argument(
+        "--buffered-max",
+        type=int,
+        default=1_000_000,
+        help="Largest buffered run; it grows with rows",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--row-group-size", type=int, default=128_000)
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+    extra = ["--chunk-rows", str(args.chunk_rows), "--row-group-size", str(args.row_group_size)]
+    extra += ["--compression", args.compression]
+
+    table = Table(title=f"Batch job peak RSS (chunks of {args.chunk_rows:,} rows)")
+    for column in ("rows", "mode", "seconds", "rows/s", "peak RSS MiB", "on disk MiB"):
+        table.add_column(column, justify="right")
+    for rows in args.rows:
+        for streaming in (False, True):
+            if not streaming and rows > args.buffered_max:
+                continue
+            root = Path(tempfile.mkdtemp(prefix="bench-batch-"))
+            try:
+                elapsed, peak = _run(rows, streaming, root, extra)
+                size = sum(path.stat().st_size for path in root.rglob("*.parquet")) / 2**20
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+            mode = "streaming" if streaming else "buffered"
+            console.print(f"{rows:,} rows, {mode}: {peak:,.0f} MiB in {elapsed:.1f}s", style="dim")
+            table.add_row(
+                f"{rows:,}",
+                mode,
+                f"{elapsed:.1f}",
+                f"{rows / elapsed:,.0f}",
+                f"{peak:,.0f}",
+                f"{size:,.0f}",
+            )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
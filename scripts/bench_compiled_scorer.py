@@ -0,0 +1,69 @@
+"""Per-row latency of the sklearn pipeline versus the compiled NumPy scorer."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from services.model_training.data_prep import load_training_frame
+from services.model_training.train import build_pipeline
+from services.serving.app.model_loader import compile_pipeline
+
+console = Console()
+
+
+def _per_row_us(fn: Callable[[], Any], rows_per_call: int, repeats: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / (repeats * rows_per_call) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default="data/sample/events.csv")
+    parser.add_argument("--repeats", type=int, default=2_000)
+    args = parser.parse_args()
+
+    features, target = load_training_frame(args.data)
+    pipeline = build_pipeline().fit(features, target)
+    rows: list[dict[str, Any]] = features.to_dict("records")
+    compiled_scorer = compile_pipeline(pipeline)
+
+    max_diff = float(
+        np.max(np.abs(compiled_scorer.score_rows(rows) - pipeline.predict_proba(features)[:, 1]))
+    )
+
+    table = Table(title="Scoring latency (µs per row)")
+    table.add_column("batch size", justify="right")
+    table.add_column("sklearn predict_proba", justify="right")
+    table.add_column("compiled scorer", justify="right")
+    table.add_column("speedup", justify="right")
+    for batch_size in (1, 8, 32, 128):
+        batch = rows[:batch_size]
+        repeats = max(args.repeats // batch_size, 20)
+        sklearn_us = _per_row_us(
+            lambda batch=batch: pipeline.predict_proba(pd.DataFrame(batch)), batch_size, repeats
+        )
+        compiled_us = _per_row_us(
+            lambda batch=batch: compiled_scorer.score_rows(batch), batch_size, repeats
+        )
+        table.add_row(
+            str(batch_size),
+            f"{sklearn_us:,.1f}",
+            f"{compiled_us:,.2f}",
+            f"{sklearn_us / compiled_us:,.0f}x",
+        )
+    console.print(table)
+    console.print(f"max |compiled - predict_proba| = {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
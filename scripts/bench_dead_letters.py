@@ -0,0 +1,67 @@
+"""Stream ingestion throughput on clean batches versus batches with invalid records."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from services.common import wire
+from services.common.data import SyntheticEventGenerator
+from services.common.memory_broker import InMemoryBroker
+from services.common.pubsub import LocalPubSub
+from services.feature_service.ingestion.dead_letters import FileDeadLetterSink
+from services.feature_service.ingestion.stream_job import StreamIngestor
+
+console = Console()
+TOPIC = "transactions"
+
+
+class NullStore:
+    def write_to_online_store(self, feature_view_name, df):
+        pass
+
+
+def _run(events: int, batch: int, bad_ratio: float, dead_letter_dir: Path) -> float:
+    broker = InMemoryBroker(partitions=1)
+    broker.create_topic(TOPIC)
+    bad_every = int(1 / bad_ratio) if bad_ratio else 0
+    for idx, event in enumerate(SyntheticEventGenerator(seed=11).stream(batch_size=events)):
+        payload = wire.encode_json(event)
+        if bad_every and idx % bad_every == 0:
+            payload = payload.replace(b'"country": "', b'"country": "X')
+        broker.produce(TOPIC, payload, key=event.user_id.encode())
+    sink = FileDeadLetterSink(dead_letter_dir / f"dlq-{bad_ratio}.jsonl")
+    ingestor = StreamIngestor(
+        broker.consumer("bench"), NullStore(), LocalPubSub(), batch, 1, dead_letters=sink
+    )
+    ingestor.subscribe(TOPIC)
+    start = time.perf_counter()
+    while ingestor.messages_total < events:
+        ingestor.run_once()
+    return events / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    table = Table(title=f"Ingestion throughput ({args.events:,} events, batch {args.batch})")
+    for column in ("invalid", "events/s", "vs clean"):
+        table.add_column(column, justify="right")
+    with tempfile.TemporaryDirectory() as tmp:
+        clean = _run(args.events, args.batch, 0.0, Path(tmp))
+        for ratio in (0.0, 0.01, 0.05):
+            rate = clean if ratio == 0.0 else _run(args.events, args.batch, ratio, Path(tmp))
+            table.add_row(f"{ratio:.0%}", f"{rate:,.0f}", f"{rate / clean:.1%}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
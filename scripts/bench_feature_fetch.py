@@ -0,0 +1,71 @@
+"""Compare blocking vs batched async online feature fetches against a fake store."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from services.common.data import SyntheticEventGenerator
+from services.serving.app.feature_client import FeatureService, InMemoryOnlineStore
+
+console = Console()
+
+
+async def _run(svc: FeatureService, events, concurrency: int, use_async: bool) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(event) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            if use_async:
+                await svc.fetch_async(event)
+            else:
+                svc.fetch(event)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(event) for event in events))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--store-latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    generator = SyntheticEventGenerator(seed=3)
+    events = [
+        generator.sample(user_id=f"user-{idx % args.users:03d}") for idx in range(args.requests)
+    ]
+    rows = {event.user_id: {"transaction_amount": 1.0, "label": 0} for event in events}
+
+    table = Table(title=f"{args.requests} lookups, concurrency {args.concurrency}")
+    for column in ("mode", "store calls", "req/s", "p50 ms", "p99 ms"):
+        table.add_column(column, justify="right")
+    for mode, use_async in (("blocking fetch", False), ("batched fetch_async", True)):
+        store = InMemoryOnlineStore(rows, latency_ms=args.store_latency_ms)
+        svc = FeatureService(store=store)
+        start = time.perf_counter()
+        latencies = asyncio.run(_run(svc, events, args.concurrency, use_async))
+        elapsed = time.perf_counter() - start
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        table.add_row(
+            mode,
+            str(store.calls),
+            f"{args.requests / elapsed:,.0f}",
+            f"{p50:.2f}",
+            f"{p99:.2f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
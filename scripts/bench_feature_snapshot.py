@@ -0,0 +1,132 @@
+"""Feature lookup latency from the memory-mapped snapshot vs the in-process store stand-in."""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+from rich.console import Console
+from rich.table import Table
+
+from services.feature_service.feast_repo.snapshot import write_snapshot
+from services.serving.app.feature_client import FEATURE_REFS, InMemoryOnlineStore
+from services.serving.app.feature_snapshot import FeatureSnapshot
+
+console = Console()
+
+
+def _users(count: int) -> list[str]:
+    return [f"user-{idx:08d}" for idx in range(count)]
+
+
+def _per_call_ns(func, args: list, repeat: int = 1) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for arg in args:
+            func(arg)
+    return (time.perf_counter_ns() - start) / (len(args) * repeat)
+
+
+def _mapping_kib(path: Path) -> tuple[int, int]:
+    """(Rss, Pss) in KiB of this process's mappings of ``path``."""
+    rss = pss = 0
+    inside = False
+    for line in Path("/proc/self/smaps").read_text().splitlines():
+        if "-" in line.split(" ", 1)[0]:
+            inside = line.endswith(str(path))
+        elif inside and line.startswith("Rss:"):
+            rss += int(line.split()[1])
+        elif inside and line.startswith("Pss:"):
+            pss += int(line.split()[1])
+    return rss, pss
+
+
+def _worker(path: str, barrier, results) -> None:
+    snapshot = FeatureSnapshot(path)
+    mapped = snapshot._mapped
+    mapped.keys.tobytes()  # fault every page in
+    for column in mapped.columns.values():
+        column.values.tobytes()
+    barrier.wait()  # every worker holds its mapping while measuring
+    results.put(_mapping_kib(Path(path)))
+    barrier.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    users = _users(args.users)
+    rng = np.random.default_rng(1)
+    table = pa.table(
+        {
+            "user_id": users,
+            "transaction_amount": rng.gamma(2.0, 40.0, args.users),
+            "label": rng.integers(0, 2, args.users),
+        }
+    )
+    probes = [users[idx] for idx in rng.integers(0, args.users, args.lookups)]
+    misses = [f"ghost-{idx:08d}" for idx in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "transaction_features.arrow"
+        start = time.perf_counter()
+        write_snapshot(table, path)
+        write_s = time.perf_counter() - start
+        start = time.perf_counter()
+        snapshot = FeatureSnapshot(path)
+        map_ms = (time.perf_counter() - start) * 1000
+        mapped = snapshot._mapped
+        keys = [user_id.encode() for user_id in probes]
+
+        store = InMemoryOnlineStore(
+            {user_id: {"transaction_amount": 1.0, "label": 0} for user_id in users[::10]}
+        )
+        timings = Table(title=f"Snapshot of {args.users:,} users ({path.stat().st_size >> 20} MiB)")
+        for column in ("operation", "ns/lookup"):
+            timings.add_column(column, justify="right")
+        timings.add_row(
+            "binary search only", f"{_per_call_ns(mapped.keys.searchsorted, keys):,.0f}"
+        )
+        timings.add_row("snapshot.get, hit", f"{_per_call_ns(snapshot.get, probes):,.0f}")
+        timings.add_row("snapshot.get, miss", f"{_per_call_ns(snapshot.get, misses):,.0f}")
+        batches = [probes[idx : idx + 64] for idx in range(0, len(probes), 64)]
+        per_batch = _per_call_ns(snapshot.get_many, batches)
+        timings.add_row("snapshot.get_many(64), per user", f"{per_batch / 64:,.0f}")
+        lookup = lambda user_id: store.get_online_features(  # noqa: E731
+            FEATURE_REFS, [{"user_id": user_id}]
+        )
+        timings.add_row("in-process online store stand-in", f"{_per_call_ns(lookup, probes):,.0f}")
+        console.print(timings)
+        console.print(f"write {write_s:.2f}s, map {map_ms:.2f}ms")
+
+        context = multiprocessing.get_context("spawn")
+        barrier, results = context.Barrier(args.workers), context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(str(path), barrier, results))
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        shared = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        memory = Table(title=f"Snapshot pages across {args.workers} serving workers")
+        for column in ("worker", "Rss KiB", "Pss KiB"):
+            memory.add_column(column, justify="right")
+        for idx, (rss, pss) in enumerate(shared):
+            memory.add_row(str(idx), f"{rss:,}", f"{pss:,}")
+        memory.add_row("total", f"{sum(r for r, _ in shared):,}", f"{sum(p for _, p in shared):,}")
+        console.print(memory)
+
+
+if __name__ == "__main__":
+    main()
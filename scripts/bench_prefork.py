@@ -0,0 +1,126 @@
+"""/predict throughput of the pre-forked server as SERVING_WORKERS grows."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from services.common.config import get_settings
+from services.common.data import SyntheticEventGenerator
+from services.model_training.data_prep import load_training_frame
+from services.model_training.train import build_pipeline
+from services.serving.app.main import PORT
+from services.serving.app.registry import FileModelRegistry
+
+console = Console()
+URL = f"http://127.0.0.1:{PORT}"
+
+
+def _payloads(count: int) -> list[bytes]:
+    generator = SyntheticEventGenerator(seed=7)
+    payloads = []
+    for idx in range(count):
+        event = generator.sample(user_id=f"user-{idx % 500}")
+        body = {"user_id": event.user_id, "event": event.model_dump(mode="json")}
+        payloads.append(httpx.Request("POST", URL, json=body).read())
+    return payloads
+
+
+def _start(workers: int, registry: Path) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SERVING_WORKERS": str(workers),
+        "ENABLE_RAY_SERVE": "0",
+        "MODEL_REGISTRY_BACKEND": "file",
+        "MODEL_REGISTRY_PATH": str(registry),
+        "FEATURE_STORE_BACKEND": "memory",
+        "ARTIFACT_CACHE_ENABLED": "0",
+        "SHADOW_ENABLED": "0",
+    }
+    server = subprocess.Popen(  # noqa: S603 - fixed argv
+        [sys.executable, "-m", "services.serving.app.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{URL}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"server with {workers} workers did not come up")
+
+
+async def _load(payloads: list[bytes], concurrency: int, seconds: float) -> tuple[int, int]:
+    done = errors = 0
+    stop_at = time.monotonic() + seconds
+    headers = {"content-type": "application/json"}
+
+    async def client(offset: int) -> None:
+        nonlocal done, errors
+        async with httpx.AsyncClient(base_url=URL, timeout=10) as http:
+            idx = offset
+            while time.monotonic() < stop_at:
+                response = await http.post("/predict", content=payloads[idx], headers=headers)
+                done += 1
+                errors += response.status_code != 200
+                idx = (idx + concurrency) % len(payloads)
+
+    await asyncio.gather(*(client(idx) for idx in range(concurrency)))
+    return done, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    args = parser.parse_args()
+    settings = get_settings()
+    payloads = _payloads(2_000)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        features, target = load_training_frame()
+        registry = FileModelRegistry(Path(workdir) / "registry")
+        registry.register(settings.model_name, "1", build_pipeline().fit(features, target))
+        registry.set_alias(settings.model_name, settings.model_alias, "1")
+        for workers in args.workers:
+            server = _start(workers, registry.root)
+            try:
+                asyncio.run(_load(payloads, args.concurrency, 2.0))  # warm up
+                done, errors = asyncio.run(_load(payloads, args.concurrency, args.seconds))
+            finally:
+                server.terminate()
+                server.wait(30)
+            rows.append((workers, done / args.seconds, errors))
+
+    baseline = rows[0][1]
+    table = Table(
+        title=f"POST /predict, {args.concurrency} clients, {os.cpu_count()} CPUs, "
+        f"{args.seconds:.0f}s per run"
+    )
+    table.add_column("SERVING_WORKERS", justify="right")
+    table.add_column("req/s", justify="right")
+    table.add_column("vs 1st", justify="right")
+    table.add_column("errors", justify="right")
+    for workers, rate, errors in rows:
+        table.add_row(str(workers), f"{rate:.0f}", f"{rate / baseline:.2f}x", str(errors))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
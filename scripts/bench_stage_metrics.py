@@ -0,0 +1,52 @@
+"""Per-request CPU cost of the predict-path stage histograms."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+from rich.console import Console
+from rich.table import Table
+
+from services.serving.app.stages import STAGES, StageTimer
+
+console = Console()
+
+
+def _cpu_us(fn: Callable[[], Any], iterations: int) -> float:
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def _instrumented_request() -> None:
+    timer = StageTimer()
+    for stage in STAGES:
+        timer.mark(stage)
+    timer.flush("baseline")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    table = Table(
+        title=f"Stage timing overhead ({len(STAGES)} stages, {args.iterations:,} requests)"
+    )
+    table.add_column("case")
+    table.add_column("CPU µs / request", justify="right")
+    threshold = StageTimer.exemplar_threshold_s
+    # A zero threshold makes every observation look up the current span for an exemplar.
+    for name, case_threshold in (("all stages fast", threshold), ("all stages slow", 0.0)):
+        StageTimer.exemplar_threshold_s = case_threshold
+        table.add_row(name, f"{_cpu_us(_instrumented_request, args.iterations):.2f}")
+    StageTimer.exemplar_threshold_s = threshold
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Per-request CPU of pydantic validation + JSON encoding versus the fast path."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from rich.console import Console
+from rich.table import Table
+
+from services.common.fastpath import dumps_response, loads, validate_request_fast
+from services.common.schemas import InferenceRequest, InferenceResponse
+
+console = Console()
+
+BODY = json.dumps(
+    {
+        "user_id": "user-123",
+        "event": {
+            "event_id": "01HQA7F9G4G1YJ2R4D8K2J3A5S",
+            "user_id": "user-123",
+            "transaction_amount": 120.4,
+            "country": "US",
+            "device": "ios",
+            "event_ts": "2024-02-25T12:03:11Z",
+            "label": 0,
+        },
+    }
+).encode("utf-8")
+
+RESPONSE = InferenceResponse(
+    user_id="user-123",
+    model_version="3",
+    score=0.0421,
+    decision="approve",
+    canary_variant="baseline",
+)
+
+
+def _cpu_us(fn: Callable[[], Any], iterations: int) -> float:
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    cases = {
+        "parse + validate": (
+            lambda: InferenceRequest.model_validate(json.loads(BODY)),
+            lambda: validate_request_fast(loads(BODY)),
+        ),
+        "serialize response": (
+            lambda: RESPONSE.model_dump_json().encode("utf-8"),
+            lambda: dumps_response(RESPONSE),
+        ),
+    }
+    table = Table(title=f"CPU µs per request ({args.iterations:,} iterations)")
+    for column in ("stage", "pydantic", "fast path", "saved"):
+        table.add_column(column, justify="right")
+    for stage, (default, fast) in cases.items():
+        default_us = _cpu_us(default, args.iterations)
+        fast_us = _cpu_us(fast, args.iterations)
+        table.add_row(stage, f"{default_us:.2f}", f"{fast_us:.2f}", f"{default_us - fast_us:.2f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Bytes per event and encode/decode CPU of the JSON and binary wire formats."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+from rich.console import Console
+from rich.table import Table
+
+from services.common import wire
+from services.common.data import SyntheticEventGenerator
+from services.common.schemas import Event
+
+console = Console()
+
+
+def _cpu_us(fn: Callable[[Any], Any], items: list[Any]) -> float:
+    fn(items[0])
+    start = time.process_time()
+    for item in items:
+        fn(item)
+    return (time.process_time() - start) / len(items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    events = list(SyntheticEventGenerator(seed=7).stream(batch_size=args.events))
+    table = Table(title=f"Per-event wire cost ({args.events:,} events)")
+    for column in ("format", "bytes", "encode µs", "decode µs", "decode + validate µs"):
+        table.add_column(column, justify="right")
+    for wire_format in wire.WIRE_FORMATS:
+        encode = wire.serializer(wire_format)
+        headers = wire.headers_for(wire_format)
+        payloads = [encode(event) for event in events]
+        table.add_row(
+            wire_format,
+            f"{sum(map(len, payloads)) / len(payloads):.1f}",
+            f"{_cpu_us(encode, events):.2f}",
+            f"{_cpu_us(lambda payload, headers=headers: wire.decode(payload, headers), payloads):.2f}",
+            f"{_cpu_us(lambda payload, headers=headers: Event(**wire.decode(payload, headers)), payloads):.2f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 
 import boto3
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from rich.console import Console
 
 from services.common.config import get_settings
-from services.common.data import SyntheticEventGenerator
+from services.common.data import ColumnarEventGenerator
 
 console = Console()
 
@@ -27,21 +30,37 @@ def upload_to_minio(path: Path) -> None:
 
 
 def main() -> None:
-    generator = SyntheticEventGenerator()
+    parser = argparse.ArgumentParser(description="Generate the synthetic transactions dataset")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drift", type=float, default=None)
+    args = parser.parse_args()
+
+    generator = ColumnarEventGenerator(seed=args.seed, drift=args.drift)
     output_dir = Path("data/sample")
     output_dir.mkdir(parents=True, exist_ok=True)
-
-    events = [event.model_dump() for event in generator.stream(batch_size=500)]
-    df = pd.DataFrame(events)
-    df["created_at"] = pd.Timestamp.now(tz="UTC")
-
     csv_path = output_dir / "events.csv"
     parquet_path = output_dir / "events.parquet"
 
-    df.to_csv(csv_path, index=False)
-    df.to_parquet(parquet_path, index=False)
+    # One chunk in memory at a time: each is appended to the CSV and written as a row group.
+    created_at = pd.Timestamp.now(tz="UTC")
+    writer: pq.ParquetWriter | None = None
+    try:
+        for index, frame in enumerate(generator.frames(args.rows, args.chunk_size)):
+            frame["created_at"] = created_at
+            frame.to_csv(csv_path, index=False, mode="w" if index == 0 else "a", header=index == 0)
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
 
-    console.print(f"[bold]Wrote synthetic dataset to[/bold] {csv_path} and {parquet_path}")
+    console.print(
+        f"[bold]Wrote {args.rows:,} synthetic events to[/bold] {csv_path} and {parquet_path}"
+    )
     try:
         upload_to_minio(csv_path)
     except Exception as exc:
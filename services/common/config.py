@@ -8,6 +8,54 @@ class Settings(BaseSettings):
     env: str = Field(default="local", alias="ENV")
     kafka_brokers: str = Field(default="localhost:9092", alias="REDPANDA_BROKERS")
     event_topic: str = Field(default="transactions", alias="EVENT_TOPIC")
+    event_wire_format: str = Field(default="json", alias="EVENT_WIRE_FORMAT")
+    producer_rate: float = Field(default=5.0, alias="PRODUCER_RATE")
+    producer_processes: int = Field(default=1, alias="PRODUCER_PROCESSES")
+    producer_linger_ms: int = Field(default=5, alias="PRODUCER_LINGER_MS")
+    producer_batch_size: int = Field(default=65_536, alias="PRODUCER_BATCH_SIZE")
+    producer_compression: str = Field(default="none", alias="PRODUCER_COMPRESSION")
+    producer_acks: int | str = Field(default=1, alias="PRODUCER_ACKS")
+    stream_consumer_group: str = Field(default="feature-ingestion", alias="STREAM_CONSUMER_GROUP")
+    stream_batch_max_records: int = Field(default=500, alias="STREAM_BATCH_MAX_RECORDS")
+    stream_batch_max_wait_ms: float = Field(default=250.0, alias="STREAM_BATCH_MAX_WAIT_MS")
+    stream_workers: int = Field(default=1, alias="STREAM_WORKERS")
+    stream_report_interval_s: float = Field(default=10.0, alias="STREAM_REPORT_INTERVAL_S")
+    stream_metrics_port: int = Field(default=9108, alias="STREAM_METRICS_PORT")
+    stream_dead_letter_sink: str = Field(default="file", alias="STREAM_DEAD_LETTER_SINK")
+    stream_dead_letter_path: str = Field(
+        default="data/dead_letters/transactions.jsonl", alias="STREAM_DEAD_LETTER_PATH"
+    )
+    stream_dead_letter_topic: str = Field(
+        default="transactions.dead-letter", alias="STREAM_DEAD_LETTER_TOPIC"
+    )
+    stream_dedup_enabled: bool = Field(default=True, alias="STREAM_DEDUP_ENABLED")
+    stream_dedup_window_s: float = Field(default=3600.0, alias="STREAM_DEDUP_WINDOW_S")
+    stream_dedup_partitions: int = Field(default=6, alias="STREAM_DEDUP_PARTITIONS")
+    stream_dedup_fp_rate: float = Field(default=0.001, alias="STREAM_DEDUP_FP_RATE")
+    stream_dedup_memory_mb: int = Field(default=64, alias="STREAM_DEDUP_MEMORY_MB")
+    backfill_max_records: int = Field(default=10_000, alias="BACKFILL_MAX_RECORDS")
+    backfill_fetch_max_bytes: int = Field(default=52_428_800, alias="BACKFILL_FETCH_MAX_BYTES")
+    backfill_max_rate: float = Field(default=5_000.0, alias="BACKFILL_MAX_RATE")
+    offline_events_path: str = Field(default="data/offline/events", alias="OFFLINE_EVENTS_PATH")
+    offline_row_group_size: int = Field(default=128_000, alias="OFFLINE_ROW_GROUP_SIZE")
+    offline_compression: str = Field(default="zstd", alias="OFFLINE_COMPRESSION")
+    offline_compact_target_rows: int = Field(default=1_000_000, alias="OFFLINE_COMPACT_TARGET_ROWS")
+    stream_offline_sink_enabled: bool = Field(default=False, alias="STREAM_OFFLINE_SINK_ENABLED")
+    batch_chunk_rows: int = Field(default=100_000, alias="BATCH_CHUNK_ROWS")
+    materialize_watermark_path: str = Field(
+        default="data/materialization/watermarks.json", alias="MATERIALIZE_WATERMARK_PATH"
+    )
+    materialize_initial_lookback_h: float = Field(
+        default=24.0, alias="MATERIALIZE_INITIAL_LOOKBACK_H"
+    )
+    materialize_lateness_s: float = Field(default=300.0, alias="MATERIALIZE_LATENESS_S")
+    materialize_chunk_h: float = Field(default=6.0, alias="MATERIALIZE_CHUNK_H")
+    materialize_workers: int = Field(default=4, alias="MATERIALIZE_WORKERS")
+    training_labels_path: str = Field(default="", alias="TRAINING_LABELS_PATH")
+    training_set_chunk_rows: int = Field(default=1_000_000, alias="TRAINING_SET_CHUNK_ROWS")
+    training_set_workers: int = Field(default=4, alias="TRAINING_SET_WORKERS")
+    stream_aggregates_enabled: bool = Field(default=True, alias="STREAM_AGGREGATES_ENABLED")
+    stream_aggregate_max_users: int = Field(default=2_000_000, alias="STREAM_AGGREGATE_MAX_USERS")
     feast_repo_path: str = Field(
         default="services/feature_service/feast_repo", alias="FEAST_REPO_PATH"
     )
@@ -26,6 +74,39 @@ class Settings(BaseSettings):
     postgres_password: str = Field(default="mlflow", alias="POSTGRES_PASSWORD")
     canary_split: float = Field(default=0.2, alias="CANARY_SPLIT")
     shadow_enabled: bool = Field(default=True, alias="SHADOW_ENABLED")
+    shadow_queue_size: int = Field(default=1_000, alias="SHADOW_QUEUE_SIZE")
+    shadow_batch_size: int = Field(default=64, alias="SHADOW_BATCH_SIZE")
+    shadow_workers: int = Field(default=1, alias="SHADOW_WORKERS")
+    shadow_drop_policy: str = Field(default="drop_oldest", alias="SHADOW_DROP_POLICY")
+    fast_validation: bool = Field(default=False, alias="FAST_VALIDATION")
+    serving_workers: int = Field(default=1, alias="SERVING_WORKERS")
+    serving_batch_max_size: int = Field(default=32, alias="SERVING_BATCH_MAX_SIZE")
+    serving_batch_max_wait_ms: float = Field(default=2.0, alias="SERVING_BATCH_MAX_WAIT_MS")
+    stage_exemplar_threshold_ms: float = Field(default=5.0, alias="STAGE_EXEMPLAR_THRESHOLD_MS")
+    model_name: str = Field(default="fraud-detector", alias="MODEL_NAME")
+    model_alias: str = Field(default="Staging", alias="MODEL_ALIAS")
+    model_registry_backend: str = Field(default="mlflow", alias="MODEL_REGISTRY_BACKEND")
+    model_registry_path: str = Field(default="data/registry/models", alias="MODEL_REGISTRY_PATH")
+    model_poll_interval_s: float = Field(default=30.0, alias="MODEL_POLL_INTERVAL_S")
+    model_warmup_requests: int = Field(default=64, alias="MODEL_WARMUP_REQUESTS")
+    artifact_cache_enabled: bool = Field(default=True, alias="ARTIFACT_CACHE_ENABLED")
+    artifact_cache_dir: str = Field(default="data/model_cache", alias="ARTIFACT_CACHE_DIR")
+    artifact_cache_max_bytes: int = Field(default=2 * 1024**3, alias="ARTIFACT_CACHE_MAX_BYTES")
+    compiled_scorer_enabled: bool = Field(default=True, alias="COMPILED_SCORER_ENABLED")
+    feature_store_backend: str = Field(default="feast", alias="FEATURE_STORE_BACKEND")
+    feature_batch_max_size: int = Field(default=64, alias="FEATURE_BATCH_MAX_SIZE")
+    feature_batch_max_wait_ms: float = Field(default=1.0, alias="FEATURE_BATCH_MAX_WAIT_MS")
+    feature_cache_enabled: bool = Field(default=True, alias="FEATURE_CACHE_ENABLED")
+    feature_cache_max_entries: int = Field(default=100_000, alias="FEATURE_CACHE_MAX_ENTRIES")
+    feature_cache_ttl_s: float = Field(default=30.0, alias="FEATURE_CACHE_TTL_S")
+    feature_snapshot_enabled: bool = Field(default=False, alias="FEATURE_SNAPSHOT_ENABLED")
+    feature_snapshot_path: str = Field(
+        default="data/snapshots/transaction_features.arrow", alias="FEATURE_SNAPSHOT_PATH"
+    )
+    feature_snapshot_check_interval_s: float = Field(
+        default=5.0, alias="FEATURE_SNAPSHOT_CHECK_INTERVAL_S"
+    )
+    feature_update_bus: str = Field(default="local", alias="FEATURE_UPDATE_BUS")
     prometheus_endpoint: str = Field(default="http://localhost:9090", alias="PROMETHEUS_ENDPOINT")
     otlp_endpoint: str = Field(default="http://localhost:4317", alias="OTLP_ENDPOINT")
 
@@ -33,6 +114,8 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
+        # The MODEL_* serving fields are ours, not pydantic's ``model_`` methods.
+        protected_namespaces=("settings_",),
     )
 
 
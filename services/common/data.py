@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import datetime as dt
 import random
-from typing import Iterable, Iterator
+from typing import TYPE_CHECKING, Iterable, Iterator
 from uuid import uuid4
 
+import numpy as np
+import pandas as pd
+
 from .schemas import Event
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 class SyntheticEventGenerator:
     """Deterministic-ish generator for incoming transaction events."""
@@ -43,5 +49,104 @@ class SyntheticEventGenerator:
         return min(base, 0.5)
 
 
+_HEX = np.array([f"{byte:02x}".encode("ascii") for byte in range(256)], dtype="S2")
+
+
+class ColumnarEventGenerator:
+    """Vectorised counterpart of :class:`SyntheticEventGenerator` for bulk datasets.
+
+    Rows follow the same amount, drift, user, country/device and fraud-label
+    distributions, but each chunk is drawn with NumPy from its own child of
+    ``SeedSequence(seed)``, so output is reproducible for a given seed and chunk
+    size and memory stays bounded by one chunk. ``event_ts`` is spaced at
+    ``events_per_second`` and ends at ``end`` (default: when the generator was
+    created), keeping every row in the past as :class:`Event` requires.
+    """
+
+    COUNTRIES = SyntheticEventGenerator.COUNTRIES
+    DEVICES = SyntheticEventGenerator.DEVICES
+
+    def __init__(
+        self,
+        seed: int = 42,
+        drift: float | None = None,
+        users: int = 500,
+        events_per_second: float = 1_000.0,
+        end: dt.datetime | None = None,
+    ) -> None:
+        self.seed = seed
+        self.drift = drift or 0.0
+        self.events_per_second = events_per_second
+        self.end = pd.Timestamp(end or dt.datetime.now(dt.timezone.utc))
+        self._users = np.array([f"user-{idx:03d}" for idx in range(1, users + 1)], dtype=object)
+        self._countries = np.array(self.COUNTRIES, dtype=object)
+        self._devices = np.array(self.DEVICES, dtype=object)
+
+    def frame(self, rows: int) -> pd.DataFrame:
+        return next(self.frames(rows, chunk_size=max(rows, 1)))
+
+    def frames(self, total_rows: int, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Yield ``total_rows`` rows as DataFrames of at most ``chunk_size`` rows."""
+        for columns in self._chunks(total_rows, chunk_size):
+            event_ids = columns["event_id"].astype(str).astype(object)
+            yield pd.DataFrame(
+                {
+                    **columns,
+                    "event_id": event_ids,
+                    "user_id": self._users[columns["user_id"]],
+                    "country": self._countries[columns["country"]],
+                    "device": self._devices[columns["device"]],
+                    "event_ts": pd.to_datetime(columns["event_ts"], utc=True),
+                }
+            )
+
+    def tables(self, total_rows: int, chunk_size: int = 100_000) -> Iterator[pa.Table]:
+        """Like :meth:`frames` but built straight from the NumPy buffers, skipping pandas."""
+        import pyarrow as pa
+
+        vocabularies = {
+            "user_id": pa.array(self._users, pa.string()),
+            "country": pa.array(self._countries, pa.string()),
+            "device": pa.array(self._devices, pa.string()),
+        }
+        for columns in self._chunks(total_rows, chunk_size):
+            arrays = {
+                name: (
+                    vocabularies[name].take(pa.array(values))
+                    if name in vocabularies
+                    else pa.array(values)
+                )
+                for name, values in columns.items()
+            }
+            arrays["event_id"] = arrays["event_id"].cast(pa.string())
+            arrays["event_ts"] = pa.array(columns["event_ts"], pa.timestamp("ns", tz="UTC"))
+            yield pa.table(arrays)
+
+    def _chunks(self, total_rows: int, chunk_size: int) -> Iterator[dict[str, np.ndarray]]:
+        chunks = -(-total_rows // chunk_size)
+        for index, chunk_seed in enumerate(np.random.SeedSequence(self.seed).spawn(chunks)):
+            start = index * chunk_size
+            rows = min(chunk_size, total_rows - start)
+            rng = np.random.default_rng(chunk_seed)
+            amount = np.abs(rng.normal(80, 40, rows))
+            if self.drift:
+                amount *= 1 + self.drift
+            fraud_probability = np.minimum(np.where(amount > 300, 0.10, 0.02), 0.5)
+            event_ids = _HEX[rng.integers(0, 256, (rows, 13), dtype=np.uint8)]
+            before_end = (total_rows - 1 - np.arange(start, start + rows)) / self.events_per_second
+            event_ts = self.end.value - np.round(before_end * 1e9).astype(np.int64)
+            # Columns keep the order of ``Event``; categorical ones are vocabulary indices and
+            # event_ts is epoch nanoseconds.
+            yield {
+                "event_id": event_ids.view("S26").ravel(),
+                "user_id": rng.integers(0, len(self._users), rows),
+                "transaction_amount": np.round(amount, 2),
+                "country": rng.integers(0, len(self._countries), rows),
+                "device": rng.integers(0, len(self._devices), rows),
+                "event_ts": event_ts,
+                "label": (rng.random(rows) < fraud_probability).astype(np.int64),
+            }
+
+
 def events_to_dicts(events: Iterable[Event]) -> list[dict[str, object]]:
     return [event.model_dump(mode="json") for event in events]
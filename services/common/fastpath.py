@@ -0,0 +1,137 @@
+"""High-throughput validation and serialization for the inference hot path.
+
+The fast path accepts a payload only when every field is already in its
+canonical type and passes the same checks as :class:`Event`; anything else is
+handed to full pydantic validation, so accepted and rejected inputs (and the
+errors raised) are identical to the schema's.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from datetime import datetime
+from typing import Any, Mapping
+
+from .schemas import COUNTRIES, DEVICES, Event, InferenceRequest, InferenceResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None  # type: ignore[assignment]
+
+_ISO_UTC = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}:\d{2})$")
+_EVENT_FIELDS = frozenset(Event.model_fields)
+
+
+class _NowCache:
+    """One ``datetime.utcnow().astimezone()`` per tick instead of per event."""
+
+    def __init__(self, tick_seconds: float = 0.001) -> None:
+        self.tick_seconds = tick_seconds
+        self._expires = 0.0
+        self._now: datetime | None = None
+
+    def now(self) -> datetime:
+        mono = time.monotonic()
+        if self._now is None or mono >= self._expires:
+            self._now = datetime.utcnow().astimezone()
+            self._expires = mono + self.tick_seconds
+        return self._now
+
+
+_now_cache = _NowCache()
+
+
+def _construct(model_cls: type[Any], values: dict[str, Any], fields_set: set[str]) -> Any:
+    # Same end state as ``model_construct`` without its per-field default handling.
+    instance = object.__new__(model_cls)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _parse_ts(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value if value.tzinfo is not None else None
+    if type(value) is str and _ISO_UTC.match(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _fast_event(payload: Any) -> Event | None:
+    if type(payload) is not dict:
+        return None
+    event_id = payload.get("event_id")
+    user_id = payload.get("user_id")
+    amount: Any = payload.get("transaction_amount")  # checked by exact type below
+    country = payload.get("country")
+    device = payload.get("device")
+    label = payload.get("label")
+    if type(event_id) is not str or len(event_id) < 10 or type(user_id) is not str:
+        return None
+    if type(amount) not in (float, int) or not 0.0 <= amount <= 5000.0:
+        return None
+    if type(country) is not str or country not in COUNTRIES:
+        return None
+    if type(device) is not str or device not in DEVICES:
+        return None
+    if label is not None and (type(label) is not int or label not in (0, 1)):
+        return None
+    event_ts = _parse_ts(payload.get("event_ts"))
+    # A cached "now" lags the real clock, so anything after it gets the exact check.
+    if event_ts is None or event_ts > _now_cache.now():
+        return None
+    return _construct(
+        Event,
+        {
+            "event_id": event_id,
+            "user_id": user_id,
+            "transaction_amount": float(amount),
+            "country": country,
+            "device": device,
+            "event_ts": event_ts,
+            "label": label,
+        },
+        set(_EVENT_FIELDS.intersection(payload)),
+    )
+
+
+def validate_event_fast(payload: Mapping[str, Any]) -> Event:
+    return _fast_event(payload) or Event.model_validate(payload)
+
+
+def validate_request_fast(payload: Mapping[str, Any]) -> InferenceRequest:
+    if type(payload) is dict and type(payload.get("user_id")) is str:
+        event = _fast_event(payload.get("event"))
+        if event is not None:
+            return _construct(
+                InferenceRequest,
+                {"user_id": payload["user_id"], "event": event},
+                {"user_id", "event"},
+            )
+    return InferenceRequest.model_validate(payload)
+
+
+def loads(body: bytes) -> Any:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def dumps_response(response: InferenceResponse) -> bytes:
+    payload = {
+        "user_id": response.user_id,
+        "model_version": response.model_version,
+        "score": response.score,
+        "decision": response.decision,
+        "canary_variant": response.canary_variant,
+        "trace_id": response.trace_id,
+    }
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
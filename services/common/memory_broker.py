@@ -0,0 +1,308 @@
+"""In-process stand-in for a Kafka/Redpanda cluster.
+
+Implements the subset of ``KafkaProducer``/``KafkaConsumer`` the pipeline uses:
+keyed partitioning, consumer groups with committed offsets and eager
+(stop-the-world) rebalances that invoke the subscriber's rebalance listener,
+and group-less consumers with manual assignment and timestamp lookups.
+Good enough to exercise ingestion workers in tests and benchmarks without
+Redpanda.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+from kafka import TopicPartition
+from kafka.structs import OffsetAndTimestamp
+
+
+@dataclass(frozen=True)
+class Record:
+    topic: str
+    partition: int
+    offset: int
+    key: bytes | None
+    value: Any
+    headers: list[tuple[str, bytes]] = field(default_factory=list)
+    timestamp: int = 0
+
+
+@dataclass
+class _Group:
+    members: list[InMemoryConsumer] = field(default_factory=list)
+    generation: int = 0
+    acked: dict[int, int] = field(default_factory=dict)
+    assignment: dict[int, list[TopicPartition]] = field(default_factory=dict)
+
+    def ready(self) -> bool:
+        return all(self.acked.get(id(member)) == self.generation for member in self.members)
+
+
+class InMemoryBroker:
+    def __init__(self, partitions: int = 4) -> None:
+        self.partitions = partitions
+        self._logs: dict[str, list[list[Record]]] = {}
+        self._committed: dict[tuple[str | None, TopicPartition], int] = {}
+        self._groups: dict[str | None, _Group] = {}
+        self._cond = threading.Condition(threading.RLock())
+
+    def create_topic(self, topic: str, partitions: int | None = None) -> None:
+        with self._cond:
+            self._logs.setdefault(topic, [[] for _ in range(partitions or self.partitions)])
+
+    def produce(
+        self,
+        topic: str,
+        value: bytes,
+        key: bytes | None = None,
+        headers: Sequence[tuple[str, bytes]] | None = None,
+        partition: int | None = None,
+        timestamp_ms: int | None = None,
+    ) -> Record:
+        self.create_topic(topic)
+        with self._cond:
+            logs = self._logs[topic]
+            if partition is None:
+                partition = zlib.crc32(key) % len(logs) if key is not None else 0
+            record = Record(
+                topic,
+                partition,
+                len(logs[partition]),
+                key,
+                value,
+                list(headers or []),
+                int(time.time() * 1000) if timestamp_ms is None else timestamp_ms,
+            )
+            logs[partition].append(record)
+            self._cond.notify_all()
+        return record
+
+    def partitions_for(self, topic: str) -> list[TopicPartition]:
+        self.create_topic(topic)
+        with self._cond:
+            return [TopicPartition(topic, idx) for idx in range(len(self._logs[topic]))]
+
+    def end_offset(self, partition: TopicPartition) -> int:
+        with self._cond:
+            return len(self._logs[partition.topic][partition.partition])
+
+    def committed(self, group_id: str, partition: TopicPartition) -> int | None:
+        with self._cond:
+            return self._committed.get((group_id, partition))
+
+    def consumer(
+        self,
+        group_id: str | None,
+        value_deserializer: Callable[[bytes], Any] | None = None,
+        auto_offset_reset: str = "earliest",
+    ) -> InMemoryConsumer:
+        return InMemoryConsumer(self, group_id, value_deserializer, auto_offset_reset)
+
+    def _join(self, member: InMemoryConsumer) -> None:
+        with self._cond:
+            group = self._groups.setdefault(member.group_id, _Group())
+            group.members.append(member)
+            self._rebalance(group)
+
+    def _leave(self, member: InMemoryConsumer) -> None:
+        with self._cond:
+            group = self._groups[member.group_id]
+            group.members.remove(member)
+            group.acked.pop(id(member), None)
+            self._rebalance(group)
+
+    def _rebalance(self, group: _Group) -> None:
+        group.generation += 1
+        partitions = sorted(
+            {tp for member in group.members for tp in self._member_partitions(member)},
+            key=lambda tp: (tp.topic, tp.partition),
+        )
+        group.assignment = {id(member): [] for member in group.members}
+        for idx, tp in enumerate(partitions):
+            group.assignment[id(group.members[idx % len(group.members)])].append(tp)
+        self._cond.notify_all()
+
+    def _member_partitions(self, member: InMemoryConsumer) -> list[TopicPartition]:
+        return [tp for topic in member.topics for tp in self.partitions_for(topic)]
+
+
+class InMemoryConsumer:
+    """Consumer-group member with ``KafkaConsumer``'s polling interface."""
+
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        group_id: str | None,
+        value_deserializer: Callable[[bytes], Any] | None = None,
+        auto_offset_reset: str = "earliest",
+    ) -> None:
+        self.broker = broker
+        self.group_id = group_id
+        self.value_deserializer = value_deserializer
+        self.auto_offset_reset = auto_offset_reset
+        self.topics: list[str] = []
+        self._listener: Any = None
+        self._generation = 0
+        self._acked = 0
+        self._assignment: list[TopicPartition] = []
+        self._positions: dict[TopicPartition, int] = {}
+        self._paused: set[TopicPartition] = set()
+        self._manual = False
+        self._cursor = 0
+        self._closed = False
+
+    def subscribe(self, topics: Sequence[str] = (), listener: Any = None) -> None:
+        self.topics = list(topics)
+        self._listener = listener
+        self.broker._join(self)
+
+    def assign(self, partitions: Sequence[TopicPartition]) -> None:
+        """Take ``partitions`` outside any group, like ``KafkaConsumer.assign``."""
+        with self.broker._cond:
+            self._manual = True
+            self._assignment = list(partitions)
+            for tp in self._assignment:
+                reset = 0 if self.auto_offset_reset == "earliest" else self.highwater(tp)
+                self._positions.setdefault(tp, reset)
+
+    def assignment(self) -> set[TopicPartition]:
+        return set(self._assignment)
+
+    def partitions_for_topic(self, topic: str) -> set[int]:
+        return {tp.partition for tp in self.broker.partitions_for(topic)}
+
+    def end_offsets(self, partitions: Sequence[TopicPartition]) -> dict[TopicPartition, int]:
+        return {tp: self.broker.end_offset(tp) for tp in partitions}
+
+    def offsets_for_times(
+        self, timestamps: dict[TopicPartition, int]
+    ) -> dict[TopicPartition, OffsetAndTimestamp | None]:
+        """Earliest offset per partition whose timestamp is at or after the given one."""
+        found: dict[TopicPartition, OffsetAndTimestamp | None] = {}
+        with self.broker._cond:
+            for tp, millis in timestamps.items():
+                log = self.broker._logs[tp.topic][tp.partition]
+                match = next((record for record in log if record.timestamp >= millis), None)
+                found[tp] = OffsetAndTimestamp(match.offset, match.timestamp, -1) if match else None
+        return found
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self._paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self._paused.difference_update(partitions)
+
+    def poll(self, timeout_ms: float = 0, max_records: int = 500) -> dict[TopicPartition, list]:
+        deadline = time.monotonic() + timeout_ms / 1000.0
+        cond = self.broker._cond
+        while True:
+            self._sync_assignment()
+            with cond:
+                if self._assignment and (
+                    self._manual or self._generation == self._group().generation
+                ):
+                    records = self._fetch(max_records)
+                    if records:
+                        return records
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    return {}
+                cond.wait(remaining)
+
+    def commit(self, offsets: dict[TopicPartition, int] | None = None) -> None:
+        with self.broker._cond:
+            offsets = offsets if offsets is not None else dict(self._positions)
+            for tp, offset in offsets.items():
+                if tp not in self._assignment:
+                    raise RuntimeError(f"{tp} is not assigned to this consumer")
+                self.broker._committed[(self.group_id, tp)] = offset
+
+    def seek(self, partition: TopicPartition, offset: int) -> None:
+        self._positions[partition] = offset
+
+    def position(self, partition: TopicPartition) -> int:
+        return self._positions[partition]
+
+    def highwater(self, partition: TopicPartition) -> int:
+        return self.broker.end_offset(partition)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            if self.topics:
+                self.broker._leave(self)
+
+    def _group(self) -> _Group:
+        return self.broker._groups[self.group_id]
+
+    def _sync_assignment(self) -> None:
+        if self._manual:
+            return
+        cond = self.broker._cond
+        with cond:
+            group = self._group()
+            if self._generation == group.generation:
+                return
+            generation = group.generation
+            revoked = list(self._assignment) if self._acked < generation else None
+        if revoked is not None:
+            # Listener callbacks run outside the broker lock; they typically commit.
+            if self._listener is not None and revoked:
+                self._listener.on_partitions_revoked(revoked)
+            with cond:
+                self._assignment = []
+                self._positions = {}
+                self._acked = generation
+                if id(self) in {id(member) for member in group.members}:
+                    group.acked[id(self)] = generation
+                cond.notify_all()
+        with cond:
+            if group.generation != generation or not group.ready():
+                return
+            self._generation = generation
+            self._assignment = list(group.assignment.get(id(self), []))
+            for tp in self._assignment:
+                committed = self.broker._committed.get((self.group_id, tp))
+                if committed is None:
+                    committed = 0 if self.auto_offset_reset == "earliest" else self.highwater(tp)
+                self._positions[tp] = committed
+            assigned = list(self._assignment)
+        if self._listener is not None:
+            self._listener.on_partitions_assigned(assigned)
+
+    def _fetch(self, max_records: int) -> dict[TopicPartition, list]:
+        fetched: dict[TopicPartition, list] = {}
+        budget = max_records
+        # Rotate the starting partition so a busy partition cannot starve the rest.
+        self._cursor = (self._cursor + 1) % len(self._assignment)
+        for tp in self._assignment[self._cursor :] + self._assignment[: self._cursor]:
+            if budget <= 0:
+                break
+            if tp in self._paused:
+                continue
+            log = self.broker._logs[tp.topic][tp.partition]
+            start = self._positions[tp]
+            batch = log[start : start + budget]
+            if not batch:
+                continue
+            if self.value_deserializer is not None:
+                batch = [
+                    Record(
+                        r.topic,
+                        r.partition,
+                        r.offset,
+                        r.key,
+                        self.value_deserializer(r.value),
+                        r.headers,
+                        r.timestamp,
+                    )
+                    for r in batch
+                ]
+            fetched[tp] = batch
+            self._positions[tp] = start + len(batch)
+            budget -= len(batch)
+        return fetched
@@ -0,0 +1,83 @@
+"""Lightweight pub/sub used to broadcast feature updates between services."""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Protocol
+
+from .config import get_settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+FEATURE_UPDATES_CHANNEL = "feature-updates"
+
+Callback = Callable[[str], None]
+
+
+class PubSub(Protocol):
+    def publish(self, channel: str, message: str) -> int: ...
+
+    def subscribe(self, channel: str, callback: Callback) -> Callable[[], None]: ...
+
+
+class LocalPubSub:
+    """Thread-safe in-process pub/sub, a stand-in for Redis channels."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, list[Callback]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: str) -> int:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            try:
+                callback(message)
+            except Exception as exc:  # pragma: no cover - subscriber bugs must not stop publishers
+                logger.warning("Subscriber on %s failed: %s", channel, exc)
+        return len(callbacks)
+
+    def subscribe(self, channel: str, callback: Callback) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers[channel].append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers.get(channel, []):
+                    self._subscribers[channel].remove(callback)
+
+        return unsubscribe
+
+
+class RedisPubSub:
+    """Redis-backed pub/sub so stream workers can reach serving replicas."""
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def publish(self, channel: str, message: str) -> int:
+        return int(self.client.publish(channel, message))
+
+    def subscribe(self, channel: str, callback: Callback) -> Callable[[], None]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+
+        def handler(payload: dict[str, Any]) -> None:
+            data = payload.get("data")
+            callback(data.decode("utf-8") if isinstance(data, bytes) else str(data))
+
+        pubsub.subscribe(**{channel: handler})
+        thread = pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+        return thread.stop
+
+
+@lru_cache(maxsize=1)
+def get_feature_update_bus() -> PubSub:
+    settings = get_settings()
+    if settings.feature_update_bus == "redis":
+        import redis
+
+        return RedisPubSub(redis.Redis(host=settings.redis_host, port=settings.redis_port))
+    return LocalPubSub()
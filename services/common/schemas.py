@@ -5,6 +5,9 @@ from typing import Any
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+COUNTRIES = frozenset({"US", "CA", "GB", "DE", "FR", "IN", "BR"})
+DEVICES = frozenset({"ios", "android", "web"})
+
 
 class Event(BaseModel):
     event_id: str = Field(..., description="ULID identifier")
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from services.common.data import ColumnarEventGenerator, SyntheticEventGenerator
+from services.common.schemas import Event
+
+END = pd.Timestamp("2024-02-01T00:00:00Z")
+
+
+def test_chunks_are_reproducible_and_match_the_event_schema():
+    first = pd.concat(ColumnarEventGenerator(seed=3, end=END).frames(2_500, chunk_size=1_000))
+    second = pd.concat(ColumnarEventGenerator(seed=3, end=END).frames(2_500, chunk_size=1_000))
+
+    pd.testing.assert_frame_equal(first, second)
+    assert list(first.columns) == list(Event.model_fields)
+    assert first["event_ts"].is_monotonic_increasing
+    assert first["event_ts"].iloc[-1] == END
+    assert first["event_id"].str.len().eq(26).all() and first["event_id"].is_unique
+    for row in first.head(20).to_dict(orient="records"):
+        Event(**row)
+
+
+def test_distributions_follow_the_per_event_generator():
+    frame = ColumnarEventGenerator(seed=5, end=END).frame(200_000)
+    reference = [
+        event.transaction_amount for event in SyntheticEventGenerator(seed=5).stream(20_000)
+    ]
+    assert abs(frame["transaction_amount"].mean() - np.mean(reference)) < 1.0
+    assert abs(frame["transaction_amount"].std() - np.std(reference)) < 1.0
+    assert abs(frame["label"].mean() - 0.02) < 0.003
+    assert set(frame["country"]) == set(ColumnarEventGenerator.COUNTRIES)
+    assert frame["user_id"].nunique() == 500
+
+    drifted = ColumnarEventGenerator(seed=5, drift=2.0, end=END).frame(200_000)
+    high = drifted["transaction_amount"] > 300
+    assert abs(drifted.loc[high, "label"].mean() - 0.10) < 0.01
+    assert abs(drifted.loc[~high, "label"].mean() - 0.02) < 0.003
+
+
+def test_drift_scales_amounts_and_arrow_tables_match_frames():
+    base = ColumnarEventGenerator(seed=1, end=END).frame(1_000)
+    drifted = ColumnarEventGenerator(seed=1, drift=0.5, end=END).frame(1_000)
+    assert np.allclose(drifted["transaction_amount"], (base["transaction_amount"] * 1.5), atol=0.01)
+
+    table = next(ColumnarEventGenerator(seed=1, end=END).tables(1_000))
+    pd.testing.assert_frame_equal(table.to_pandas(), base)
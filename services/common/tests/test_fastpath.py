@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from services.common.fastpath import dumps_response, loads, validate_event_fast
+from services.common.schemas import Event, InferenceResponse
+
+VALID = {
+    "event_id": "01HQA7F9G4G1YJ2R4D8K2J3A5S",
+    "user_id": "user-1",
+    "transaction_amount": 12,
+    "country": "US",
+    "device": "ios",
+    "event_ts": "2024-02-01T10:00:00.123Z",
+    "label": 1,
+}
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {},
+        {"label": None},
+        {"transaction_amount": "12.5"},
+        {"event_ts": "2024-02-01T10:00:00+02:00"},
+        {"event_ts": datetime(2024, 2, 1, tzinfo=timezone.utc)},
+        {"label": True},
+        {"extra": "ignored"},
+    ],
+)
+def test_fast_path_matches_pydantic_for_valid_payloads(overrides):
+    payload = {**VALID, **overrides}
+    fast = validate_event_fast(payload)
+    full = Event.model_validate(payload)
+    assert fast.model_dump() == full.model_dump()
+    assert fast.model_fields_set == full.model_fields_set
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"country": "XX"},
+        {"country": "US\n"},
+        {"device": "tv"},
+        {"event_id": "short"},
+        {"transaction_amount": 5000.01},
+        {"transaction_amount": float("nan")},
+        {"label": 2},
+        {"event_ts": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()},
+    ],
+)
+def test_fast_path_rejects_what_pydantic_rejects(overrides):
+    payload = {**VALID, **overrides}
+    with pytest.raises(ValidationError):
+        Event.model_validate(payload)
+    with pytest.raises(ValidationError):
+        validate_event_fast(payload)
+
+
+def test_dumps_response_round_trips():
+    response = InferenceResponse(
+        user_id="user-1",
+        model_version="3",
+        score=0.125,
+        decision="approve",
+        canary_variant="baseline",
+    )
+    assert loads(dumps_response(response)) == response.model_dump()
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from services.common import wire
+from services.common.schemas import Event
+
+EVENT = Event(
+    event_id="01HQA7F9G4G1YJ2R4D8K2J3A5S",
+    user_id="user-1",
+    transaction_amount=120.4,
+    country="DE",
+    device="web",
+    event_ts=datetime(2024, 2, 1, 10, 0, 0, 123456, tzinfo=timezone.utc),
+    label=None,
+)
+
+
+@pytest.mark.parametrize("wire_format", wire.WIRE_FORMATS)
+def test_round_trip_through_header_and_sniffing(wire_format):
+    payload = wire.serializer(wire_format)(EVENT)
+
+    for headers in (wire.headers_for(wire_format), None):
+        assert Event(**wire.decode(payload, headers)) == EVENT
+
+
+def test_binary_is_smaller_than_json():
+    binary = wire.encode_binary(EVENT)
+    assert binary[:2] == bytes([wire.MAGIC, wire.SCHEMA_VERSION])
+    assert len(binary) < len(wire.encode_json(EVENT)) / 3
+
+
+def test_enum_codes_follow_schema_pattern_order():
+    codec = wire.CODECS[wire.SCHEMA_VERSION]
+    country = next(entry for entry in codec.fixed if entry[0] == "country")
+    assert country[2]("US") == 0
+    assert country[3](3) == "DE"
+
+
+@pytest.mark.parametrize(
+    "payload, headers",
+    [
+        (wire.encode_binary(EVENT)[:-3], None),
+        (bytes([wire.MAGIC, 99]) + wire.encode_binary(EVENT)[2:], None),
+        (b"{}", [("content-type", b"application/x-protobuf")]),
+    ],
+)
+def test_malformed_payloads_raise_wire_format_error(payload, headers):
+    with pytest.raises(wire.WireFormatError):
+        wire.decode(payload, headers)
+
+
+def test_unknown_enum_value_is_rejected_on_encode():
+    with pytest.raises(wire.WireFormatError):
+        wire.encode_binary(EVENT.model_copy(update={"country": "JP"}))
+
+
+def _patched(field, value):
+    codec = wire.CODECS[wire.SCHEMA_VERSION]
+    payload = wire.encode_binary(EVENT)
+    values = list(codec._head.unpack_from(payload))
+    values[2 + codec._names.index(field)] = value
+    return codec._head.pack(*values) + payload[codec._head.size :]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        _patched("country", 200),  # no such enum index
+        _patched("event_ts", 2**63 - 1),  # past datetime.max
+        wire.encode_binary(EVENT)[:-1] + b"\xff",  # invalid UTF-8
+    ],
+    ids=["enum-index", "timestamp-overflow", "utf-8"],
+)
+def test_corrupt_binary_fields_raise_wire_format_error(payload):
+    with pytest.raises(wire.WireFormatError):
+        wire.decode(payload)
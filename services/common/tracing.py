@@ -1,16 +1,26 @@
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
 from .config import get_settings
 
+try:
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+except ImportError:  # pragma: no cover - exporter optional for local dev
+    OTLPSpanExporter = None  # type: ignore[assignment,misc]
+
 
 def init_tracer(service_name: str) -> None:
+    """Install the SDK tracer provider, exporting over OTLP when an endpoint is set.
+
+    Without an exporter spans are still sampled, so trace IDs reach responses
+    and metric exemplars.
+    """
     settings = get_settings()
     resource = Resource(attributes={"service.name": service_name})
     provider = TracerProvider(resource=resource)
-    exporter = OTLPSpanExporter(endpoint=settings.otlp_endpoint, insecure=True)
-    provider.add_span_processor(BatchSpanProcessor(exporter))
+    if OTLPSpanExporter is not None and settings.otlp_endpoint:
+        exporter = OTLPSpanExporter(endpoint=settings.otlp_endpoint, insecure=True)
+        provider.add_span_processor(BatchSpanProcessor(exporter))
     trace.set_tracer_provider(provider)
@@ -0,0 +1,180 @@
+"""Kafka wire formats for transaction events.
+
+Besides JSON, events can travel in a compact binary layout derived from
+:class:`Event`: a magic byte and schema version, the fixed-width fields packed
+with ``struct`` (enums as their index in the schema pattern, timestamps as
+epoch microseconds) and then the length-prefixed strings. Producers tag each
+message with a ``content-type`` header; consumers honour the header and sniff
+the first byte when it is missing, so JSON and binary producers can share a
+topic while consumers are upgraded.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Mapping
+
+from .fastpath import loads
+from .schemas import Event
+
+MAGIC = 0xE7
+SCHEMA_VERSION = 1
+CONTENT_TYPE_HEADER = "content-type"
+JSON_CONTENT_TYPE = "application/json"
+BINARY_CONTENT_TYPE = "application/vnd.transaction-event+binary"
+WIRE_FORMATS = ("json", "binary")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ENUM_PATTERN = re.compile(r"^\^\(([\w|]+)\)\$$")
+_MISSING_LABEL = -1
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+def _enum_values(field: Any) -> tuple[str, ...] | None:
+    for meta in field.metadata:
+        match = _ENUM_PATTERN.match(getattr(meta, "pattern", None) or "")
+        if match:
+            return tuple(match.group(1).split("|"))
+    return None
+
+
+class EventCodec:
+    """Binary codec compiled from the fields of ``model``, in declaration order.
+
+    Enum codes follow the order of the pattern alternation, so new values must
+    be appended there; any other layout change needs a new schema version.
+    """
+
+    def __init__(self, model: type[Event] = Event, version: int = SCHEMA_VERSION) -> None:
+        self.model = model
+        self.version = version
+        fixed: list[tuple[str, str, Callable[[Any], Any], Callable[[Any], Any]]] = []
+        self.strings: list[str] = []
+        for name, field in model.model_fields.items():
+            enum = _enum_values(field) if field.annotation is str else None
+            if enum is not None:
+                index = {value: idx for idx, value in enumerate(enum)}
+                fixed.append((name, "B", index.__getitem__, enum.__getitem__))
+            elif field.annotation is str:
+                self.strings.append(name)
+            elif field.annotation is float:
+                fixed.append((name, "d", float, float))
+            elif field.annotation is datetime:
+                fixed.append((name, "q", _to_micros, _from_micros))
+            elif field.annotation == int | None:
+                fixed.append((name, "b", _encode_optional, _decode_optional))
+            else:
+                raise TypeError(f"No wire encoding for {name}: {field.annotation}")
+        self.fixed = fixed
+        self._names = [name for name, _, _, _ in fixed]
+        self._decoders = [(name, decode) for name, _, _, decode in fixed if decode is not float]
+        self._head = struct.Struct(
+            "<BB" + "".join(fmt for _, fmt, _, _ in fixed) + "H" * len(self.strings)
+        )
+
+    def encode(self, event: Event) -> bytes:
+        strings = [getattr(event, name).encode("utf-8") for name in self.strings]
+        try:
+            head = self._head.pack(
+                MAGIC,
+                self.version,
+                *[encode(getattr(event, name)) for name, _, encode, _ in self.fixed],
+                *[len(value) for value in strings],
+            )
+        except (KeyError, struct.error) as exc:
+            raise WireFormatError(f"Event does not fit schema v{self.version}: {exc}") from exc
+        return head + b"".join(strings)
+
+    def decode(self, data: bytes) -> dict[str, Any]:
+        try:
+            values = self._head.unpack_from(data)
+        except struct.error as exc:
+            raise WireFormatError("Truncated binary event") from exc
+        if values[0] != MAGIC or values[1] != self.version:
+            raise WireFormatError("Not a binary event for this schema version")
+        event = dict(zip(self._names, values[2:], strict=False))
+        offset = self._head.size
+        try:
+            for name, decode in self._decoders:
+                event[name] = decode(event[name])
+            for name, length in zip(self.strings, values[2 + len(self.fixed) :], strict=True):
+                event[name] = str(data[offset : offset + length], "utf-8")
+                offset += length
+        except (IndexError, OverflowError, struct.error, UnicodeDecodeError) as exc:
+            raise WireFormatError(f"Malformed binary event: {exc}") from exc
+        if offset != len(data):
+            raise WireFormatError("Binary event length does not match its header")
+        return event
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime:
+    seconds, micros = divmod(value, 1_000_000)
+    return _EPOCH + timedelta(0, seconds, micros)
+
+
+def _encode_optional(value: int | None) -> int:
+    return _MISSING_LABEL if value is None else value
+
+
+def _decode_optional(value: int) -> int | None:
+    return None if value == _MISSING_LABEL else value
+
+
+CODECS = {SCHEMA_VERSION: EventCodec()}
+
+
+def encode_json(event: Event) -> bytes:
+    return json.dumps(event.model_dump(mode="json")).encode("utf-8")
+
+
+def encode_binary(event: Event) -> bytes:
+    return CODECS[SCHEMA_VERSION].encode(event)
+
+
+def serializer(wire_format: str) -> Callable[[Event], bytes]:
+    if wire_format == "binary":
+        return encode_binary
+    if wire_format == "json":
+        return encode_json
+    raise ValueError(f"Unknown wire format {wire_format!r}; expected one of {WIRE_FORMATS}")
+
+
+def headers_for(wire_format: str) -> list[tuple[str, bytes]]:
+    content_type = BINARY_CONTENT_TYPE if wire_format == "binary" else JSON_CONTENT_TYPE
+    return [(CONTENT_TYPE_HEADER, content_type.encode("ascii"))]
+
+
+def _content_type(headers: Iterable[tuple[str, bytes]] | None) -> str | None:
+    for key, value in headers or ():
+        if key.lower() == CONTENT_TYPE_HEADER:
+            return value.decode("ascii", "replace")
+    return None
+
+
+def decode(value: bytes, headers: Iterable[tuple[str, bytes]] | None = None) -> Mapping[str, Any]:
+    """Decode one message using its ``content-type`` header, or by sniffing the payload."""
+    content_type = _content_type(headers)
+    if content_type is None:
+        content_type = BINARY_CONTENT_TYPE if value[:1] == bytes([MAGIC]) else JSON_CONTENT_TYPE
+    if content_type == BINARY_CONTENT_TYPE:
+        if len(value) < 2:
+            raise WireFormatError("Truncated binary event")
+        codec = CODECS.get(value[1])
+        if codec is None:
+            raise WireFormatError(f"Unsupported binary schema version {value[1]}")
+        return codec.decode(value)
+    if content_type.split(";")[0].strip() == JSON_CONTENT_TYPE:
+        return loads(value)
+    raise WireFormatError(f"Unsupported content type {content_type!r}")
@@ -1,14 +1,27 @@
-from feast import FileSource
+from feast import FileSource, PushSource
 
+# Hive-partitioned (date=/hour=) dataset appended to by the batch job and the stream
+# job's offline sink; see services/feature_service/ingestion/offline.py.
 events_source = FileSource(
-    path="data/sample/events.parquet",
+    path="data/offline/events",
     timestamp_field="event_ts",
     created_timestamp_column="created_at",
 )
 
 
 live_source = FileSource(
-    path="data/sample/events.parquet",
+    path="data/offline/events",
     timestamp_field="event_ts",
     created_timestamp_column="created_at",
 )
+
+
+# Only the stream job writes the rolling aggregates, pushing them straight to the online
+# store; nothing fills the batch source, so materialization leaves the view alone.
+aggregates_source = PushSource(
+    name="transaction_aggregates_push",
+    batch_source=FileSource(
+        path="data/offline/transaction_aggregates",
+        timestamp_field="event_ts",
+    ),
+)
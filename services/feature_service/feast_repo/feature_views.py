@@ -1,7 +1,9 @@
+from datetime import timedelta
+
 from feast import FeatureView, Field
 from feast.types import Float32, Int64
 
-from .data_sources import events_source
+from .data_sources import aggregates_source, events_source
 from .entities import user
 
 transaction_features = FeatureView(
@@ -15,3 +17,24 @@ transaction_features = FeatureView(
     online=True,
     source=events_source,
 )
+
+AGGREGATE_WINDOWS = ("1m", "1h", "24h")
+
+transaction_aggregates = FeatureView(
+    name="transaction_aggregates",
+    entities=[user],
+    ttl=timedelta(days=1),
+    schema=[
+        field
+        for window in AGGREGATE_WINDOWS
+        for field in (
+            Field(name=f"txn_count_{window}", dtype=Int64),
+            Field(name=f"amount_sum_{window}", dtype=Float32),
+            Field(name=f"amount_mean_{window}", dtype=Float32),
+            Field(name=f"amount_var_{window}", dtype=Float32),
+            Field(name=f"amount_zscore_{window}", dtype=Float32),
+        )
+    ],
+    online=True,
+    source=aggregates_source,
+)
@@ -1,21 +1,321 @@
-from datetime import datetime, timedelta
+"""Incremental Feast materialization driven by per-feature-view watermarks.
 
-from feast import FeatureStore
+Each online feature view keeps a watermark, the end of its last successful
+run, in a small JSON file. A run materializes ``[watermark - lateness, now)``
+so late events just behind the previous run are picked up again; a view
+without a watermark starts ``initial_lookback`` back, and ``--start`` forces
+an explicit backfill range. The range is split into ``chunk``-sized windows;
+for file sources a process pool reads each window's newest row per entity
+and writes it to the online store, and the watermark only moves once every
+chunk of the view has succeeded. Pool workers never touch the registry: Feast
+records materialization intervals by rewriting the registry file, so
+concurrent writers would lose each other's updates. The parent records the
+view's interval once instead. Parallel chunks rely on the online store keeping
+the newest row per entity, which Feast's Redis store does by comparing event
+timestamps.
+"""
 
-from services.common.config import get_settings
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+from feast import FeatureStore, FileSource, PushSource
+
+from services.common.config import Settings, get_settings
 from services.common.logging import configure_logging, get_logger
 
 logger = get_logger(__name__)
 
 
-def materialize() -> None:
+class WatermarkStore:
+    """Feature view name -> end of its last successful materialization, kept in a JSON file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def load(self) -> dict[str, datetime]:
+        if not self.path.exists():
+            return {}
+        raw = json.loads(self.path.read_text())
+        return {view: datetime.fromisoformat(value) for view, value in raw.items()}
+
+    def get(self, feature_view: str) -> datetime | None:
+        return self.load().get(feature_view)
+
+    def set(self, feature_view: str, value: datetime) -> None:
+        watermarks = {view: ts.isoformat() for view, ts in self.load().items()}
+        watermarks[feature_view] = value.isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(watermarks, indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class ChunkResult:
+    start: datetime
+    end: datetime
+    rows: int | None
+    duration_s: float
+
+
+@dataclass
+class ViewReport:
+    feature_view: str
+    start: datetime
+    end: datetime
+    chunks: list[ChunkResult] = field(default_factory=list)
+    duration_s: float = 0.0
+
+    @property
+    def rows(self) -> int | None:
+        counts = [chunk.rows for chunk in self.chunks if chunk.rows is not None]
+        return sum(counts) if len(counts) == len(self.chunks) else None
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "feature_view": self.feature_view,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "chunks": len(self.chunks),
+            "rows": self.rows,
+            "duration_s": round(self.duration_s, 3),
+        }
+
+
+def time_chunks(
+    start: datetime, end: datetime, chunk: timedelta
+) -> list[tuple[datetime, datetime]]:
+    chunks = []
+    while start < end:
+        chunks.append((start, min(start + chunk, end)))
+        start += chunk
+    return chunks
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def batch_source_path(source: Any, repo_path: str) -> Path | None:
+    if not isinstance(source, FileSource):
+        return None
+    path = Path(source.path)
+    if not path.is_absolute() and not path.exists():
+        path = Path(repo_path) / path
+    return path
+
+
+def has_data(path: Path) -> bool:
+    """Whether a file source holds any parquet files yet (staging ``_``/``.`` files aside)."""
+    if path.is_file():
+        return path.stat().st_size > 0
+    return path.is_dir() and bool(ds.dataset(path, format="parquet", partitioning="hive").files)
+
+
+def latest_per_entity(
+    path: Path,
+    join_keys: list[str],
+    columns: list[str],
+    timestamp_field: str,
+    start: datetime,
+    end: datetime,
+) -> pa.Table:
+    """Newest row per entity in ``[start, end)``, i.e. the online rows a materialization writes."""
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    ts = ds.field(timestamp_field)
+    table = dataset.to_table(columns=columns, filter=(ts >= start) & (ts < end))
+    if table.num_rows == 0:
+        return table
+    table = table.sort_by([(timestamp_field, "descending")])
+    newest = (
+        table.append_column("_row", pa.array(np.arange(table.num_rows)))
+        .group_by(join_keys, use_threads=False)
+        .aggregate([("_row", "min")])
+    )
+    return table.take(newest["_row_min"])
+
+
+def _write_chunk(
+    store: Any,
+    feature_view: str,
+    start: datetime,
+    end: datetime,
+    source_path: Path,
+    join_keys: list[str],
+    columns: list[str],
+    timestamp_field: str = "event_ts",
+) -> ChunkResult:
+    started = time.perf_counter()
+    table = latest_per_entity(source_path, join_keys, columns, timestamp_field, start, end)
+    if table.num_rows:
+        store.write_to_online_store(feature_view_name=feature_view, df=table.to_pandas())
+    return ChunkResult(start, end, table.num_rows, time.perf_counter() - started)
+
+
+def _materialize_chunk(
+    store: Any, feature_view: str, start: datetime, end: datetime
+) -> ChunkResult:
+    started = time.perf_counter()
+    store.materialize(start_date=start, end_date=end, feature_views=[feature_view])
+    return ChunkResult(start, end, None, time.perf_counter() - started)
+
+
+_POOL_STORE: Any = None
+
+
+def _pool_chunk(store_factory: Callable[[], Any], *args: Any, **kwargs: Any) -> ChunkResult:
+    global _POOL_STORE
+    if _POOL_STORE is None:  # one FeatureStore per pool process
+        _POOL_STORE = store_factory()
+    return _write_chunk(_POOL_STORE, *args, **kwargs)
+
+
+def materialize_view(
+    store: Any,
+    store_factory: Callable[[], Any],
+    feature_view: Any,
+    start: datetime,
+    end: datetime,
+    chunk: timedelta,
+    workers: int = 1,
+    repo_path: str = ".",
+) -> ViewReport:
+    source = feature_view.batch_source
+    source_path = batch_source_path(source, repo_path)
+    report = ViewReport(feature_view.name, start, end)
+    chunks = time_chunks(start, end, chunk)
+    started = time.perf_counter()
+    if source_path is None:
+        # Feast reads other sources itself and records each chunk in the registry, so
+        # these run one at a time in this process.
+        report.chunks = [_materialize_chunk(store, feature_view.name, *window) for window in chunks]
+        report.duration_s = time.perf_counter() - started
+        return report
+    join_keys = [column.name for column in feature_view.entity_columns] or [
+        store.get_entity(name).join_key for name in feature_view.entities
+    ]
+    extra = [feature.name for feature in feature_view.features] + [source.timestamp_field]
+    if source.created_timestamp_column:
+        extra.append(source.created_timestamp_column)
+    options = {
+        "source_path": source_path,
+        "join_keys": join_keys,
+        "columns": list(dict.fromkeys(join_keys + extra)),
+        "timestamp_field": source.timestamp_field,
+    }
+    if workers <= 1 or len(chunks) == 1:
+        report.chunks = [
+            _write_chunk(store, feature_view.name, *window, **options) for window in chunks
+        ]
+    else:
+        task = partial(_pool_chunk, store_factory, feature_view.name, **options)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(workers, len(chunks)), mp_context=context) as pool:
+            report.chunks = list(pool.map(task, *zip(*chunks, strict=True)))
+    store.registry.apply_materialization(feature_view, store.project, start, end)
+    report.duration_s = time.perf_counter() - started
+    return report
+
+
+def materialize_incremental(
+    store: Any,
+    store_factory: Callable[[], Any],
+    watermarks: WatermarkStore,
+    end: datetime | None = None,
+    start: datetime | None = None,
+    initial_lookback: timedelta = timedelta(days=1),
+    lateness: timedelta = timedelta(minutes=5),
+    chunk: timedelta = timedelta(hours=6),
+    workers: int = 1,
+    feature_views: list[str] | None = None,
+    repo_path: str = ".",
+) -> list[ViewReport]:
+    """Materialize each online view from its watermark (or ``start``) up to ``end``.
+
+    Views fed by a ``PushSource`` are written to the online store by their
+    producer, so they are only materialized when named in ``feature_views``.
+    Views whose file source is missing or empty are skipped, watermark untouched.
+    """
+    end = _utc(end or datetime.now(timezone.utc))
+    reports = []
+    for view in store.list_feature_views():
+        if not view.online or (feature_views and view.name not in feature_views):
+            continue
+        if not feature_views and isinstance(view.stream_source, PushSource):
+            logger.info("Skipping push-fed feature view %s", view.name)
+            continue
+        source_path = batch_source_path(view.batch_source, repo_path)
+        if source_path is not None and not has_data(source_path):
+            logger.warning("Skipping %s: no data at %s yet", view.name, source_path)
+            continue
+        watermark = watermarks.get(view.name)
+        if start is not None:
+            view_start = _utc(start)
+        elif watermark is not None:
+            view_start = watermark - lateness
+        else:
+            view_start = end - initial_lookback
+        if view_start >= end:
+            continue
+        report = materialize_view(
+            store, store_factory, view, view_start, end, chunk, workers, repo_path
+        )
+        watermarks.set(view.name, max(end, watermark) if watermark else end)
+        logger.info("Materialized %s", report.summary())
+        reports.append(report)
+    return reports
+
+
+def _timestamp(value: str) -> datetime:
+    return _utc(datetime.fromisoformat(value))
+
+
+def materialize(argv: list[str] | None = None) -> list[ViewReport]:
+    parser = argparse.ArgumentParser(description="Incrementally materialize Feast feature views")
+    parser.add_argument("--start", type=_timestamp, help="Backfill from here, ignoring watermarks")
+    parser.add_argument("--end", type=_timestamp, help="Materialize up to here (default: now)")
+    parser.add_argument("--feature-view", action="append", help="Only these feature views")
+    parser.add_argument(
+        "--workers", type=int, help="Parallel chunks (default: MATERIALIZE_WORKERS)"
+    )
+    parser.add_argument("--report-json", type=Path, help="Also write the per-view report here")
+    args = parser.parse_args(argv)
+
     configure_logging()
-    settings = get_settings()
-    store = FeatureStore(repo_path=settings.feast_repo_path)
-    end = datetime.utcnow()
-    start = end - timedelta(days=1)
-    logger.info("Materializing Feast features from %s to %s", start.isoformat(), end.isoformat())
-    store.materialize(start_date=start, end_date=end)
+    settings: Settings = get_settings()
+    store_factory = partial(FeatureStore, repo_path=settings.feast_repo_path)
+    reports = materialize_incremental(
+        store_factory(),
+        store_factory,
+        WatermarkStore(settings.materialize_watermark_path),
+        end=args.end,
+        start=args.start,
+        initial_lookback=timedelta(hours=settings.materialize_initial_lookback_h),
+        lateness=timedelta(seconds=settings.materialize_lateness_s),
+        chunk=timedelta(hours=settings.materialize_chunk_h),
+        # Chunks are CPU-bound pandas work in Feast's local engine; more processes than cores
+        # only add start-up and lock contention.
+        workers=min(args.workers or settings.materialize_workers, os.cpu_count() or 1),
+        feature_views=args.feature_view,
+        repo_path=settings.feast_repo_path,
+    )
+    if args.report_json:
+        args.report_json.write_text(json.dumps([report.summary() for report in reports], indent=2))
+    return reports
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+"""Export a feature view's latest rows into a memory-mappable snapshot for serving.
+
+The snapshot is an uncompressed Arrow IPC file with one record batch: the
+entity key as a sorted ``fixed_size_binary`` column followed by fixed-width
+numeric feature columns, so serving workers can map it and binary-search the
+keys in place (``services/serving/app/feature_snapshot.py``). Rows come from
+the view's batch source, newest per entity as of ``end`` and within the view's
+ttl, the same rows a materialization would leave in the online store. A new
+snapshot is written next to the old one and swapped in with ``os.replace``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+from feast import FeatureStore
+
+from services.common.config import get_settings
+from services.common.logging import configure_logging, get_logger
+from services.feature_service.feast_repo.materialize import batch_source_path
+
+logger = get_logger(__name__)
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _timestamp(value: str) -> datetime:
+    return _utc(datetime.fromisoformat(value))
+
+
+def latest_rows(
+    path: str | Path,
+    join_key: str,
+    timestamp_field: str,
+    features: list[str],
+    end: datetime,
+    ttl: Any = None,
+    created_field: str | None = None,
+) -> pa.Table:
+    """Newest row per ``join_key`` with ``timestamp_field < end`` (and ``>= end - ttl``)."""
+    ts = ds.field(timestamp_field)
+    predicate = ts < end
+    if ttl:
+        predicate &= ts >= end - ttl
+    order = [timestamp_field, *([created_field] if created_field else [])]
+    table = ds.dataset(path, format="parquet", partitioning="hive").to_table(
+        columns=[join_key, *order, *features], filter=predicate
+    )
+    frame = table.select([join_key, *order]).to_pandas()
+    latest = frame.sort_values(order, kind="stable").drop_duplicates(join_key, keep="last")
+    return table.take(pa.array(latest.index.to_numpy())).select([join_key, *features])
+
+
+def write_snapshot(
+    table: pa.Table, path: str | Path, key: str = "user_id", metadata: dict[str, str] | None = None
+) -> Path:
+    """Write ``table`` sorted by ``key``; readers see the old file or the new one, never a mix."""
+    features = [name for name in table.column_names if name != key]
+    for name in features:
+        kind = table.schema.field(name).type
+        if not (pa.types.is_integer(kind) or pa.types.is_floating(kind)):
+            raise ValueError(f"snapshot feature {name!r} must be numeric, got {kind}")
+    encoded = np.array([value.encode() for value in table[key].to_pylist()], dtype=object)
+    width = max((len(value) for value in encoded), default=1)
+    keys = encoded.astype(f"S{width}")
+    order = np.argsort(keys, kind="stable")
+    columns = {
+        key: pa.FixedSizeBinaryArray.from_buffers(
+            pa.binary(width), len(keys), [None, pa.py_buffer(keys[order].tobytes())]
+        )
+    }
+    sorted_table = table.take(pa.array(order, pa.int64())).combine_chunks()
+    for name in features:
+        columns[name] = sorted_table[name]
+    snapshot = pa.table(columns).replace_schema_metadata({"key": key, **(metadata or {})})
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, snapshot.schema) as writer:
+        writer.write_table(snapshot, max_chunksize=max(snapshot.num_rows, 1))
+    os.replace(tmp, path)
+    return path
+
+
+def export_snapshot(
+    store: Any,
+    feature_view: str,
+    path: str | Path,
+    end: datetime | None = None,
+    repo_path: str = ".",
+) -> pa.Table:
+    view = store.get_feature_view(feature_view)
+    source = view.batch_source
+    source_path = batch_source_path(source, repo_path)
+    if source_path is None:
+        raise ValueError(f"{feature_view} has no file batch source to snapshot")
+    join_keys = [column.name for column in view.entity_columns] or [
+        store.get_entity(name).join_key for name in view.entities
+    ]
+    if len(join_keys) != 1:
+        raise ValueError(f"{feature_view} must have a single join key, got {join_keys}")
+    end = _utc(end or datetime.now(timezone.utc))
+    table = latest_rows(
+        source_path,
+        join_keys[0],
+        source.timestamp_field,
+        [feature.name for feature in view.features],
+        end,
+        ttl=view.ttl,
+        created_field=source.created_timestamp_column or None,
+    )
+    metadata = {
+        "feature_view": feature_view,
+        "end": end.isoformat(),
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    }
+    write_snapshot(table, path, key=join_keys[0], metadata=metadata)
+    logger.info("Exported %d %s rows to %s", table.num_rows, feature_view, path)
+    return table
+
+
+def main(argv: list[str] | None = None) -> pa.Table:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export a feature view snapshot for serving")
+    parser.add_argument("--feature-view", default="transaction_features")
+    parser.add_argument("--end", type=_timestamp, help="Snapshot as of here (default: now)")
+    parser.add_argument("--output", type=Path, default=Path(settings.feature_snapshot_path))
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    return export_snapshot(
+        FeatureStore(repo_path=settings.feast_repo_path),
+        args.feature_view,
+        args.output,
+        end=args.end,
+        repo_path=settings.feast_repo_path,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Incremental per-user rolling aggregates for the stream job.
+
+Each window is a ring of fixed-width time buckets holding count, sum and sum of
+squares of ``transaction_amount``. Every user owns one row in preallocated
+NumPy arrays, so an event touches a constant number of cells and memory is
+bounded by ``max_users``. A bucket is reset lazily when its ring position is
+reused for a newer time slice; windows are therefore exact to one bucket
+width.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Window:
+    name: str
+    bucket_seconds: int
+    buckets: int
+
+    @property
+    def seconds(self) -> int:
+        return self.bucket_seconds * self.buckets
+
+
+DEFAULT_WINDOWS = (
+    Window("1m", bucket_seconds=10, buckets=6),
+    Window("1h", bucket_seconds=600, buckets=6),
+    Window("24h", bucket_seconds=3600, buckets=24),
+)
+
+AGGREGATE_FIELDS = ("txn_count", "amount_sum", "amount_mean", "amount_var", "amount_zscore")
+
+
+def aggregate_columns(windows: Sequence[Window] = DEFAULT_WINDOWS) -> list[str]:
+    return [f"{field}_{window.name}" for window in windows for field in AGGREGATE_FIELDS]
+
+
+class _Ring:
+    def __init__(self, window: Window, capacity: int) -> None:
+        self.window = window
+        self.counts = np.zeros((capacity, window.buckets), dtype=np.int32)
+        self.sums = np.zeros((capacity, window.buckets), dtype=np.float64)
+        self.squares = np.zeros((capacity, window.buckets), dtype=np.float64)
+        self.stamps = np.full((capacity, window.buckets), -1, dtype=np.int64)
+
+    def grow(self, capacity: int) -> None:
+        extra = capacity - len(self.counts)
+        width = self.window.buckets
+        self.counts = np.vstack([self.counts, np.zeros((extra, width), dtype=np.int32)])
+        self.sums = np.vstack([self.sums, np.zeros((extra, width))])
+        self.squares = np.vstack([self.squares, np.zeros((extra, width))])
+        self.stamps = np.vstack([self.stamps, np.full((extra, width), -1, dtype=np.int64)])
+
+    def clear(self, slots: np.ndarray) -> None:
+        self.counts[slots] = 0
+        self.sums[slots] = 0.0
+        self.squares[slots] = 0.0
+        self.stamps[slots] = -1
+
+    def add(self, slots: np.ndarray, seconds: np.ndarray, amounts: np.ndarray) -> None:
+        stamp = seconds // self.window.bucket_seconds
+        cells = slots * self.window.buckets + stamp % self.window.buckets
+        unique_cells, inverse = np.unique(cells, return_inverse=True)
+        newest = np.full(len(unique_cells), -1, dtype=np.int64)
+        np.maximum.at(newest, inverse, stamp)
+        stamps = self.stamps.reshape(-1)
+        stale = newest > stamps[unique_cells]
+        reset = unique_cells[stale]
+        self.counts.reshape(-1)[reset] = 0
+        self.sums.reshape(-1)[reset] = 0.0
+        self.squares.reshape(-1)[reset] = 0.0
+        stamps[reset] = newest[stale]
+        # Events whose ring position already moved on to a newer slice are too late to count.
+        live = stamps[cells] == stamp
+        np.add.at(self.counts.reshape(-1), cells[live], 1)
+        np.add.at(self.sums.reshape(-1), cells[live], amounts[live])
+        np.add.at(self.squares.reshape(-1), cells[live], amounts[live] ** 2)
+
+    def totals(self, slots: np.ndarray, now: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        current = now // self.window.bucket_seconds
+        live = self.stamps[slots] > current - self.window.buckets
+        return (
+            (self.counts[slots] * live).sum(axis=1),
+            (self.sums[slots] * live).sum(axis=1),
+            (self.squares[slots] * live).sum(axis=1),
+        )
+
+
+class WindowedAggregator:
+    """Rolling count/sum/mean/variance/z-score per user over several windows.
+
+    ``update`` folds a batch of events into the rings; ``snapshot`` reads the
+    aggregates as of the newest event time seen (the stream watermark), with
+    the z-score of each user's latest amount against its window. Users idle
+    for longer than the widest window are evicted first when the table is
+    full, then the least recently seen.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[Window] = DEFAULT_WINDOWS,
+        max_users: int = 2_000_000,
+        initial_capacity: int = 1024,
+    ) -> None:
+        self.windows = tuple(windows)
+        self.max_users = max_users
+        self.watermark = 0
+        capacity = min(initial_capacity, max_users)
+        self._rings = [_Ring(window, capacity) for window in self.windows]
+        self._last_seen = np.zeros(capacity, dtype=np.int64)
+        self._last_amount = np.zeros(capacity, dtype=np.float64)
+        self._index: dict[str, int] = {}
+        self._users: list[str | None] = [None] * capacity
+        self._free: list[int] = []
+        self._used = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def update(
+        self, user_ids: Sequence[str], seconds: Sequence[int], amounts: Sequence[float]
+    ) -> None:
+        if not user_ids:
+            return
+        slots = self._slots(user_ids)
+        seconds_arr = np.asarray(seconds, dtype=np.int64)
+        amounts_arr = np.asarray(amounts, dtype=np.float64)
+        for ring in self._rings:
+            ring.add(slots, seconds_arr, amounts_arr)
+        # Latest event per slot: first occurrence in the reversed, time-sorted batch.
+        order = np.argsort(seconds_arr, kind="stable")[::-1]
+        unique_slots, first = np.unique(slots[order], return_index=True)
+        latest = order[first]
+        newer = seconds_arr[latest] >= self._last_seen[unique_slots]
+        self._last_amount[unique_slots[newer]] = amounts_arr[latest[newer]]
+        self._last_seen[unique_slots[newer]] = seconds_arr[latest[newer]]
+        self.watermark = max(self.watermark, int(np.max(seconds_arr)))
+
+    def snapshot(self, user_ids: Sequence[str]) -> pd.DataFrame:
+        slots = np.fromiter((self._index[user_id] for user_id in user_ids), dtype=np.int64)
+        columns: dict[str, np.ndarray] = {}
+        latest = self._last_amount[slots]
+        for ring in self._rings:
+            count, total, squares = ring.totals(slots, self.watermark)
+            safe = np.maximum(count, 1)
+            mean = np.where(count > 0, total / safe, 0.0)
+            var = np.where(count > 0, np.maximum(squares / safe - mean**2, 0.0), 0.0)
+            std = np.sqrt(var)
+            zscore = np.divide(latest - mean, std, out=np.zeros_like(std), where=std > 0)
+            name = ring.window.name
+            columns[f"txn_count_{name}"] = count.astype(np.int64)
+            columns[f"amount_sum_{name}"] = total
+            columns[f"amount_mean_{name}"] = mean
+            columns[f"amount_var_{name}"] = var
+            columns[f"amount_zscore_{name}"] = zscore
+        frame = pd.DataFrame({"user_id": list(user_ids), **columns})
+        frame["event_ts"] = pd.to_datetime(self._last_seen[slots], unit="s", utc=True)
+        return frame
+
+    def _slots(self, user_ids: Sequence[str]) -> np.ndarray:
+        slots = np.empty(len(user_ids), dtype=np.int64)
+        batch: set[int] = set()
+        fresh: list[int] = []
+        for idx, user_id in enumerate(user_ids):
+            slot = self._index.get(user_id)
+            if slot is None:
+                slot = self._allocate(user_id, batch)
+                fresh.append(slot)
+            batch.add(slot)
+            slots[idx] = slot
+        if fresh:
+            cleared = np.array(fresh, dtype=np.int64)
+            for ring in self._rings:
+                ring.clear(cleared)
+            self._last_amount[cleared] = 0.0
+            self._last_seen[cleared] = 0
+        return slots
+
+    def _allocate(self, user_id: str, batch: set[int]) -> int:
+        if not self._free:
+            capacity = len(self._users)
+            if self._used < capacity:
+                self._free.append(self._used)
+                self._used += 1
+            elif capacity < self.max_users:
+                self._grow(min(capacity * 2, self.max_users))
+                self._free.append(self._used)
+                self._used += 1
+            else:
+                self._evict(batch)
+        slot = self._free.pop()
+        self._index[user_id] = slot
+        self._users[slot] = user_id
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - len(self._users)
+        for ring in self._rings:
+            ring.grow(capacity)
+        self._last_seen = np.concatenate([self._last_seen, np.zeros(extra, dtype=np.int64)])
+        self._last_amount = np.concatenate([self._last_amount, np.zeros(extra)])
+        self._users.extend([None] * extra)
+
+    def _evict(self, batch: set[int]) -> None:
+        # Slots already resolved for the batch being applied must survive it.
+        last_seen = self._last_seen.copy()
+        last_seen[list(batch)] = np.iinfo(np.int64).max
+        horizon = self.watermark - max(window.seconds for window in self.windows)
+        idle = np.flatnonzero(last_seen < horizon)
+        if len(idle) == 0:
+            count = min(max(1, len(self._users) // 100), len(self._users) - len(batch))
+            if count <= 0:
+                raise ValueError("max_users is smaller than the distinct users in one batch")
+            idle = np.argpartition(last_seen, count - 1)[:count]
+        for slot in idle.tolist():
+            user_id = self._users[slot]
+            if user_id is not None:
+                del self._index[user_id]
+                self._users[slot] = None
+                self._free.append(slot)
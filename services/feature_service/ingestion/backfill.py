@@ -0,0 +1,258 @@
+"""Replay a time range of the event topic into the online and offline stores.
+
+A backfill reads with its own group-less consumer: the live consumer group is
+never rebalanced and its committed offsets are never touched, so the live job
+keeps its partitions while a backfill runs in another process. Every partition
+is seeked to the first offset whose broker timestamp is at or after ``start``
+and read with large fetches up to the first offset at or after ``end`` (the
+end of the log when no end is given); the job then exits with a rows/sec
+report. ``max_rate`` (``BACKFILL_MAX_RATE``, 5k rows/sec by default; 0 lifts
+the cap) bounds the load a backfill adds to the brokers and to the online
+store the live job writes to.
+
+Rows go to the online store as latest-per-user batches and are appended to the
+hive-partitioned offline dataset. Rolling aggregates are not replayed; the
+live job rebuilds them from the stream. A replayed event is usually older than
+the value the live job already wrote for its user, and only the online store's
+event-timestamp check keeps it from overwriting that newer value: Feast's
+Redis store skips writes that are not newer than the stored timestamp, unless
+it is configured with ``skip_dedup``, which a backfill must not run against.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+from kafka import KafkaConsumer, TopicPartition
+
+from services.common.config import Settings, get_settings
+from services.common.fastpath import validate_event_fast
+from services.common.logging import configure_logging, get_logger
+from services.common.pubsub import FEATURE_UPDATES_CHANNEL, PubSub, get_feature_update_bus
+from services.common.schemas import Event
+from services.feature_service.ingestion.dead_letters import error_type
+from services.feature_service.ingestion.offline import PartitionedEventSink
+from services.feature_service.ingestion.stream_job import (
+    FEATURE_VIEW,
+    FeatureStore,
+    decode_message,
+    latest_rows,
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BackfillConfig:
+    topic: str
+    start: datetime
+    end: datetime | None = None
+    max_records: int = 10_000
+    poll_timeout_ms: int = 1_000
+    max_rate: float = 5_000.0  # rows/sec, 0 for unthrottled
+    online: bool = True
+
+    @classmethod
+    def from_settings(cls, settings: Settings, start: datetime, **overrides: Any) -> BackfillConfig:
+        config = cls(
+            topic=settings.event_topic,
+            start=start,
+            max_records=settings.backfill_max_records,
+            max_rate=settings.backfill_max_rate,
+        )
+        return replace(
+            config, **{key: value for key, value in overrides.items() if value is not None}
+        )
+
+
+@dataclass
+class BackfillReport:
+    partitions: int = 0
+    messages: int = 0
+    rows: int = 0
+    batches: int = 0
+    invalid: Counter[str] = field(default_factory=Counter)
+    elapsed_s: float = 0.0
+    offline_files: int = 0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.elapsed_s if self.elapsed_s else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "partitions": self.partitions,
+            "messages": self.messages,
+            "rows": self.rows,
+            "invalid": dict(self.invalid),
+            "batches": self.batches,
+            "offline_files": self.offline_files,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "rows_per_s": round(self.rows_per_s, 1),
+        }
+
+
+def _millis(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def offset_ranges(
+    consumer: Any, topic: str, start: datetime, end: datetime | None = None
+) -> dict[TopicPartition, tuple[int, int]]:
+    """``[first, stop)`` offsets per partition for messages timestamped in ``[start, end)``."""
+    partitions = [
+        TopicPartition(topic, idx) for idx in sorted(consumer.partitions_for_topic(topic) or ())
+    ]
+    if not partitions:
+        raise ValueError(f"Topic {topic!r} has no partitions")
+    log_end = consumer.end_offsets(partitions)
+    firsts = consumer.offsets_for_times({tp: _millis(start) for tp in partitions})
+    stops = consumer.offsets_for_times({tp: _millis(end) for tp in partitions}) if end else {}
+    ranges: dict[TopicPartition, tuple[int, int]] = {}
+    for tp in partitions:
+        # offsets_for_times gives None when no message is that recent.
+        first = firsts[tp].offset if firsts.get(tp) else log_end[tp]
+        stop = stops[tp].offset if stops.get(tp) else log_end[tp]
+        if first < stop:
+            ranges[tp] = (first, stop)
+    return ranges
+
+
+def run_backfill(
+    consumer: Any,
+    store: Any,
+    offline: PartitionedEventSink | None,
+    config: BackfillConfig,
+    updates: PubSub | None = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BackfillReport:
+    ranges = offset_ranges(consumer, config.topic, config.start, config.end)
+    report = BackfillReport(partitions=len(ranges))
+    consumer.assign(list(ranges))
+    for tp, (first, _) in ranges.items():
+        consumer.seek(tp, first)
+    remaining = {tp: stop for tp, (_, stop) in ranges.items()}
+    started = clock()
+    while remaining:
+        polled = consumer.poll(timeout_ms=config.poll_timeout_ms, max_records=config.max_records)
+        messages: list[Any] = []
+        for tp, records in polled.items():
+            stop = remaining.get(tp)
+            if stop is not None:
+                messages.extend(record for record in records if record.offset < stop)
+        # Positions also move past compacted gaps and transaction markers, so check them
+        # rather than the last offset seen.
+        finished = [tp for tp, stop in remaining.items() if consumer.position(tp) >= stop]
+        for tp in finished:
+            del remaining[tp]
+        if finished:
+            consumer.pause(*finished)
+        if messages:
+            _write_batch(messages, store, offline, config, updates, report)
+        if config.max_rate > 0:
+            ahead = report.rows / config.max_rate - (clock() - started)
+            if ahead > 0:
+                sleep(ahead)
+    if offline is not None:
+        offline.close()
+        report.offline_files = len(offline.files)
+    report.elapsed_s = clock() - started
+    return report
+
+
+def _write_batch(
+    messages: list[Any],
+    store: Any,
+    offline: PartitionedEventSink | None,
+    config: BackfillConfig,
+    updates: PubSub | None,
+    report: BackfillReport,
+) -> None:
+    events: list[Event] = []
+    for message in messages:
+        try:
+            events.append(validate_event_fast(decode_message(message)))
+        except Exception as exc:  # count and skip, as the stream job dead-letters them
+            report.invalid[error_type(exc)] += 1
+    report.messages += len(messages)
+    report.batches += 1
+    if not events:
+        return
+    created_at = pd.Timestamp.now(tz="UTC")
+    if config.online:
+        frame = latest_rows(events)
+        store.write_to_online_store(feature_view_name=FEATURE_VIEW, df=frame)
+        if updates is not None:
+            for user_id in frame["user_id"]:
+                updates.publish(FEATURE_UPDATES_CHANNEL, user_id)
+    if offline is not None:
+        offline.append_events(events, created_at)
+    report.rows += len(events)
+
+
+def build_backfill_consumer(settings: Settings) -> KafkaConsumer:
+    # No group_id: offsets are assigned and never committed, so the live group is left alone.
+    return KafkaConsumer(
+        bootstrap_servers=settings.kafka_brokers,
+        group_id=None,
+        enable_auto_commit=False,
+        max_poll_records=settings.backfill_max_records,
+        fetch_max_bytes=settings.backfill_fetch_max_bytes,
+        max_partition_fetch_bytes=settings.backfill_fetch_max_bytes,
+        fetch_min_bytes=1024**2,
+        fetch_max_wait_ms=100,
+        receive_buffer_bytes=4 * 1024**2,
+    )
+
+
+def _timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill a time range of events into Feast")
+    parser.add_argument("--start", type=_timestamp, required=True, help="ISO-8601, inclusive")
+    parser.add_argument("--end", type=_timestamp, help="ISO-8601, exclusive (default: log end)")
+    parser.add_argument("--topic", help="Source topic (default: EVENT_TOPIC)")
+    parser.add_argument("--max-rate", type=float, help="Rows/sec cap (default: BACKFILL_MAX_RATE)")
+    parser.add_argument("--offline-only", action="store_true", help="Skip the online store")
+    parser.add_argument("--report-json", type=Path, help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    settings = get_settings()
+    config = BackfillConfig.from_settings(
+        settings,
+        args.start,
+        end=args.end,
+        topic=args.topic,
+        max_rate=args.max_rate,
+        online=not args.offline_only,
+    )
+    consumer = build_backfill_consumer(settings)
+    store = FeatureStore(repo_path=settings.feast_repo_path) if config.online else None
+    offline = PartitionedEventSink.from_settings(settings)
+    try:
+        report = run_backfill(consumer, store, offline, config, get_feature_update_bus())
+    finally:
+        consumer.close()
+    summary = {**report.summary(), "run_id": offline.run_id}
+    logger.info("Backfill finished: %s", summary)
+    if args.report_json:
+        args.report_json.write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,62 @@
+import argparse
 import os
-from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
 
 from services.common.config import get_settings
-from services.common.data import SyntheticEventGenerator
+from services.common.data import ColumnarEventGenerator
 from services.common.logging import configure_logging, get_logger
+from services.feature_service.ingestion.offline import PartitionedEventSink, StreamingEventWriter
 
 logger = get_logger(__name__)
 
 
-def run() -> None:
+def run(
+    rows: int = 500,
+    streaming: bool = False,
+    chunk_rows: int | None = None,
+    row_group_size: int | None = None,
+    compression: str | None = None,
+) -> None:
+    """Append ``rows`` synthetic events to the offline store.
+
+    The default mode builds them as one table. ``streaming`` generates
+    ``chunk_rows`` at a time and writes each through open per-hour parquet
+    writers, so memory stays flat whatever ``rows`` is.
+    """
     configure_logging()
-    get_settings()
-    output = Path("data/sample/events.parquet")
-    generator = SyntheticEventGenerator()
-    events = [event.model_dump() for event in generator.stream(batch_size=500)]
-    df = pd.DataFrame(events)
-    df["created_at"] = pd.Timestamp.utcnow()
-    output.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(output, index=False)
-    logger.info("Wrote %s rows to %s", len(df), output)
+    settings = get_settings()
+    created_at = pd.Timestamp.now(tz="UTC")
+    sink: StreamingEventWriter | PartitionedEventSink
+    if streaming:
+        sink = writer = StreamingEventWriter.from_settings(
+            settings, row_group_size=row_group_size, compression=compression
+        )
+        chunks = ColumnarEventGenerator().tables(rows, chunk_rows or settings.batch_chunk_rows)
+        for table in chunks:
+            stamp = pa.repeat(pa.scalar(created_at, pa.timestamp("us", tz="UTC")), table.num_rows)
+            writer.write(table.append_column("created_at", stamp))
+    else:
+        sink = buffered = PartitionedEventSink.from_settings(settings)
+        df = ColumnarEventGenerator().frame(rows)
+        df["created_at"] = created_at
+        buffered.append(pa.Table.from_pandas(df, preserve_index=False))
+    sink.close()
+    logger.info("Appended %s rows to %s (run %s)", sink.rows_written, sink.root, sink.run_id)
     os.environ.setdefault("FEAST_IS_LOCAL_TEST", "1")
 
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Append synthetic events to the offline store")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--streaming", action="store_true", help="Write in constant memory")
+    parser.add_argument("--chunk-rows", type=int, help="Default: BATCH_CHUNK_ROWS")
+    parser.add_argument("--row-group-size", type=int, help="Default: OFFLINE_ROW_GROUP_SIZE")
+    parser.add_argument("--compression", help="Default: OFFLINE_COMPRESSION")
+    args = parser.parse_args(argv)
+    run(args.rows, args.streaming, args.chunk_rows, args.row_group_size, args.compression)
+
+
 if __name__ == "__main__":
-    run()
+    main()
@@ -0,0 +1,295 @@
+"""Dead-letter routing for events the stream job cannot ingest.
+
+Records that fail to decode or validate are split out of their batch and sent,
+with the error and their original topic/partition/offset, to a JSONL file or a
+Kafka topic before the batch's offsets are committed. ``replay`` re-produces
+them, untouched, onto the event topic once the cause is fixed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from pydantic import ValidationError
+
+from services.common.config import Settings, get_settings
+from services.common.logging import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+ERROR_HEADER = "x-dead-letter-error"
+ERROR_TYPE_HEADER = "x-dead-letter-error-type"
+SOURCE_HEADER = "x-dead-letter-source"
+
+
+def error_type(exc: BaseException) -> str:
+    """Stable, low-cardinality name for a rejection, e.g. ``transaction_amount.less_than_equal``."""
+    if isinstance(exc, ValidationError):
+        first = exc.errors()[0]
+        return ".".join([*map(str, first["loc"]), first["type"]])
+    return type(exc).__name__
+
+
+@dataclass
+class DeadLetter:
+    topic: str
+    partition: int
+    offset: int
+    error_type: str
+    error: str
+    value: bytes
+    key: bytes | None = None
+    headers: list[tuple[str, bytes]] = field(default_factory=list)
+    failed_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_message(cls, message: Any, exc: BaseException) -> DeadLetter:
+        value = message.value
+        if not isinstance(value, (bytes, bytearray, memoryview)):
+            # Consumers built with a value_deserializer hand over decoded payloads.
+            value = json.dumps(value, default=str).encode("utf-8")
+        return cls(
+            topic=message.topic,
+            partition=message.partition,
+            offset=message.offset,
+            error_type=error_type(exc),
+            error=str(exc),
+            value=bytes(value),
+            key=getattr(message, "key", None),
+            headers=list(getattr(message, "headers", None) or []),
+        )
+
+    def to_json(self) -> str:
+        payload = asdict(self)
+        payload["value"] = base64.b64encode(self.value).decode("ascii")
+        payload["key"] = self.key.decode("utf-8", "replace") if self.key is not None else None
+        payload["headers"] = [
+            [name, base64.b64encode(value).decode("ascii")] for name, value in self.headers
+        ]
+        return json.dumps(payload)
+
+    @classmethod
+    def from_json(cls, line: str) -> DeadLetter:
+        payload = json.loads(line)
+        payload["value"] = base64.b64decode(payload["value"])
+        if payload["key"] is not None:
+            payload["key"] = payload["key"].encode("utf-8")
+        payload["headers"] = [(name, base64.b64decode(value)) for name, value in payload["headers"]]
+        return cls(**payload)
+
+
+class FileDeadLetterSink:
+    """Appends dead letters to a JSONL file; each batch is one ``O_APPEND`` write."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def write(self, letters: list[DeadLetter]) -> None:
+        if not letters:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(letter.to_json() + "\n" for letter in letters).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def read(self) -> Iterator[DeadLetter]:
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield DeadLetter.from_json(line)
+
+
+class KafkaDeadLetterSink:
+    """Produces the original key/value to a dead-letter topic, the error riding in headers."""
+
+    def __init__(self, producer: Any, topic: str, timeout_s: float = 30.0) -> None:
+        self.producer = producer
+        self.topic = topic
+        self.timeout_s = timeout_s
+
+    def write(self, letters: list[DeadLetter]) -> None:
+        futures = [
+            self.producer.send(
+                self.topic,
+                value=letter.value,
+                key=letter.key,
+                headers=[
+                    *letter.headers,
+                    (ERROR_TYPE_HEADER, letter.error_type.encode("utf-8")),
+                    (ERROR_HEADER, letter.error.encode("utf-8")[:1024]),
+                    (
+                        SOURCE_HEADER,
+                        f"{letter.topic}/{letter.partition}/{letter.offset}".encode("ascii"),
+                    ),
+                ],
+            )
+            for letter in letters
+        ]
+        for future in futures:
+            future.get(timeout=self.timeout_s)  # raise before the source offsets are committed
+
+
+def build_dead_letter_sink(settings: Settings) -> FileDeadLetterSink | KafkaDeadLetterSink:
+    if settings.stream_dead_letter_sink == "kafka":
+        from kafka import KafkaProducer
+
+        producer = KafkaProducer(bootstrap_servers=settings.kafka_brokers, acks="all")
+        return KafkaDeadLetterSink(producer, settings.stream_dead_letter_topic)
+    if settings.stream_dead_letter_sink == "file":
+        return FileDeadLetterSink(settings.stream_dead_letter_path)
+    raise ValueError(f"Unknown STREAM_DEAD_LETTER_SINK {settings.stream_dead_letter_sink!r}")
+
+
+def replay(
+    letters: Iterable[DeadLetter], producer: Any, topic: str, timeout_s: float = 30.0
+) -> list[DeadLetter]:
+    """Re-produce dead letters onto ``topic`` unchanged; returns the ones the broker acked."""
+    letters = list(letters)
+    futures = [
+        producer.send(topic, value=letter.value, key=letter.key, headers=letter.headers)
+        for letter in letters
+    ]
+    producer.flush()
+    delivered = []
+    for letter, future in zip(letters, futures, strict=True):
+        try:
+            future.get(timeout=timeout_s)
+        except Exception as exc:
+            logger.warning(
+                "Replay of %s/%s/%s failed: %s", letter.topic, letter.partition, letter.offset, exc
+            )
+            continue
+        delivered.append(letter)
+    return delivered
+
+
+def replay_file(
+    sink: FileDeadLetterSink, producer: Any, topic: str, error_types: set[str] | None = None
+) -> int:
+    """Replay the selected letters and archive the delivered ones in ``*.replayed.jsonl``.
+
+    The live file is first moved aside so the stream job can keep appending while
+    the snapshot is replayed; a snapshot left by an interrupted run is picked up.
+    Letters that were not selected or not delivered go back to the live file.
+    """
+    snapshot = sink.path.with_suffix(".replaying.jsonl")
+    if not snapshot.exists() and sink.path.exists():
+        os.replace(sink.path, snapshot)
+    letters = list(FileDeadLetterSink(snapshot).read())
+    chosen = [letter for letter in letters if not error_types or letter.error_type in error_types]
+    delivered = replay(chosen, producer, topic)
+    sent = {id(letter) for letter in delivered}
+    FileDeadLetterSink(sink.path.with_suffix(".replayed.jsonl")).write(delivered)
+    sink.write([letter for letter in letters if id(letter) not in sent])
+    snapshot.unlink(missing_ok=True)
+    return len(delivered)
+
+
+def build_replay_consumer(settings: Settings) -> Any:
+    from kafka import KafkaConsumer
+
+    consumer = KafkaConsumer(
+        bootstrap_servers=settings.kafka_brokers,
+        group_id=f"{settings.stream_consumer_group}-dead-letter-replay",
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+    )
+    consumer.subscribe([settings.stream_dead_letter_topic])
+    return consumer
+
+
+def replay_topic(
+    settings: Settings,
+    producer: Any,
+    topic: str,
+    error_types: set[str] | None = None,
+    consumer: Any = None,
+    idle_timeout_ms: int = 5_000,
+) -> int:
+    """Drain the dead-letter topic under its own consumer group, replaying the selected letters.
+
+    Letters filtered out by ``error_types`` are produced back onto the
+    dead-letter topic, error headers intact, so a later run can still replay
+    them. Offsets are committed only once every letter read has been delivered
+    to one topic or the other; otherwise the next run reads them all again.
+    """
+    consumer = consumer or build_replay_consumer(settings)
+    dead_letter_topic = settings.stream_dead_letter_topic
+    try:
+        chosen: list[DeadLetter] = []
+        skipped: list[DeadLetter] = []
+        while polled := consumer.poll(timeout_ms=idle_timeout_ms):
+            for message in (message for records in polled.values() for message in records):
+                meta = dict(message.headers or [])
+                kind = meta.get(ERROR_TYPE_HEADER, b"").decode("utf-8")
+                letter = DeadLetter(
+                    topic=dead_letter_topic,
+                    partition=message.partition,
+                    offset=message.offset,
+                    error_type=kind,
+                    error=meta.get(ERROR_HEADER, b"").decode("utf-8"),
+                    value=message.value,
+                    key=message.key,
+                    headers=list(message.headers or []),
+                )
+                if error_types and kind not in error_types:
+                    skipped.append(letter)
+                    continue
+                letter.headers = [
+                    (name, value)
+                    for name, value in letter.headers
+                    if name not in (ERROR_HEADER, ERROR_TYPE_HEADER, SOURCE_HEADER)
+                ]
+                chosen.append(letter)
+        delivered = replay(chosen, producer, topic)
+        requeued = replay(skipped, producer, dead_letter_topic)
+        if len(delivered) < len(chosen) or len(requeued) < len(skipped):
+            raise RuntimeError(
+                f"{len(chosen) - len(delivered) + len(skipped) - len(requeued)} dead letters "
+                "were not delivered; offsets left uncommitted so the next run retries them"
+            )
+        consumer.commit()
+        return len(delivered)
+    finally:
+        consumer.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay dead-lettered events onto the event topic")
+    parser.add_argument("--error-type", action="append", help="Only replay these error types")
+    parser.add_argument("--topic", help="Destination topic (default: EVENT_TOPIC)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    settings = get_settings()
+    from kafka import KafkaProducer
+
+    producer = KafkaProducer(bootstrap_servers=settings.kafka_brokers, acks="all")
+    topic = args.topic or settings.event_topic
+    error_types = set(args.error_type or [])
+    try:
+        if settings.stream_dead_letter_sink == "kafka":
+            sent = replay_topic(settings, producer, topic, error_types)
+        else:
+            sink = FileDeadLetterSink(settings.stream_dead_letter_path)
+            sent = replay_file(sink, producer, topic, error_types)
+    finally:
+        producer.close()
+    logger.info("Replayed %d dead letters onto %s", sent, topic)
+
+
+if __name__ == "__main__":
+    main()
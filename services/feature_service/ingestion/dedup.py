@@ -0,0 +1,167 @@
+"""Memory-bounded ``event_id`` deduplication for the stream job.
+
+A ring of Bloom filters, each covering one slice of event time. Retries and
+replays carry the original ``event_ts``, so a duplicate is looked up in the
+slice its first copy went into; slices that fall out of the window are
+cleared for reuse, which keeps memory fixed. A lookup only probes the filter
+of its own slice, so each filter is sized for ``fp_rate`` at ``capacity``
+events per slice; a false positive drops a genuinely new event.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from services.common.config import Settings
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finaliser: a second, independent-looking hash from the first.
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+class BloomFilter:
+    def __init__(self, bits: int, hashes: int) -> None:
+        self.bits = max(64, bits - bits % 8)
+        self.hashes = max(1, hashes)
+        self.array = np.zeros(self.bits // 8, dtype=np.uint8)
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+
+    def positions(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        return (h1[:, None] + steps * h2[:, None]) % np.uint64(self.bits)
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        hits = (self.array[positions >> np.uint64(3)] >> (positions & np.uint64(7))) & 1
+        return hits.all(axis=1)
+
+    def add(self, positions: np.ndarray) -> None:
+        np.bitwise_or.at(
+            self.array,
+            (positions >> np.uint64(3)).ravel(),
+            (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)).ravel(),
+        )
+        self.count += len(positions)
+
+    def clear(self) -> None:
+        self.array.fill(0)
+        self.count = 0
+
+    def false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+
+@dataclass
+class Pending:
+    """Hashes of the new events in a batch, added once the batch is committed."""
+
+    h1: np.ndarray
+    h2: np.ndarray
+    slices: np.ndarray
+    checked: int = 0
+    duplicates: int = 0
+
+
+class EventDeduplicator:
+    """Approximate "seen before" test over ``event_id`` within ``window_s`` of event time."""
+
+    def __init__(
+        self,
+        window_s: float = 3600.0,
+        partitions: int = 6,
+        fp_rate: float = 0.001,
+        memory_bytes: int = 64 * 1024**2,
+    ) -> None:
+        self.slice_s = window_s / partitions
+        self.partitions = partitions
+        self.fp_rate = fp_rate
+        bits = memory_bytes * 8 // partitions
+        # Events per slice at which a filter reaches ``fp_rate``.
+        self.capacity = int(bits * math.log(2) ** 2 / -math.log(fp_rate))
+        hashes = round(-math.log(fp_rate) / math.log(2))
+        self._filters = [BloomFilter(bits, hashes) for _ in range(partitions)]
+        self._slices = np.full(partitions, np.iinfo(np.int64).min, dtype=np.int64)
+        self.watermark = np.iinfo(np.int64).min
+        self.checked = 0
+        self.duplicates = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bloom.nbytes for bloom in self._filters)
+
+    def hit_rate(self) -> float:
+        return self.duplicates / self.checked if self.checked else 0.0
+
+    def false_positive_rate(self) -> float:
+        """Estimated rate of the fullest filter."""
+        return max(bloom.false_positive_rate() for bloom in self._filters)
+
+    def check(
+        self, event_ids: Sequence[str], seconds: Sequence[float]
+    ) -> tuple[np.ndarray, Pending]:
+        """Flag repeats of committed events or of earlier rows in this batch.
+
+        Nothing is recorded until :meth:`commit`, so a batch that fails to
+        write is checked afresh when it is retried.
+        """
+        h1 = np.fromiter(
+            (hash(event_id) & _MASK64 for event_id in event_ids), np.uint64, len(event_ids)
+        )
+        h2 = _mix(h1) | np.uint64(1)
+        slices = (np.asarray(seconds, dtype=np.float64) // self.slice_s).astype(np.int64)
+        duplicate = np.zeros(len(h1), dtype=bool)
+        for ring, bloom in enumerate(self._filters):
+            rows = np.flatnonzero(self._slices[ring] == slices)
+            if len(rows):
+                duplicate[rows] = bloom.contains(bloom.positions(h1[rows], h2[rows]))
+        _, first = np.unique(h1, return_index=True)
+        repeated = np.ones(len(h1), dtype=bool)
+        repeated[first] = False
+        duplicate |= repeated
+        fresh = ~duplicate
+        return duplicate, Pending(
+            h1[fresh], h2[fresh], slices[fresh], len(h1), int(duplicate.sum())
+        )
+
+    def commit(self, pending: Pending) -> None:
+        self.checked += pending.checked
+        self.duplicates += pending.duplicates
+        if not len(pending.h1):
+            return
+        self.watermark = max(self.watermark, int(pending.slices.max()))
+        for current in np.unique(pending.slices).tolist():
+            if current <= self.watermark - self.partitions:
+                continue  # older than the window: nothing left to compare against
+            ring = current % self.partitions
+            if self._slices[ring] < current:
+                # The ring position's previous slice has left the window; reuse it.
+                self._filters[ring].clear()
+                self._slices[ring] = current
+            if self._slices[ring] == current:
+                rows = pending.slices == current
+                bloom = self._filters[ring]
+                bloom.add(bloom.positions(pending.h1[rows], pending.h2[rows]))
+
+
+def build_deduplicator(settings: Settings) -> EventDeduplicator | None:
+    if not settings.stream_dedup_enabled:
+        return None
+    return EventDeduplicator(
+        window_s=settings.stream_dedup_window_s,
+        partitions=settings.stream_dedup_partitions,
+        fp_rate=settings.stream_dedup_fp_rate,
+        memory_bytes=settings.stream_dedup_memory_mb * 1024**2,
+    )
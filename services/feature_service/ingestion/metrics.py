@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+    values,
+)
+
+# Feast sets PROMETHEUS_MULTIPROC_DIR on import, so the value backend (and with
+# it whether worker processes share metrics through mmap files) is decided by
+# whichever import wins; check what prometheus_client actually picked.
+MULTIPROCESS_MODE = values.ValueClass is not values.MutexValue
+
+INGEST_MESSAGES = Counter(
+    "stream_ingest_messages_total",
+    "Messages written to the online store and committed",
+    labelnames=("worker",),
+)
+
+INGEST_THROUGHPUT = Gauge(
+    "stream_ingest_worker_throughput",
+    "Messages per second committed by a worker over its last report interval",
+    labelnames=("worker",),
+    multiprocess_mode="livesum",
+)
+
+INGEST_PARTITION_LAG = Gauge(
+    "stream_ingest_partition_lag",
+    "Messages between a partition's committed position and its high watermark",
+    labelnames=("partition",),
+    multiprocess_mode="livesum",
+)
+
+INGEST_WRITE_LATENCY = Histogram(
+    "stream_ingest_write_latency_seconds",
+    "Latency of one micro-batch write to the online store",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    labelnames=("feature_view",),
+)
+
+INGEST_VALIDATION_FAILURES = Counter(
+    "stream_ingest_validation_failures_total",
+    "Messages that could not be decoded or failed Event validation",
+    labelnames=("reason",),
+)
+
+INGEST_DUPLICATES = Counter(
+    "stream_ingest_duplicates_total",
+    "Messages dropped because their event_id was already ingested",
+    labelnames=("worker",),
+)
+
+INGEST_DEDUP_MEMORY = Gauge(
+    "stream_ingest_dedup_memory_bytes",
+    "Memory held by a worker's event_id dedup filters",
+    labelnames=("worker",),
+    multiprocess_mode="livesum",
+)
+
+INGEST_FRESHNESS = Histogram(
+    "stream_ingest_freshness_seconds",
+    "Time from an event's event_ts to its features landing in the online store",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+
+def prepare_multiprocess_dir() -> None:
+    """Give spawned workers a shared metrics dir; they pick it up when importing prometheus_client."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="ingestion-metrics-")
+
+
+def serve_metrics(port: int, worker_processes: bool = False) -> None:
+    """Expose ingestion metrics over HTTP, merging in what worker processes recorded."""
+    registry = REGISTRY
+    if MULTIPROCESS_MODE or worker_processes:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if not MULTIPROCESS_MODE:
+            # The supervisor's own gauges live in this process's memory, not the shared files.
+            registry.register(INGEST_PARTITION_LAG)
+            registry.register(INGEST_THROUGHPUT)
+    start_http_server(port, registry=registry)
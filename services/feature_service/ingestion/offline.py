@@ -0,0 +1,473 @@
+"""Append-only, hive-partitioned (``date=YYYY-MM-DD/hour=HH``) parquet event store.
+
+Writers buffer rows and emit files sorted by ``event_ts`` in sized row groups,
+so row-group statistics prune well; file names carry a per-run id, so
+concurrent or repeated runs never overwrite one another and a bad run can be
+removed by its id. The stream job instead names its files after the Kafka
+partition and first offset of each micro-batch, so a replayed batch replaces
+its earlier copy. Frequent small appends are merged per partition by
+``compact``. Reads prune
+``date``/``hour`` directories and push the ``event_ts`` range down to the
+row-group statistics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from services.common.config import Settings, get_settings
+from services.common.logging import configure_logging, get_logger
+from services.common.schemas import Event
+
+logger = get_logger(__name__)
+
+EVENT_SCHEMA = pa.schema(
+    [
+        ("event_id", pa.string()),
+        ("user_id", pa.string()),
+        ("transaction_amount", pa.float64()),
+        ("country", pa.string()),
+        ("device", pa.string()),
+        ("event_ts", pa.timestamp("us", tz="UTC")),
+        ("label", pa.int64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ]
+)
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("hour", pa.int8())]), flavor="hive"
+)
+
+
+def with_partition_columns(table: pa.Table) -> pa.Table:
+    event_ts = table["event_ts"]
+    return table.append_column("date", pc.strftime(event_ts, format="%Y-%m-%d")).append_column(
+        "hour", pc.hour(event_ts).cast(pa.int8())
+    )
+
+
+def events_table(events: Sequence[Event], created_at: object) -> pa.Table:
+    columns = {
+        "event_id": [event.event_id for event in events],
+        "user_id": [event.user_id for event in events],
+        "transaction_amount": [event.transaction_amount for event in events],
+        "country": [event.country for event in events],
+        "device": [event.device for event in events],
+        "event_ts": [event.event_ts for event in events],
+        "label": [event.label for event in events],
+        "created_at": [created_at] * len(events),
+    }
+    return pa.Table.from_pydict(columns, schema=EVENT_SCHEMA)
+
+
+class PartitionedEventSink:
+    """Buffers events and appends them to the dataset under ``root``."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        rows_per_flush: int = 250_000,
+        row_group_size: int = 128_000,
+        compression: str = "zstd",
+        run_id: str | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.rows_per_flush = rows_per_flush
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.rows_written = 0
+        self.files: list[str] = []
+        self._tables: list[pa.Table] = []
+        self._buffered = 0
+        self._flushes = 0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        root: str | Path | None = None,
+        rows_per_flush: int = 250_000,
+        run_id: str | None = None,
+    ) -> PartitionedEventSink:
+        return cls(
+            root or settings.offline_events_path,
+            rows_per_flush=rows_per_flush,
+            row_group_size=settings.offline_row_group_size,
+            compression=settings.offline_compression,
+            run_id=run_id,
+        )
+
+    def append_events(self, events: Iterable[Event], created_at: object) -> None:
+        events = list(events)
+        if events:
+            self.append(events_table(events, created_at))
+
+    def append(self, table: pa.Table) -> None:
+        self._tables.append(table.select(EVENT_SCHEMA.names).cast(EVENT_SCHEMA))
+        self._buffered += table.num_rows
+        if self._buffered >= self.rows_per_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffered:
+            return
+        table = pa.concat_tables(self._tables)
+        # A failed write keeps the buffer; the retry reuses the file names, overwriting any
+        # partitions it already wrote.
+        self._write(table, f"part-{self.run_id}-{self._flushes:05d}-{{i}}.parquet")
+        self._tables, self._buffered = [], 0
+        self._flushes += 1
+
+    def write_keyed(self, table: pa.Table, key: str) -> None:
+        """Write ``table`` now as the files for ``key``, replacing whatever ``key`` held before.
+
+        Writing a key again leaves only the new rows, even when they fall in fewer
+        partitions than the first write did; an empty table just removes them.
+        """
+        earlier = set(self.root.glob(f"date=*/hour=*/part-{key}-*.parquet"))
+        written = set()
+        if table.num_rows:
+            table = table.select(EVENT_SCHEMA.names).cast(EVENT_SCHEMA)
+            written = {Path(path) for path in self._write(table, f"part-{key}-{{i}}.parquet")}
+        for stale in earlier - written:
+            stale.unlink(missing_ok=True)
+
+    def _write(self, table: pa.Table, basename_template: str) -> list[str]:
+        table = with_partition_columns(table.sort_by("event_ts"))
+        files: list[str] = []
+        ds.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=basename_template,
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=self.compression),
+            min_rows_per_group=min(self.row_group_size, table.num_rows),
+            max_rows_per_group=self.row_group_size,
+            file_visitor=lambda written: files.append(written.path),
+        )
+        self.files.extend(files)
+        self.rows_written += table.num_rows
+        return files
+
+    def close(self) -> None:
+        self.flush()
+
+
+_HOUR_US = 3_600_000_000
+
+
+class _PartitionFile:
+    """An open parquet file in one partition, written a full row group at a time."""
+
+    def __init__(self, directory: Path, name: str, row_group_size: int, compression: str) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Readers and compaction skip "_"-prefixed files until the footer is written.
+        self.staging = directory / f"_{name}"
+        self.path = directory / name
+        self.row_group_size = row_group_size
+        self.writer = pq.ParquetWriter(self.staging, EVENT_SCHEMA, compression=compression)
+        self._pending: list[pa.Table] = []
+        self._buffered = 0
+
+    def write(self, table: pa.Table) -> None:
+        self._pending.append(table)
+        self._buffered += table.num_rows
+        if self._buffered < self.row_group_size:
+            return
+        pending = pa.concat_tables(self._pending)
+        full = self._buffered - self._buffered % self.row_group_size
+        self.writer.write_table(pending.slice(0, full), row_group_size=self.row_group_size)
+        rest = pending.slice(full)
+        self._pending, self._buffered = ([rest] if rest.num_rows else []), rest.num_rows
+
+    def close(self) -> None:
+        if self._buffered:
+            self.writer.write_table(pa.concat_tables(self._pending))
+        self.writer.close()
+        os.replace(self.staging, self.path)
+
+
+class StreamingEventWriter:
+    """Writes time-ordered chunks through one open ``ParquetWriter`` per hour partition.
+
+    Unlike :class:`PartitionedEventSink`, at most one row group per open
+    partition is held in memory, so memory stays flat however many rows a run
+    writes. A partition's file is closed once a chunk reaches a later hour, so a
+    run leaves one file per hour made of full row groups; rows for an hour that
+    was already closed start another file.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        row_group_size: int = 128_000,
+        compression: str = "zstd",
+        run_id: str | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.rows_written = 0
+        self.files: list[str] = []
+        self._open: dict[int, _PartitionFile] = {}
+        self._opened = 0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        root: str | Path | None = None,
+        row_group_size: int | None = None,
+        compression: str | None = None,
+        run_id: str | None = None,
+    ) -> StreamingEventWriter:
+        return cls(
+            root or settings.offline_events_path,
+            row_group_size=row_group_size or settings.offline_row_group_size,
+            compression=compression or settings.offline_compression,
+            run_id=run_id,
+        )
+
+    def write(self, table: pa.Table) -> None:
+        table = table.select(EVENT_SCHEMA.names).cast(EVENT_SCHEMA).sort_by("event_ts")
+        if not table.num_rows:
+            return
+        hours = pc.cast(table["event_ts"], pa.int64()).to_numpy() // _HOUR_US
+        starts = [0, *(np.flatnonzero(np.diff(hours)) + 1).tolist(), table.num_rows]
+        for start, end in zip(starts, starts[1:], strict=False):
+            self._partition(int(hours[start])).write(table.slice(start, end - start))
+        for hour in [hour for hour in self._open if hour < hours[-1]]:
+            self._close(hour)
+        self.rows_written += table.num_rows
+
+    def _partition(self, hour: int) -> _PartitionFile:
+        if hour not in self._open:
+            start = datetime.fromtimestamp(hour * 3600, tz=timezone.utc)
+            directory = self.root / f"date={start:%Y-%m-%d}" / f"hour={start.hour}"
+            name = f"part-{self.run_id}-{self._opened:05d}-0.parquet"
+            self._open[hour] = _PartitionFile(
+                directory, name, self.row_group_size, self.compression
+            )
+            self._opened += 1
+        return self._open[hour]
+
+    def _close(self, hour: int) -> None:
+        partition = self._open.pop(hour)
+        partition.close()
+        self.files.append(str(partition.path))
+
+    def close(self) -> None:
+        for hour in sorted(self._open):
+            self._close(hour)
+
+
+def build_offline_sink(settings: Settings) -> PartitionedEventSink | None:
+    if not settings.stream_offline_sink_enabled:
+        return None
+    return PartitionedEventSink.from_settings(settings)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def partition_filter(start: datetime | None, end: datetime | None) -> ds.Expression | None:
+    """``date``/``hour`` predicate selecting the partitions that can hold ``[start, end)``."""
+    date, hour = ds.field("date"), ds.field("hour")
+    bounds = []
+    if start is not None:
+        start = _utc(start)
+        day = start.strftime("%Y-%m-%d")
+        bounds.append((date > day) | ((date == day) & (hour >= start.hour)))
+    if end is not None:
+        end = _utc(end)
+        day = end.strftime("%Y-%m-%d")
+        bounds.append((date < day) | ((date == day) & (hour <= end.hour)))
+    return _all(bounds)
+
+
+def _all(expressions: Sequence[ds.Expression]) -> ds.Expression | None:
+    combined = None
+    for expression in expressions:
+        combined = expression if combined is None else combined & expression
+    return combined
+
+
+def dataset(root: str | Path) -> ds.Dataset:
+    superseded = _superseded(Path(root))
+    if not superseded:
+        return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    # A compaction was interrupted after publishing: leave out the inputs it replaced.
+    files = [
+        str(path)
+        for path in sorted(Path(root).glob("date=*/hour=*/*.parquet"))
+        if not path.name.startswith(("_", ".")) and path not in superseded
+    ]
+    return ds.dataset(
+        files, format="parquet", partitioning=PARTITIONING, partition_base_dir=str(root)
+    )
+
+
+def read_events(
+    root: str | Path,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    columns: list[str] | None = None,
+    predicate: ds.Expression | None = None,
+) -> pa.Table:
+    """Events with ``start <= event_ts < end``, reading only the partitions and row groups needed."""
+    if not Path(root).exists():
+        return EVENT_SCHEMA.empty_table().select(columns or EVENT_SCHEMA.names)
+    ts = ds.field("event_ts")
+    predicates = [partition_filter(start, end)]
+    if start is not None:
+        predicates.append(ts >= _utc(start))
+    if end is not None:
+        predicates.append(ts < _utc(end))
+    predicates.append(predicate)
+    return dataset(root).to_table(
+        columns=columns, filter=_all([p for p in predicates if p is not None])
+    )
+
+
+@dataclass
+class CompactionReport:
+    partitions: int = 0
+    files_in: int = 0
+    files_out: int = 0
+    rows: int = 0
+
+
+def _partition_start(directory: Path) -> datetime:
+    day = directory.parent.name.split("=", 1)[1]
+    hour = int(directory.name.split("=", 1)[1])
+    return datetime.fromisoformat(day).replace(hour=hour, tzinfo=timezone.utc)
+
+
+def _journals(directory: Path) -> list[tuple[Path, Path, list[Path]]]:
+    """``(journal, published file, inputs)`` of each compaction not yet cleaned up."""
+    journals = []
+    for journal in sorted(directory.glob("_compact-*.inputs")):
+        run_id = journal.stem.removeprefix("_compact-")
+        inputs = [directory / name for name in journal.read_text().split()]
+        journals.append((journal, directory / f"part-compacted-{run_id}-0.parquet", inputs))
+    return journals
+
+
+def _superseded(root: Path) -> set[Path]:
+    return {
+        path
+        for directory in root.glob("date=*/hour=*")
+        for _, published, inputs in _journals(directory)
+        if published.exists()
+        for path in inputs
+    }
+
+
+def _finish_interrupted(directory: Path) -> None:
+    """Complete or roll back compactions that stopped before removing their journal."""
+    for journal, published, inputs in _journals(directory):
+        if published.exists():
+            for path in inputs:
+                path.unlink(missing_ok=True)
+        else:
+            journal.with_suffix(".parquet").unlink(missing_ok=True)  # the staging file
+        logger.warning("Recovered interrupted compaction %s", journal)
+        journal.unlink()
+    for staging in directory.glob("_compact-*.parquet"):
+        # No journal, so nothing was published from it.
+        logger.warning("Removing orphaned compaction output %s", staging)
+        staging.unlink()
+
+
+def compact(
+    root: str | Path,
+    target_rows: int = 1_000_000,
+    before: datetime | None = None,
+    row_group_size: int = 128_000,
+    compression: str = "zstd",
+) -> CompactionReport:
+    """Merge each partition's files smaller than ``target_rows`` into one sorted file.
+
+    Only partitions whose hour ended before ``before`` are touched, so live
+    writers are never raced. An ``_``-prefixed journal naming the inputs is
+    written first, then the merged file under an ``_``-prefixed name, which
+    dataset readers skip; it is then renamed into place and the inputs removed. Until the
+    journal is gone, ``dataset`` reads skip the inputs of a published file, and
+    the next run finishes (or, if nothing was published, rolls back) any
+    compaction a crash interrupted.
+    """
+    report = CompactionReport()
+    run_id = uuid.uuid4().hex[:12]
+    for directory in sorted(Path(root).glob("date=*/hour=*")):
+        _finish_interrupted(directory)
+        if before is not None and _partition_start(directory) + timedelta(hours=1) > before:
+            continue
+        small = [
+            path
+            for path in sorted(directory.glob("*.parquet"))
+            if not path.name.startswith(("_", "."))
+            and pq.ParquetFile(path).metadata.num_rows < target_rows
+        ]
+        if len(small) < 2:
+            continue
+        table = pa.concat_tables(pq.ParquetFile(path).read() for path in small).sort_by("event_ts")
+        staging = directory / f"_compact-{run_id}.parquet"
+        journal = directory / f"_compact-{run_id}.inputs"
+        journal.write_text("\n".join(path.name for path in small))
+        pq.write_table(table, staging, row_group_size=row_group_size, compression=compression)
+        os.replace(staging, directory / f"part-compacted-{run_id}-0.parquet")
+        for path in small:
+            path.unlink()
+        journal.unlink()
+        report.partitions += 1
+        report.files_in += len(small)
+        report.files_out += 1
+        report.rows += table.num_rows
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline event store maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact_parser = commands.add_parser("compact", help="Merge small files per partition")
+    compact_parser.add_argument(
+        "--target-rows", type=int, help="Default: OFFLINE_COMPACT_TARGET_ROWS"
+    )
+    compact_parser.add_argument(
+        "--include-current-hour", action="store_true", help="Also compact the hour being written"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    report = compact(
+        settings.offline_events_path,
+        target_rows=args.target_rows or settings.offline_compact_target_rows,
+        before=(
+            None if args.include_current_hour else now.replace(minute=0, second=0, microsecond=0)
+        ),
+        row_group_size=settings.offline_row_group_size,
+        compression=settings.offline_compression,
+    )
+    logger.info("Compaction finished: %s", report)
+
+
+if __name__ == "__main__":
+    main()
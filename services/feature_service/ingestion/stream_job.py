@@ -1,11 +1,31 @@
-import json
 import time
+from functools import partial
+from typing import Any, Iterable
 
-from kafka import KafkaConsumer
+import numpy as np
+import pandas as pd
+from kafka import ConsumerRebalanceListener, KafkaConsumer, TopicPartition
 
-from services.common.config import get_settings
+from services.common import wire
+from services.common.config import Settings, get_settings
+from services.common.fastpath import validate_event_fast
 from services.common.logging import configure_logging, get_logger
+from services.common.pubsub import FEATURE_UPDATES_CHANNEL, PubSub
 from services.common.schemas import Event
+from services.feature_service.ingestion.aggregates import WindowedAggregator
+from services.feature_service.ingestion.dead_letters import DeadLetter
+from services.feature_service.ingestion.dedup import EventDeduplicator, Pending
+from services.feature_service.ingestion.metrics import (
+    INGEST_DEDUP_MEMORY,
+    INGEST_DUPLICATES,
+    INGEST_FRESHNESS,
+    INGEST_MESSAGES,
+    INGEST_VALIDATION_FAILURES,
+    INGEST_WRITE_LATENCY,
+    prepare_multiprocess_dir,
+    serve_metrics,
+)
+from services.feature_service.ingestion.offline import PartitionedEventSink, events_table
 
 try:
     from feast import FeatureStore
@@ -14,31 +34,303 @@ except ImportError:  # pragma: no cover
 
 logger = get_logger(__name__)
 
+FEATURE_VIEW = "transaction_features"
+AGGREGATE_VIEW = "transaction_aggregates"
+
+
+def decode_message(message: Any) -> Any:
+    """Event payload of a consumer record; already-deserialized values pass through."""
+
+    value = message.value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytes() of a bytes object is the object itself, so only views are copied.
+        return wire.decode(bytes(value), getattr(message, "headers", None))
+    return value
+
+
+def latest_rows(events: Iterable[Event]) -> pd.DataFrame:
+    """One row per ``user_id``: the newest event, later messages winning ties."""
+
+    latest: dict[str, Event] = {}
+    for event in events:
+        current = latest.get(event.user_id)
+        if current is None or event.event_ts >= current.event_ts:
+            latest[event.user_id] = event
+    return pd.DataFrame(
+        {
+            "user_id": [event.user_id for event in latest.values()],
+            "transaction_amount": [event.transaction_amount for event in latest.values()],
+            "label": [event.label or 0 for event in latest.values()],
+            "event_ts": pd.to_datetime([event.event_ts for event in latest.values()], utc=True),
+            "created_at": pd.Timestamp.now(tz="UTC"),
+        }
+    )
+
+
+class StreamIngestor(ConsumerRebalanceListener):
+    """Moves events from Kafka into the online store in micro-batches.
+
+    A batch closes at ``max_records`` messages or ``max_wait_ms`` after the
+    first poll, whichever comes first. Offsets are committed only after the
+    bulk write succeeds; a failed write rewinds the consumer to the start of
+    the batch so it is retried rather than skipped. The ingestor is also the
+    consumer's rebalance listener: a batch in flight when partitions are
+    revoked is flushed before they move to another group member.
+
+    Records that fail to decode or validate do not hold the batch up: they go
+    to the ``dead_letters`` sink with their error and offset, and the offsets
+    are committed only once both the valid rows and the dead letters are
+    stored.
+
+    With a ``dedup`` filter, events whose ``event_id`` was already ingested
+    (producer retries, replays) are dropped before the write. The filter only
+    learns a batch's ids once its offsets are committed, so a rewound batch is
+    not mistaken for its own duplicate.
+
+    With an ``offline`` sink the batch's events are also written to the
+    partitioned offline store before the commit, one set of files per Kafka
+    partition and batch that ``offline.compact`` later merges. The files are
+    named after the partition and the batch's first offset there, which a
+    rewound or re-delivered batch starts from again, so a replay replaces its
+    earlier copy rather than adding a second one. This holds until the hour is
+    compacted, which ``compact`` only does once the hour has ended.
+
+    With an ``aggregator`` each batch also refreshes the user's rolling window
+    aggregates. Aggregator state lives in this process, so it is folded in at
+    most once per offset and rebuilt from the stream when a partition moves.
+    """
+
+    def __init__(
+        self,
+        consumer: Any,
+        store: Any,
+        updates: PubSub,
+        max_records: int = 500,
+        max_wait_ms: float = 250.0,
+        retry_backoff_s: float = 1.0,
+        aggregator: WindowedAggregator | None = None,
+        worker: str = "0",
+        dead_letters: Any = None,
+        dedup: EventDeduplicator | None = None,
+        offline: PartitionedEventSink | None = None,
+    ) -> None:
+        self.consumer = consumer
+        self.store = store
+        self.updates = updates
+        self.max_records = max_records
+        self.max_wait_ms = max_wait_ms
+        self.retry_backoff_s = retry_backoff_s
+        self.aggregator = aggregator
+        self.worker = worker
+        self.dead_letters = dead_letters
+        self.dedup = dedup
+        self.offline = offline
+        self.messages_total = 0
+        self._batch: list[Any] = []
+        self._applied: dict[TopicPartition, int] = {}
+
+    def subscribe(self, topic: str) -> None:
+        self.consumer.subscribe([topic], listener=self)
+
+    def poll_batch(self) -> list[Any]:
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(self._batch) < self.max_records:
+            remaining_ms = max(0.0, (deadline - time.monotonic()) * 1000.0)
+            polled = self.consumer.poll(
+                timeout_ms=int(remaining_ms), max_records=self.max_records - len(self._batch)
+            )
+            for records in polled.values():
+                self._batch.extend(records)
+            if remaining_ms == 0.0:
+                break
+        return self._batch
+
+    def run_once(self) -> int:
+        """Poll, write and commit one batch; returns the number of messages consumed."""
+
+        self.poll_batch()
+        try:
+            return self.flush()
+        except Exception as exc:
+            logger.warning("Online store write failed: %s", exc)
+            time.sleep(self.retry_backoff_s)
+            return 0
+
+    def flush(self) -> int:
+        messages, self._batch = self._batch, []
+        if not messages:
+            return 0
+        try:
+            events, valid, dead = self._validate(messages)
+            events, valid, pending = self._deduplicate(events, valid)
+            frame = latest_rows(events)
+            if events:
+                self._write(FEATURE_VIEW, frame)
+                if self.aggregator is not None:
+                    self._write(AGGREGATE_VIEW, self._aggregate(self.aggregator, valid, events))
+            if self.offline is not None:
+                created_at = frame["created_at"].iloc[0] if events else None
+                self._write_offline(self.offline, messages, valid, events, created_at)
+            if dead and self.dead_letters is not None:
+                self.dead_letters.write(dead)
+        except Exception:
+            self._rewind(messages)
+            raise
+        self.consumer.commit()
+        if self.dedup is not None and pending is not None:
+            self.dedup.commit(pending)
+            INGEST_DUPLICATES.labels(worker=self.worker).inc(pending.duplicates)
+            INGEST_DEDUP_MEMORY.labels(worker=self.worker).set(self.dedup.nbytes)
+        written_at = time.time()
+        self.messages_total += len(messages)
+        INGEST_MESSAGES.labels(worker=self.worker).inc(len(messages))
+        for letter in dead:
+            INGEST_VALIDATION_FAILURES.labels(reason=letter.error_type).inc()
+        for event in events:
+            INGEST_FRESHNESS.observe(max(0.0, written_at - event.event_ts.timestamp()))
+        for user_id in frame["user_id"]:
+            self.updates.publish(FEATURE_UPDATES_CHANNEL, user_id)
+        return len(messages)
+
+    def _validate(self, messages: list[Any]) -> tuple[list[Event], list[Any], list[DeadLetter]]:
+        """Split a batch into valid events (with their messages) and dead letters."""
+
+        events: list[Event] = []
+        valid: list[Any] = []
+        dead: list[DeadLetter] = []
+        for message in messages:
+            try:
+                event = validate_event_fast(decode_message(message))
+            except Exception as exc:  # one bad record must not sink the batch
+                dead.append(DeadLetter.from_message(message, exc))
+                continue
+            events.append(event)
+            valid.append(message)
+        if dead and self.dead_letters is None:
+            logger.warning("Dropping %d invalid events without a dead-letter sink", len(dead))
+        return events, valid, dead
+
+    def _deduplicate(
+        self, events: list[Event], valid: list[Any]
+    ) -> tuple[list[Event], list[Any], Pending | None]:
+        if self.dedup is None or not events:
+            return events, valid, None
+        duplicate, pending = self.dedup.check(
+            [event.event_id for event in events],
+            [event.event_ts.timestamp() for event in events],
+        )
+        if pending.duplicates:
+            keep = np.flatnonzero(~duplicate).tolist()
+            events = [events[idx] for idx in keep]
+            valid = [valid[idx] for idx in keep]
+        return events, valid, pending
+
+    def _write_offline(
+        self,
+        offline: PartitionedEventSink,
+        messages: list[Any],
+        valid: list[Any],
+        events: list[Event],
+        created_at: pd.Timestamp | None,
+    ) -> None:
+        first: dict[tuple[str, int], int] = {}
+        for message in messages:
+            key = (message.topic, message.partition)
+            first[key] = min(first.get(key, message.offset), message.offset)
+        grouped: dict[tuple[str, int], list[Event]] = {key: [] for key in first}
+        for message, event in zip(valid, events, strict=True):
+            grouped[(message.topic, message.partition)].append(event)
+        # Every partition is written, even with no events left: a replay may hold fewer
+        # messages than the attempt it replaces, whose extra rows must go.
+        for (topic, partition), offset in first.items():
+            table = events_table(grouped[(topic, partition)], created_at)
+            offline.write_keyed(table, f"{topic}-p{partition}-o{offset}")
+
+    def _write(self, feature_view: str, frame: pd.DataFrame) -> None:
+        with INGEST_WRITE_LATENCY.labels(feature_view=feature_view).time():
+            self.store.write_to_online_store(feature_view_name=feature_view, df=frame)
+
+    def _aggregate(
+        self, aggregator: WindowedAggregator, messages: list[Any], events: list[Event]
+    ) -> pd.DataFrame:
+        fresh: list[Event] = []
+        for message, event in zip(messages, events, strict=True):
+            partition = TopicPartition(message.topic, message.partition)
+            if message.offset >= self._applied.get(partition, 0):
+                fresh.append(event)
+                self._applied[partition] = message.offset + 1
+        aggregator.update(
+            [event.user_id for event in fresh],
+            [int(event.event_ts.timestamp()) for event in fresh],
+            [event.transaction_amount for event in fresh],
+        )
+        return aggregator.snapshot(list(dict.fromkeys(event.user_id for event in events)))
+
+    def lag(self) -> dict[TopicPartition, int]:
+        """Messages between each assigned partition's position and its high watermark."""
+
+        lag: dict[TopicPartition, int] = {}
+        for partition in self.consumer.assignment():
+            highwater = self.consumer.highwater(partition)
+            if highwater is not None:
+                lag[partition] = max(0, highwater - self.consumer.position(partition))
+        return lag
+
+    def on_partitions_revoked(self, revoked: list[TopicPartition]) -> None:
+        try:
+            self.flush()
+        except Exception as exc:
+            # Nothing was committed, so the partitions' next owner re-reads the batch.
+            logger.warning("Dropping uncommitted batch on rebalance: %s", exc)
+
+    def on_partitions_assigned(self, assigned: list[TopicPartition]) -> None:
+        logger.info("Assigned partitions %s", sorted(tp.partition for tp in assigned))
+
+    def run_forever(self) -> None:
+        while True:
+            self.run_once()
+
+    def _rewind(self, messages: list[Any]) -> None:
+        first: dict[TopicPartition, int] = {}
+        for message in messages:
+            partition = TopicPartition(message.topic, message.partition)
+            first[partition] = min(first.get(partition, message.offset), message.offset)
+        for partition, offset in first.items():
+            self.consumer.seek(partition, offset)
+
+
+def build_consumer(settings: Settings) -> KafkaConsumer:
+    return KafkaConsumer(
+        bootstrap_servers=settings.kafka_brokers,
+        group_id=settings.stream_consumer_group,
+        enable_auto_commit=False,
+        auto_offset_reset="latest",
+    )
+
+
+def build_aggregator(settings: Settings) -> WindowedAggregator | None:
+    if not settings.stream_aggregates_enabled:
+        return None
+    return WindowedAggregator(max_users=settings.stream_aggregate_max_users)
+
 
 def main() -> None:
     configure_logging()
     settings = get_settings()
-    consumer = KafkaConsumer(
-        settings.event_topic,
-        bootstrap_servers=settings.kafka_brokers,
-        value_deserializer=lambda m: json.loads(m.decode("utf-8")),
-        enable_auto_commit=True,
-        auto_offset_reset="latest",
-        consumer_timeout_ms=1000,
+    from services.feature_service.ingestion.workers import IngestionSupervisor
+
+    # A single worker runs as a thread so it keeps the supervisor's reporting and restarts.
+    use_processes = settings.stream_workers > 1
+    if use_processes:
+        prepare_multiprocess_dir()
+    if settings.stream_metrics_port:
+        serve_metrics(settings.stream_metrics_port, worker_processes=use_processes)
+    store_factory = partial(FeatureStore, repo_path=settings.feast_repo_path)
+    supervisor = IngestionSupervisor.from_settings(
+        settings, store_factory, use_processes=use_processes
     )
-    store = FeatureStore(repo_path=settings.feast_repo_path)
-    logger.info("Streaming events into Feast online store...")
-    while True:
-        for message in consumer:
-            event = Event(**message.value)
-            store.write_to_online_store(
-                feature_view_name="transaction_features",
-                entity_rows=[{"user": event.user_id}],
-                feature_rows=[
-                    {"transaction_amount": event.transaction_amount, "label": event.label or 0}
-                ],
-            )
-        time.sleep(1.0)
+    logger.info("Streaming events into Feast online store with %d worker(s)", supervisor.workers)
+    supervisor.run_forever()
 
 
 if __name__ == "__main__":
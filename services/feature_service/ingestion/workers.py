@@ -0,0 +1,214 @@
+"""Partition-parallel stream ingestion.
+
+Runs N :class:`StreamIngestor` members of one consumer group under a
+supervisor. Kafka assigns each partition to exactly one member, so events for a
+``user_id`` (the message key) are still applied in order. Workers are spawned
+processes by default so the pipeline scales past one core; thread workers
+share the parent's objects, which the in-memory broker needs, and run the
+single-worker deployment.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
+
+from services.common.config import Settings, get_settings
+from services.common.logging import get_logger
+from services.common.pubsub import get_feature_update_bus
+from services.feature_service.ingestion.dead_letters import build_dead_letter_sink
+from services.feature_service.ingestion.dedup import build_deduplicator
+from services.feature_service.ingestion.metrics import INGEST_PARTITION_LAG, INGEST_THROUGHPUT
+from services.feature_service.ingestion.offline import build_offline_sink
+from services.feature_service.ingestion.stream_job import (
+    StreamIngestor,
+    build_aggregator,
+    build_consumer,
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class WorkerReport:
+    worker_id: int
+    messages_total: int
+    lag: dict[int, int]
+    reported_at: float
+
+
+def run_worker(
+    worker_id: int,
+    consumer_factory: Callable[[], Any],
+    store_factory: Callable[[], Any],
+    topic: str,
+    stop: Any,
+    reports: Any,
+    max_records: int,
+    max_wait_ms: float,
+    report_interval_s: float,
+) -> None:
+    consumer = consumer_factory()
+    ingestor = StreamIngestor(
+        consumer,
+        store_factory(),
+        get_feature_update_bus(),
+        max_records=max_records,
+        max_wait_ms=max_wait_ms,
+        aggregator=build_aggregator(get_settings()),
+        worker=str(worker_id),
+        dead_letters=build_dead_letter_sink(get_settings()),
+        dedup=build_deduplicator(get_settings()),
+        offline=build_offline_sink(get_settings()),
+    )
+    ingestor.subscribe(topic)
+
+    def report() -> None:
+        lag = {tp.partition: value for tp, value in ingestor.lag().items()}
+        reports.put(WorkerReport(worker_id, ingestor.messages_total, lag, time.time()))
+
+    next_report = time.monotonic() + report_interval_s
+    try:
+        while not stop.is_set():
+            ingestor.run_once()
+            if time.monotonic() >= next_report:
+                report()
+                next_report = time.monotonic() + report_interval_s
+        report()
+    finally:
+        consumer.close()
+
+
+class IngestionSupervisor:
+    """Starts the workers, restarts any that die and publishes their reports."""
+
+    def __init__(
+        self,
+        consumer_factory: Callable[[], Any],
+        store_factory: Callable[[], Any],
+        topic: str,
+        workers: int,
+        use_processes: bool = True,
+        max_records: int = 500,
+        max_wait_ms: float = 250.0,
+        report_interval_s: float = 10.0,
+    ) -> None:
+        self.consumer_factory = consumer_factory
+        self.store_factory = store_factory
+        self.topic = topic
+        self.workers = workers
+        self.max_records = max_records
+        self.max_wait_ms = max_wait_ms
+        self.report_interval_s = report_interval_s
+        self._context = multiprocessing.get_context("spawn") if use_processes else None
+        self._stop: Any = self._context.Event() if self._context else threading.Event()
+        self.reports: Any = self._context.Queue() if self._context else queue.Queue()
+        self.last_reports: dict[int, WorkerReport] = {}
+        self._handles: dict[int, Any] = {}
+        self._lag_partitions: set[int] = set()
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, store_factory: Callable[[], Any], use_processes: bool = True
+    ) -> IngestionSupervisor:
+        return cls(
+            partial(build_consumer, settings),
+            store_factory,
+            settings.event_topic,
+            settings.stream_workers,
+            use_processes=use_processes,
+            max_records=settings.stream_batch_max_records,
+            max_wait_ms=settings.stream_batch_max_wait_ms,
+            report_interval_s=settings.stream_report_interval_s,
+        )
+
+    def start(self) -> None:
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+
+    def supervise_once(self, timeout_s: float) -> None:
+        try:
+            self._record(self.reports.get(timeout=timeout_s))
+            while True:
+                self._record(self.reports.get_nowait())
+        except queue.Empty:
+            pass
+        if self._stop.is_set():
+            return
+        for worker_id, handle in list(self._handles.items()):
+            if not handle.is_alive():
+                logger.warning("Ingestion worker %d exited; restarting", worker_id)
+                self._spawn(worker_id)
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stop.is_set():
+                self.supervise_once(self.report_interval_s)
+        finally:
+            self.stop()
+
+    def stop(self, timeout_s: float = 30.0) -> None:
+        self._stop.set()
+        deadline = time.monotonic() + timeout_s
+        for handle in self._handles.values():
+            handle.join(max(0.0, deadline - time.monotonic()))
+        self.supervise_once(0.0)
+
+    def _publish_lag(self) -> None:
+        # One series per partition, from the newest report listing it: until the old owner
+        # reports again after a rebalance, its last report still holds the partition.
+        newest: dict[int, tuple[float, int]] = {}
+        for report in self.last_reports.values():
+            for partition, lag in report.lag.items():
+                if partition not in newest or report.reported_at > newest[partition][0]:
+                    newest[partition] = (report.reported_at, lag)
+        # Series cannot be removed in multiprocess mode; an unowned partition reads 0.
+        for partition in self._lag_partitions - newest.keys():
+            INGEST_PARTITION_LAG.labels(partition=str(partition)).set(0)
+        for partition, (_, lag) in newest.items():
+            INGEST_PARTITION_LAG.labels(partition=str(partition)).set(lag)
+        self._lag_partitions |= newest.keys()
+
+    def _spawn(self, worker_id: int) -> None:
+        args = (
+            worker_id,
+            self.consumer_factory,
+            self.store_factory,
+            self.topic,
+            self._stop,
+            self.reports,
+            self.max_records,
+            self.max_wait_ms,
+            self.report_interval_s,
+        )
+        name = f"ingest-worker-{worker_id}"
+        if self._context is not None:
+            handle: Any = self._context.Process(target=run_worker, args=args, name=name)
+        else:
+            handle = threading.Thread(target=run_worker, args=args, name=name, daemon=True)
+        handle.start()
+        self._handles[worker_id] = handle
+
+    def _record(self, report: WorkerReport) -> None:
+        worker = str(report.worker_id)
+        previous = self.last_reports.get(report.worker_id)
+        baseline = previous.messages_total if previous is not None else 0
+        if report.messages_total < baseline:  # worker restarted and its count began again
+            baseline = 0
+        if previous is not None and report.reported_at > previous.reported_at:
+            rate = (report.messages_total - baseline) / (report.reported_at - previous.reported_at)
+            INGEST_THROUGHPUT.labels(worker=worker).set(rate)
+        self.last_reports[report.worker_id] = report
+        self._publish_lag()
+        logger.info(
+            "Ingestion worker %d: %d messages, lag %s",
+            report.worker_id,
+            report.messages_total,
+            report.lag,
+        )
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from services.feature_service.ingestion.aggregates import (
+    Window,
+    WindowedAggregator,
+    aggregate_columns,
+)
+
+T0 = 1_700_000_000 - 1_700_000_000 % 3600
+
+
+def test_snapshot_matches_direct_statistics_per_window():
+    aggregator = WindowedAggregator()
+    amounts = [10.0, 20.0, 30.0, 40.0]
+    seconds = [T0, T0 + 1800, T0 + 3590, T0 + 3595]
+    aggregator.update(["u1"] * 4, seconds, amounts)
+
+    row = aggregator.snapshot(["u1"]).iloc[0]
+
+    assert row["txn_count_24h"] == 4
+    assert row["amount_mean_24h"] == pytest.approx(np.mean(amounts))
+    assert row["amount_var_24h"] == pytest.approx(np.var(amounts))
+    expected_z = (40.0 - np.mean(amounts)) / np.std(amounts)
+    assert row["amount_zscore_24h"] == pytest.approx(expected_z)
+    # The 1-minute window only covers the last two events.
+    assert row["txn_count_1m"] == 2
+    assert row["amount_sum_1m"] == pytest.approx(70.0)
+
+
+def test_old_buckets_expire_as_the_watermark_advances():
+    aggregator = WindowedAggregator()
+    aggregator.update(["u1", "u2"], [T0, T0], [100.0, 5.0])
+    aggregator.update(["u2"], [T0 + 2 * 3600], [7.0])
+
+    rows = aggregator.snapshot(["u1", "u2"]).set_index("user_id")
+
+    assert rows.loc["u1", "txn_count_1h"] == 0
+    assert rows.loc["u1", "txn_count_24h"] == 1
+    assert rows.loc["u2", "txn_count_1h"] == 1
+    assert rows.loc["u2", "amount_sum_24h"] == pytest.approx(12.0)
+
+
+def test_late_event_does_not_replace_latest_amount():
+    aggregator = WindowedAggregator(windows=(Window("1h", 600, 6),))
+    aggregator.update(["u1"], [T0 + 600], [50.0])
+    aggregator.update(["u1"], [T0], [10.0])
+
+    row = aggregator.snapshot(["u1"]).iloc[0]
+
+    assert row["txn_count_1h"] == 2
+    assert row["amount_zscore_1h"] == pytest.approx(1.0)
+
+
+def test_table_grows_then_evicts_least_recently_seen_users():
+    aggregator = WindowedAggregator(max_users=8, initial_capacity=2)
+    for idx in range(8):
+        aggregator.update([f"u{idx}"], [T0 + idx], [1.0])
+    aggregator.update(["u-new"], [T0 + 100], [1.0])
+
+    assert len(aggregator) == 8
+    assert "u0" not in aggregator._index
+    assert aggregator.snapshot(["u-new"]).iloc[0]["txn_count_1m"] == 1
+
+
+def test_aggregate_columns_cover_every_window():
+    assert len(aggregate_columns()) == 15
+    assert "amount_zscore_1h" in aggregate_columns()
@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+import yaml
+from feast import FeatureStore, RepoConfig
+from feast.infra.online_stores.redis import RedisOnlineStore
+from kafka import TopicPartition
+
+from services.common import wire
+from services.common.memory_broker import InMemoryBroker
+from services.common.pubsub import FEATURE_UPDATES_CHANNEL, LocalPubSub
+from services.common.schemas import Event
+from services.feature_service.feast_repo.entities import user
+from services.feature_service.feast_repo.feature_views import transaction_features
+from services.feature_service.ingestion.backfill import (
+    BackfillConfig,
+    offset_ranges,
+    run_backfill,
+)
+from services.feature_service.ingestion.offline import PartitionedEventSink, read_events
+from services.feature_service.ingestion.stream_job import FEATURE_VIEW, latest_rows
+from services.feature_service.tests.test_stream_job import FlakyStore
+
+START = datetime(2024, 2, 1, tzinfo=timezone.utc)
+TOPIC = "transactions"
+
+
+def _event(partition, offset, minute, user_id):
+    return Event(
+        event_id=f"evt-{partition}-{offset:020d}",
+        user_id=user_id,
+        transaction_amount=float(minute),
+        country="US",
+        device="web",
+        event_ts=START + timedelta(minutes=minute),
+        label=0,
+    )
+
+
+def _broker(corrupt=None):
+    """Partition 0 has one event a minute for ten minutes, partition 1 one every two."""
+    broker = InMemoryBroker(partitions=2)
+    broker.create_topic(TOPIC)
+    for partition, step in ((0, 1), (1, 2)):
+        for offset in range(10):
+            minute = offset * step
+            value = wire.encode_binary(_event(partition, offset, minute, f"u{offset % 3}"))
+            if (partition, offset) == corrupt:
+                value = b"\xe7\x01truncated"
+            ts = START + timedelta(minutes=minute)
+            broker.produce(
+                TOPIC, value, partition=partition, timestamp_ms=int(ts.timestamp() * 1000)
+            )
+    return broker
+
+
+def test_offset_ranges_follow_broker_timestamps():
+    consumer = _broker().consumer(None)
+
+    ranges = offset_ranges(
+        consumer, TOPIC, START + timedelta(minutes=4), START + timedelta(minutes=8)
+    )
+
+    assert ranges == {
+        TopicPartition("transactions", 0): (4, 8),
+        TopicPartition("transactions", 1): (2, 4),
+    }
+    assert offset_ranges(consumer, TOPIC, START + timedelta(hours=1)) == {}
+
+
+def test_backfill_reads_the_range_into_both_stores_and_exits(tmp_path):
+    consumer, store, updates = _broker().consumer(None), FlakyStore(), LocalPubSub()
+    published = []
+    updates.subscribe(FEATURE_UPDATES_CHANNEL, published.append)
+    offline = PartitionedEventSink(tmp_path, rows_per_flush=4)
+    config = BackfillConfig(
+        topic=TOPIC,
+        start=START + timedelta(minutes=2),
+        end=START + timedelta(minutes=9),
+        max_records=3,
+    )
+
+    report = run_backfill(consumer, store, offline, config, updates)
+
+    # Partition 0 holds minutes 2..8 (7 rows), partition 1 minutes 2, 4, 6, 8 (4 rows).
+    assert report.rows == report.messages == 11
+    assert report.partitions == 2
+    assert report.rows_per_s > 0
+    assert report.batches >= 4
+    assert all(view == "transaction_features" for view, _ in store.writes)
+    assert set(published) == {"u0", "u1", "u2"}
+
+    table = read_events(tmp_path)
+    assert sorted(table["transaction_amount"].to_pylist()) == sorted(
+        [float(minute) for minute in range(2, 9)] + [2.0, 4.0, 6.0, 8.0]
+    )
+    assert set(table["date"].to_pylist()) == {"2024-02-01"}
+    assert set(table["hour"].to_pylist()) == {0}
+    assert all(
+        path.rsplit("/", 1)[-1].startswith(f"part-{offline.run_id}") for path in offline.files
+    )
+
+
+def test_invalid_records_are_counted_and_skipped(tmp_path):
+    broker = _broker(corrupt=(0, 3))
+    config = BackfillConfig(topic=TOPIC, start=START, online=False)
+
+    report = run_backfill(broker.consumer(None), None, PartitionedEventSink(tmp_path), config)
+
+    assert report.messages == 20
+    assert report.rows == 19
+    assert report.invalid == {"WireFormatError": 1}
+    assert read_events(tmp_path).num_rows == 19
+
+
+def test_unexpected_decode_errors_do_not_abort_the_run(tmp_path):
+    broker = _broker()
+    broker.produce(TOPIC, b"{}", partition=0, headers=[("content-type", None)])
+    config = BackfillConfig(topic=TOPIC, start=START, online=False)
+
+    report = run_backfill(broker.consumer(None), None, PartitionedEventSink(tmp_path), config)
+
+    assert report.messages == 21
+    assert report.rows == 20
+    assert report.invalid == {"AttributeError": 1}
+
+
+def test_max_rate_paces_the_backfill():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    config = BackfillConfig(topic=TOPIC, start=START, max_rate=4.0, max_records=4)
+    report = run_backfill(
+        _broker().consumer(None), FlakyStore(), None, config, clock=lambda: now[0], sleep=sleep
+    )
+
+    assert report.rows == 20
+    assert report.elapsed_s == pytest.approx(5.0)
+    assert len(slept) > 1
+
+
+def test_backfill_leaves_the_live_consumer_group_alone():
+    broker = _broker()
+    live = broker.consumer("feature-ingestion")
+    live.subscribe([TOPIC])
+    assert sum(len(records) for records in live.poll(max_records=5).values()) == 5
+    live.commit()
+    committed = {tp: broker.committed("feature-ingestion", tp) for tp in live.assignment()}
+
+    run_backfill(broker.consumer(None), FlakyStore(), None, BackfillConfig(TOPIC, START))
+
+    assert live.assignment() == set(broker.partitions_for(TOPIC))
+    assert {tp: broker.committed("feature-ingestion", tp) for tp in live.assignment()} == committed
+    assert sum(len(records) for records in live.poll(max_records=50).values()) == 15
+
+
+class FakeRedis:
+    """Hashes in a dict, behind the pipeline calls Feast's Redis online store makes."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self.hashes)
+
+
+class FakePipeline:
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.queued = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def hmget(self, key, fields):
+        fields = [fields] if isinstance(fields, (str, bytes)) else fields
+        encoded = [field.encode() if isinstance(field, str) else field for field in fields]
+        self.queued.append(lambda: [self.hashes.get(key, {}).get(field) for field in encoded])
+
+    def hset(self, key, mapping):
+        encoded = {(k.encode() if isinstance(k, str) else k): v for k, v in mapping.items()}
+        self.queued.append(lambda: self.hashes.setdefault(key, {}).update(encoded))
+
+    def expire(self, name, time):
+        self.queued.append(lambda: True)
+
+    def execute(self):
+        results, self.queued = [call() for call in self.queued], []
+        return results
+
+
+def test_replayed_events_do_not_overwrite_newer_live_values(tmp_path, monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(RedisOnlineStore, "_get_client", lambda self, config: client)
+    store = FeatureStore(
+        config=RepoConfig(
+            project="backfill",
+            registry=str(tmp_path / "registry.db"),
+            provider="local",
+            offline_store={"type": "file"},
+            online_store={"type": "redis", "connection_string": "localhost:6379"},
+            entity_key_serialization_version=3,
+            repo_path=str(tmp_path),
+        )
+    )
+    store.apply([user, transaction_features])
+    live = _event(0, 99, 24 * 60, "u1").model_copy(update={"transaction_amount": 999.0})
+    store.write_to_online_store(feature_view_name=FEATURE_VIEW, df=latest_rows([live]))
+
+    report = run_backfill(
+        _broker().consumer(None), store, None, BackfillConfig(TOPIC, START, max_rate=0.0)
+    )
+
+    online = store.get_online_features(
+        features=["transaction_features:transaction_amount"],
+        entity_rows=[{"user_id": "u0"}, {"user_id": "u1"}],
+    ).to_dict()
+    assert report.rows == 20
+    # u0 had no live value, so the replay lands; u1's live value is a day newer than the replay.
+    assert online["transaction_amount"] == [18.0, 999.0]
+
+
+def test_the_repo_online_store_keeps_its_event_timestamp_check():
+    config = yaml.safe_load(
+        (Path(__file__).parents[1] / "feast_repo" / "feature_store.yaml").read_text()
+    )
+    assert config["online_store"]["type"] == "redis"
+    assert not config["online_store"].get("skip_dedup", False)
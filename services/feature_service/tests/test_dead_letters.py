@@ -0,0 +1,132 @@
+import json
+from collections import namedtuple
+
+import pytest
+
+from services.common.config import get_settings
+from services.common.memory_broker import InMemoryBroker
+from services.feature_service.ingestion.dead_letters import (
+    ERROR_HEADER,
+    ERROR_TYPE_HEADER,
+    DeadLetter,
+    FileDeadLetterSink,
+    replay_file,
+    replay_topic,
+)
+
+Message = namedtuple("Message", "topic partition offset key value headers")
+
+
+class Future:
+    def __init__(self, error=None):
+        self.error = error
+
+    def get(self, timeout=None):
+        if self.error is not None:
+            raise self.error
+
+
+class RecordingProducer:
+    def __init__(self, fail=()):
+        self.fail = set(fail)  # indexes of the sends the broker rejects
+        self.sent = []
+
+    def send(self, topic, value, key=None, headers=None):
+        failed = len(self.sent) in self.fail
+        self.sent.append((topic, value, key, headers))
+        return Future(TimeoutError("no ack") if failed else None)
+
+    def flush(self):
+        pass
+
+
+def _letter(offset, error_type, value=b'{"user_id": "u1"}'):
+    message = Message("transactions", 2, offset, b"u1", value, [("content-type", b"x")])
+    letter = DeadLetter.from_message(message, ValueError("bad"))
+    letter.error_type = error_type
+    return letter
+
+
+def test_file_sink_round_trips_payload_and_source_position(tmp_path):
+    sink = FileDeadLetterSink(tmp_path / "dlq.jsonl")
+    sink.write([_letter(7, "WireFormatError", value=b"\xe7\x01\xff")])
+
+    [letter] = list(sink.read())
+
+    assert (letter.topic, letter.partition, letter.offset) == ("transactions", 2, 7)
+    assert letter.value == b"\xe7\x01\xff"
+    assert letter.key == b"u1" and letter.headers == [("content-type", b"x")]
+    assert json.loads((tmp_path / "dlq.jsonl").read_text())["error"] == "bad"
+
+
+def test_replay_sends_selected_letters_and_keeps_the_rest(tmp_path):
+    sink = FileDeadLetterSink(tmp_path / "dlq.jsonl")
+    sink.write(
+        [_letter(1, "value_error"), _letter(2, "WireFormatError"), _letter(3, "value_error")]
+    )
+    producer = RecordingProducer()
+
+    assert replay_file(sink, producer, "transactions", {"value_error"}) == 2
+
+    assert [sent[0] for sent in producer.sent] == ["transactions", "transactions"]
+    assert producer.sent[0][1:] == (b'{"user_id": "u1"}', b"u1", [("content-type", b"x")])
+    assert [letter.offset for letter in sink.read()] == [2]
+    archived = FileDeadLetterSink(tmp_path / "dlq.replayed.jsonl")
+    assert [letter.offset for letter in archived.read()] == [1, 3]
+    assert not (tmp_path / "dlq.replaying.jsonl").exists()
+
+
+def test_undelivered_letters_stay_in_the_live_file(tmp_path):
+    sink = FileDeadLetterSink(tmp_path / "dlq.jsonl")
+    sink.write([_letter(1, "value_error"), _letter(2, "value_error"), _letter(3, "other")])
+
+    assert replay_file(sink, RecordingProducer(fail={1}), "transactions", {"value_error"}) == 1
+
+    assert [letter.offset for letter in sink.read()] == [2, 3]
+    archived = FileDeadLetterSink(tmp_path / "dlq.replayed.jsonl")
+    assert [letter.offset for letter in archived.read()] == [1]
+
+
+def _dead_letter_topic(kinds):
+    settings = get_settings()
+    broker = InMemoryBroker(partitions=1)
+    for kind in kinds:
+        headers = [
+            ("content-type", b"x"),
+            (ERROR_TYPE_HEADER, kind.encode()),
+            (ERROR_HEADER, b"bad"),
+        ]
+        broker.produce(settings.stream_dead_letter_topic, kind.encode(), headers=headers)
+    consumer = broker.consumer(f"{settings.stream_consumer_group}-dead-letter-replay")
+    consumer.subscribe([settings.stream_dead_letter_topic])
+    return settings, broker, consumer
+
+
+def test_filtered_topic_replay_requeues_the_letters_it_skips():
+    settings, broker, consumer = _dead_letter_topic(["value_error", "other", "value_error"])
+    (partition,) = broker.partitions_for(settings.stream_dead_letter_topic)
+    producer = RecordingProducer()
+
+    sent = replay_topic(
+        settings, producer, "transactions", {"value_error"}, consumer, idle_timeout_ms=10
+    )
+
+    assert sent == 2
+    assert [(topic, value) for topic, value, _, _ in producer.sent] == [
+        ("transactions", b"value_error"),
+        ("transactions", b"value_error"),
+        (settings.stream_dead_letter_topic, b"other"),
+    ]
+    assert producer.sent[0][3] == [("content-type", b"x")]
+    assert dict(producer.sent[2][3])[ERROR_TYPE_HEADER] == b"other"
+    assert broker.committed(consumer.group_id, partition) == 3
+
+
+def test_topic_replay_does_not_commit_when_a_send_fails():
+    settings, broker, consumer = _dead_letter_topic(["value_error", "other"])
+    (partition,) = broker.partitions_for(settings.stream_dead_letter_topic)
+
+    with pytest.raises(RuntimeError, match="1 dead letters"):
+        replay_topic(settings, RecordingProducer(fail={0}), "transactions", None, consumer, 10)
+
+    assert broker.committed(consumer.group_id, partition) is None
@@ -0,0 +1,125 @@
+from collections import namedtuple
+
+import numpy as np
+
+from services.common.pubsub import LocalPubSub
+from services.feature_service.ingestion.dedup import EventDeduplicator
+from services.feature_service.ingestion.stream_job import StreamIngestor
+from services.feature_service.tests.test_stream_job import FakeConsumer, FlakyStore
+
+Record = namedtuple("Record", "topic partition offset value")
+
+START = 1_706_745_600.0  # 2024-02-01T00:00:00Z
+
+
+def _ids(count, prefix="evt"):
+    return [f"{prefix}-{idx}" for idx in range(count)]
+
+
+def _seen(dedup, event_ids, seconds):
+    duplicate, pending = dedup.check(event_ids, seconds)
+    dedup.commit(pending)
+    return duplicate
+
+
+def _record(offset, event_id, user_id, second):
+    return Record(
+        "transactions",
+        0,
+        offset,
+        {
+            "event_id": f"{event_id:0>26}",
+            "user_id": user_id,
+            "transaction_amount": 10.0 + second,
+            "country": "US",
+            "device": "ios",
+            "event_ts": f"2024-02-01T00:{second // 60:02d}:{second % 60:02d}Z",
+            "label": 0,
+        },
+    )
+
+
+def test_replay_with_duplicates_writes_each_event_once():
+    originals = [_record(idx, f"evt-{idx}", f"u{idx % 50}", idx) for idx in range(200)]
+    rng = np.random.default_rng(7)
+    # Every event is redelivered at least once, some several times, out of order.
+    replayed = [originals[idx] for idx in rng.integers(0, 200, size=600)] + originals
+    records = [record._replace(offset=offset) for offset, record in enumerate(originals + replayed)]
+    dedup = EventDeduplicator(window_s=3600, partitions=4, memory_bytes=1024**2)
+    store = FlakyStore()
+    ingestor = StreamIngestor(
+        FakeConsumer(records), store, LocalPubSub(), max_records=64, max_wait_ms=1, dedup=dedup
+    )
+
+    while ingestor.run_once():
+        pass
+
+    written = [amount for _, frame in store.writes for amount in frame["transaction_amount"]]
+    assert ingestor.messages_total == 1000
+    assert dedup.checked == 1000
+    assert dedup.duplicates == 800
+    assert dedup.hit_rate() == 0.8
+    # latest_rows keeps one row per user per batch, so count distinct events instead.
+    assert len(written) == len(set(written))
+
+
+def test_duplicates_within_one_batch_are_dropped():
+    records = [_record(0, "a", "u1", 0), _record(1, "a", "u1", 0), _record(2, "b", "u2", 1)]
+    store = FlakyStore()
+    dedup = EventDeduplicator(memory_bytes=64 * 1024)
+    ingestor = StreamIngestor(
+        FakeConsumer(records), store, LocalPubSub(), max_wait_ms=1, dedup=dedup
+    )
+
+    assert ingestor.run_once() == 3
+    assert dedup.duplicates == 1
+    assert sorted(store.writes[0][1]["user_id"]) == ["u1", "u2"]
+
+
+def test_failed_write_does_not_mark_the_batch_as_seen():
+    records = [_record(0, "a", "u1", 0), _record(1, "b", "u2", 1)]
+    store = FlakyStore(failures=1)
+    dedup = EventDeduplicator(memory_bytes=64 * 1024)
+    ingestor = StreamIngestor(
+        FakeConsumer(records),
+        store,
+        LocalPubSub(),
+        max_wait_ms=1,
+        retry_backoff_s=0,
+        dedup=dedup,
+    )
+
+    assert ingestor.run_once() == 0
+    assert ingestor.run_once() == 2
+    assert sorted(store.writes[0][1]["user_id"]) == ["u1", "u2"]
+    assert dedup.duplicates == 0
+
+
+def test_false_positive_rate_stays_within_target():
+    dedup = EventDeduplicator(window_s=3600, partitions=6, fp_rate=0.01, memory_bytes=256 * 1024)
+    # Fill every slice to its design capacity.
+    total = dedup.capacity * dedup.partitions
+    event_ids, seconds = _ids(total), START + np.linspace(0, 3599, total)
+    for start in range(0, total, 5_000):
+        _seen(dedup, event_ids[start : start + 5_000], seconds[start : start + 5_000])
+
+    probes = _ids(50_000, prefix="new")
+    duplicate, _ = dedup.check(probes, START + np.linspace(0, 3599, len(probes)))
+
+    assert duplicate.mean() <= 0.012  # sampling noise around the 1% target
+    assert dedup.false_positive_rate() <= 0.011
+
+
+def test_memory_is_fixed_and_old_slices_expire():
+    dedup = EventDeduplicator(window_s=600, partitions=3, memory_bytes=96 * 1024)
+    size = dedup.nbytes
+    assert size <= 96 * 1024
+
+    assert not _seen(dedup, ["a"], [START]).any()
+    assert _seen(dedup, ["a"], [START + 10]).all()
+
+    # Three slices later the ring has wrapped and the first slice was cleared.
+    for step in range(1, 4):
+        _seen(dedup, [f"filler-{step}"], [START + 200 * step])
+    assert not _seen(dedup, ["a"], [START + 10]).any()
+    assert dedup.nbytes == size
@@ -4,3 +4,10 @@ from services.feature_service.feast_repo.feature_views import transaction_featur
 def test_transaction_feature_view_schema():
     fields = {field.name for field in transaction_features.schema}
     assert {"transaction_amount", "label"}.issubset(fields)
+
+
+def test_transaction_aggregates_view_matches_stream_aggregates():
+    from services.feature_service.feast_repo.feature_views import transaction_aggregates
+    from services.feature_service.ingestion.aggregates import aggregate_columns
+
+    assert {field.name for field in transaction_aggregates.schema} == set(aggregate_columns())
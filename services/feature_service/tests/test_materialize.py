@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from feast import FeatureView, Field, FileSource, PushSource
+from feast.types import Float32
+
+from services.feature_service.feast_repo.entities import user
+from services.feature_service.feast_repo.materialize import (
+    WatermarkStore,
+    materialize_incremental,
+    time_chunks,
+)
+
+NOW = datetime(2024, 2, 3, tzinfo=timezone.utc)
+
+
+def _view(path, name="transaction_features", online=True):
+    return FeatureView(
+        name=name,
+        entities=[user],
+        schema=[Field(name="transaction_amount", dtype=Float32)],
+        online=online,
+        source=FileSource(path=str(path), timestamp_field="event_ts"),
+    )
+
+
+@pytest.fixture
+def events(tmp_path):
+    # Three users, one event each every 10 minutes over the last two days.
+    ts = pd.date_range(NOW - timedelta(days=2), NOW, freq="10min", inclusive="left", tz="UTC")
+    frame = pd.DataFrame(
+        {
+            "user_id": [f"u{idx % 3}" for idx in range(len(ts))],
+            "transaction_amount": 1.0,
+            "event_ts": ts,
+        }
+    )
+    path = tmp_path / "events.parquet"
+    frame.to_parquet(path, index=False)
+    return path
+
+
+class RecordingRegistry:
+    def __init__(self):
+        self.intervals = []
+
+    def apply_materialization(self, feature_view, project, start_date, end_date):
+        self.intervals.append((feature_view.name, start_date, end_date))
+
+
+class RecordingStore:
+    project = "fraud"
+
+    def __init__(self, views, fail_after=None):
+        self.views = views
+        self.fail_after = fail_after
+        self.registry = RecordingRegistry()
+        self.writes = []
+
+    def list_feature_views(self):
+        return self.views
+
+    def get_entity(self, name):
+        assert name == user.name
+        return user
+
+    def write_to_online_store(self, feature_view_name, df):
+        if self.fail_after is not None and len(self.writes) >= self.fail_after:
+            raise ConnectionError("redis unavailable")
+        self.writes.append((feature_view_name, df))
+
+
+class FactoryStore(RecordingStore):
+    """Picklable stand-in built inside each pool process."""
+
+    def __init__(self):
+        super().__init__([])
+
+
+def test_time_chunks_cover_the_range_without_overlap():
+    chunks = time_chunks(NOW - timedelta(hours=13), NOW, timedelta(hours=6))
+
+    assert chunks[0][0] == NOW - timedelta(hours=13)
+    assert chunks[-1][1] == NOW
+    assert all(left[1] == right[0] for left, right in zip(chunks, chunks[1:], strict=False))
+    assert [end - start for start, end in chunks] == [timedelta(hours=6)] * 2 + [timedelta(hours=1)]
+
+
+def test_runs_materialize_only_the_delta_since_the_watermark(events, tmp_path):
+    store = RecordingStore([_view(events), _view(events, "offline_only", online=False)])
+    watermarks = WatermarkStore(tmp_path / "watermarks.json")
+    options = {"chunk": timedelta(hours=6), "lateness": timedelta(minutes=5)}
+
+    (first,) = materialize_incremental(store, FactoryStore, watermarks, end=NOW, **options)
+
+    assert first.start == NOW - timedelta(days=1)
+    assert len(first.chunks) == 4
+    assert first.rows == 4 * 3  # each 6h chunk holds all three users
+    assert watermarks.get("transaction_features") == NOW
+
+    _, frame = store.writes[-1]
+    assert sorted(frame["user_id"]) == ["u0", "u1", "u2"]
+    assert frame["event_ts"].min() >= NOW - timedelta(minutes=30)  # each user's newest row
+    store.writes.clear()
+    later = NOW + timedelta(minutes=30)
+    (second,) = materialize_incremental(store, FactoryStore, watermarks, end=later, **options)
+
+    assert store.writes == []
+    assert store.registry.intervals == [
+        ("transaction_features", NOW - timedelta(days=1), NOW),
+        ("transaction_features", NOW - timedelta(minutes=5), later),
+    ]
+    assert second.rows == 0  # the fixture has no events after NOW
+    assert watermarks.get("transaction_features") == later
+
+
+def test_failed_chunk_keeps_the_watermark(events, tmp_path):
+    watermarks = WatermarkStore(tmp_path / "watermarks.json")
+    watermarks.set("transaction_features", NOW - timedelta(days=1))
+    store = RecordingStore([_view(events)], fail_after=2)
+
+    with pytest.raises(ConnectionError):
+        materialize_incremental(store, FactoryStore, watermarks, end=NOW, chunk=timedelta(hours=6))
+
+    assert watermarks.get("transaction_features") == NOW - timedelta(days=1)
+
+
+def test_explicit_backfill_range_runs_chunks_in_parallel(events, tmp_path):
+    watermarks = WatermarkStore(tmp_path / "watermarks.json")
+    watermarks.set("transaction_features", NOW)
+    store = RecordingStore([_view(events)])
+
+    (report,) = materialize_incremental(
+        store,
+        FactoryStore,
+        watermarks,
+        end=NOW - timedelta(days=1),
+        start=NOW - timedelta(days=2),
+        chunk=timedelta(hours=12),
+        workers=2,
+    )
+
+    assert store.writes == []  # chunks were written from the pool
+    # ...which left the registry alone: the interval is recorded once, from this process.
+    assert store.registry.intervals == [
+        ("transaction_features", NOW - timedelta(days=2), NOW - timedelta(days=1))
+    ]
+    assert [(chunk.start, chunk.end) for chunk in report.chunks] == [
+        (NOW - timedelta(days=2), NOW - timedelta(hours=36)),
+        (NOW - timedelta(hours=36), NOW - timedelta(days=1)),
+    ]
+    assert report.rows == 6
+    # A backfill behind the watermark never moves it back.
+    assert watermarks.get("transaction_features") == NOW
+
+
+def test_push_fed_views_are_left_to_their_producer(events, tmp_path):
+    pushed = FeatureView(
+        name="transaction_aggregates",
+        entities=[user],
+        schema=[Field(name="amount_sum_1h", dtype=Float32)],
+        source=PushSource(
+            name="aggregates_push",
+            batch_source=FileSource(path=str(tmp_path / "missing"), timestamp_field="event_ts"),
+        ),
+    )
+    store = RecordingStore([_view(events), pushed])
+    watermarks = WatermarkStore(tmp_path / "watermarks.json")
+
+    (report,) = materialize_incremental(store, FactoryStore, watermarks, end=NOW)
+
+    assert report.feature_view == "transaction_features"
+    assert {view for view, _ in store.writes} == {"transaction_features"}
+    assert watermarks.get("transaction_aggregates") is None
+
+
+def test_views_without_source_data_are_skipped(events, tmp_path):
+    (tmp_path / "empty").mkdir()
+    store = RecordingStore(
+        [
+            _view(tmp_path / "missing", "not_written_yet"),
+            _view(tmp_path / "empty", "empty_dataset"),
+            _view(events),
+        ]
+    )
+    watermarks = WatermarkStore(tmp_path / "watermarks.json")
+
+    (report,) = materialize_incremental(store, FactoryStore, watermarks, end=NOW)
+
+    assert report.feature_view == "transaction_features"
+    assert set(watermarks.load()) == {"transaction_features"}
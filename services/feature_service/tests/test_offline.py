@@ -0,0 +1,317 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from services.common.config import get_settings
+from services.common.pubsub import LocalPubSub
+from services.feature_service.ingestion import batch_job, offline
+from services.feature_service.ingestion.offline import (
+    PartitionedEventSink,
+    StreamingEventWriter,
+    compact,
+    dataset,
+    partition_filter,
+    read_events,
+)
+from services.feature_service.ingestion.stream_job import StreamIngestor
+from services.feature_service.tests.test_stream_job import (
+    RECORDS,
+    FakeConsumer,
+    FlakyStore,
+    Record,
+    RecordingSink,
+)
+
+START = datetime(2024, 2, 1, 22, tzinfo=timezone.utc)
+
+
+def _table(start, minutes, step=timedelta(minutes=1)):
+    ts = [start + step * idx for idx in range(minutes)]
+    return pa.table(
+        {
+            "event_id": [f"evt-{start:%d%H}-{idx:016d}" for idx in range(minutes)],
+            "user_id": [f"u{idx % 7}" for idx in range(minutes)],
+            "transaction_amount": [float(idx) for idx in range(minutes)],
+            "country": ["US"] * minutes,
+            "device": ["web"] * minutes,
+            "event_ts": pd.to_datetime(ts, utc=True),
+            "label": [0] * minutes,
+            "created_at": pd.to_datetime([START] * minutes, utc=True),
+        }
+    )
+
+
+def _files(root):
+    return sorted(path for path in root.rglob("*.parquet"))
+
+
+def test_runs_append_hourly_partitions_with_sized_row_groups(tmp_path):
+    for run in range(2):
+        sink = PartitionedEventSink(tmp_path, row_group_size=25)
+        sink.append(_table(START + timedelta(minutes=run), 180))  # 22:0x to 01:0x next day
+        sink.close()
+
+    assert {path.parent.relative_to(tmp_path).as_posix() for path in _files(tmp_path)} == {
+        "date=2024-02-01/hour=22",
+        "date=2024-02-01/hour=23",
+        "date=2024-02-02/hour=0",
+        "date=2024-02-02/hour=1",
+    }
+    assert len(_files(tmp_path)) == 3 + 4  # two runs never overwrite each other
+    assert read_events(tmp_path).num_rows == 360
+    metadata = pq.ParquetFile(_files(tmp_path)[0]).metadata
+    assert max(metadata.row_group(idx).num_rows for idx in range(metadata.num_row_groups)) <= 25
+    assert metadata.row_group(0).column(5).statistics.has_min_max  # event_ts
+
+
+def test_reads_prune_partitions_and_filter_event_ts(tmp_path):
+    sink = PartitionedEventSink(tmp_path)
+    sink.append(_table(START, 180))
+    sink.close()
+    start, end = START + timedelta(minutes=90), START + timedelta(minutes=130)
+
+    table = read_events(tmp_path, start, end, columns=["event_ts", "transaction_amount"])
+
+    assert table.num_rows == 40
+    assert table["transaction_amount"].to_pylist() == [float(idx) for idx in range(90, 130)]
+    fragments = list(dataset(tmp_path).get_fragments(filter=partition_filter(start, end)))
+    assert sorted(fragment.path.split("/")[-2] for fragment in fragments) == ["hour=0", "hour=23"]
+    assert read_events(tmp_path / "missing", start, end).num_rows == 0
+
+
+def test_compaction_merges_small_files_outside_the_current_hour(tmp_path):
+    for minute in range(0, 120, 10):
+        sink = PartitionedEventSink(tmp_path)
+        sink.append(_table(START + timedelta(minutes=minute), 10))
+        sink.close()
+    before = read_events(tmp_path).sort_by("event_ts")
+
+    report = compact(tmp_path, target_rows=1_000, before=START + timedelta(hours=1))
+
+    assert (report.partitions, report.files_in, report.files_out, report.rows) == (1, 6, 1, 60)
+    per_hour = {}
+    for path in _files(tmp_path):
+        per_hour.setdefault(path.parent.name, []).append(path.name)
+    assert len(per_hour["hour=22"]) == 1 and per_hour["hour=22"][0].startswith("part-compacted")
+    assert len(per_hour["hour=23"]) == 6  # still being written
+    assert read_events(tmp_path).sort_by("event_ts").equals(before)
+
+
+def test_interrupted_compaction_never_shows_duplicates_and_is_finished_later(tmp_path, monkeypatch):
+    for minute in range(0, 60, 10):
+        sink = PartitionedEventSink(tmp_path)
+        sink.append(_table(START + timedelta(minutes=minute), 10))
+        sink.close()
+    before = read_events(tmp_path).sort_by("event_ts")
+    unlink = Path.unlink
+
+    def crash_on_inputs(path, missing_ok=False):
+        if path.name.startswith("part-") and not path.name.startswith("part-compacted"):
+            raise OSError("crashed between publishing and cleanup")
+        unlink(path, missing_ok=missing_ok)
+
+    monkeypatch.setattr(Path, "unlink", crash_on_inputs)
+    with pytest.raises(OSError):
+        compact(tmp_path, target_rows=1_000)
+    monkeypatch.setattr(Path, "unlink", unlink)
+
+    assert len(_files(tmp_path)) == 7  # published file and all six inputs
+    assert read_events(tmp_path).sort_by("event_ts").equals(before)
+
+    report = compact(tmp_path, target_rows=1_000)
+
+    assert report.partitions == 0
+    assert [path.name[:14] for path in tmp_path.rglob("*") if path.is_file()] == ["part-compacted"]
+    assert read_events(tmp_path).sort_by("event_ts").equals(before)
+
+
+def test_compaction_that_crashed_while_writing_leaves_nothing_behind(tmp_path, monkeypatch):
+    for minute in range(0, 60, 10):
+        sink = PartitionedEventSink(tmp_path)
+        sink.append(_table(START + timedelta(minutes=minute), 10))
+        sink.close()
+    before = read_events(tmp_path).sort_by("event_ts")
+    write_table = offline.pq.write_table
+
+    def crash_after_writing(table, where, **kwargs):
+        write_table(table, where, **kwargs)
+        raise OSError("crashed before publishing")
+
+    monkeypatch.setattr(offline.pq, "write_table", crash_after_writing)
+    with pytest.raises(OSError):
+        compact(tmp_path, target_rows=1_000)
+    monkeypatch.undo()
+    directory = tmp_path / "date=2024-02-01" / "hour=22"
+    assert len(list(directory.glob("_compact-*.inputs"))) == 1  # journal precedes the output
+    (directory / "_compact-0123456789ab.parquet").write_bytes(b"left by an older run")
+
+    report = compact(tmp_path, target_rows=1_000)
+
+    assert report.partitions == 1
+    assert [path.name[:14] for path in tmp_path.rglob("*") if path.is_file()] == ["part-compacted"]
+    assert read_events(tmp_path).sort_by("event_ts").equals(before)
+
+
+def test_stream_job_writes_each_batch_before_committing(tmp_path):
+    consumer, store = FakeConsumer(RECORDS), FlakyStore()
+    sink = PartitionedEventSink(tmp_path)
+    ingestor = StreamIngestor(consumer, store, LocalPubSub(), max_wait_ms=1, offline=sink)
+
+    assert ingestor.run_once() == 3
+
+    assert consumer.commits == 1
+    assert [path.name for path in _files(tmp_path)] == ["part-transactions-p0-o0-0.parquet"]
+    table = read_events(tmp_path)
+    assert sorted(table["transaction_amount"].to_pylist()) == [10.0, 20.0, 30.0]
+    assert table["created_at"].null_count == 0
+
+
+class FlakyDeadLetters(RecordingSink):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def write(self, letters):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("dead-letter topic unavailable")
+        super().write(letters)
+
+
+def test_stream_job_does_not_append_a_rewound_batch_twice(tmp_path):
+    records = [*RECORDS, Record("transactions", 0, 3, b"\xe7\x01truncated")]
+    consumer, sink = FakeConsumer(records), PartitionedEventSink(tmp_path)
+    ingestor = StreamIngestor(
+        consumer,
+        FlakyStore(),
+        LocalPubSub(),
+        max_wait_ms=1,
+        retry_backoff_s=0,
+        dead_letters=FlakyDeadLetters(failures=1),
+        offline=sink,
+    )
+
+    assert ingestor.run_once() == 0  # the online and offline rows landed, the dead letter did not
+    assert ingestor.run_once() == 4
+
+    assert consumer.commits == 1
+    assert read_events(tmp_path).num_rows == 3
+
+
+def test_stream_job_rewinds_a_batch_whose_offline_write_failed(tmp_path, monkeypatch):
+    consumer, store = FakeConsumer(RECORDS), FlakyStore()
+    sink = PartitionedEventSink(tmp_path)
+    ingestor = StreamIngestor(
+        consumer, store, LocalPubSub(), max_wait_ms=1, retry_backoff_s=0, offline=sink
+    )
+    write_dataset = offline.ds.write_dataset
+
+    def disk_full(*args, **kwargs):
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr(offline.ds, "write_dataset", disk_full)
+    assert ingestor.run_once() == 0
+    assert consumer.commits == 0
+    monkeypatch.setattr(offline.ds, "write_dataset", write_dataset)
+    assert ingestor.run_once() == 3
+
+    assert consumer.commits == 1
+    assert sorted(read_events(tmp_path)["transaction_amount"].to_pylist()) == [10.0, 20.0, 30.0]
+
+
+class CrashingConsumer(FakeConsumer):
+    def commit(self):
+        raise SystemExit("killed before committing")
+
+
+def test_stream_job_replay_after_a_crash_replaces_the_uncommitted_files(tmp_path):
+    records = [
+        Record("transactions", 0, offset, {**RECORDS[0].value, "user_id": user, "event_ts": ts})
+        for offset, (user, ts) in enumerate(
+            [
+                ("u1", "2024-02-01T22:59:00Z"),
+                ("u2", "2024-02-01T23:00:00Z"),
+                ("u3", "2024-02-01T23:01:00Z"),
+            ]
+        )
+    ]
+    crashed = StreamIngestor(
+        CrashingConsumer(records),
+        FlakyStore(),
+        LocalPubSub(),
+        max_wait_ms=1,
+        offline=PartitionedEventSink(tmp_path),
+    )
+    with pytest.raises(SystemExit):
+        crashed.run_once()
+    assert read_events(tmp_path).num_rows == 3  # written, never committed
+
+    # The partition's next owner starts from the last commit, in smaller batches.
+    consumer = FakeConsumer(records)
+    replay = StreamIngestor(
+        consumer,
+        FlakyStore(),
+        LocalPubSub(),
+        max_records=1,
+        max_wait_ms=1,
+        offline=PartitionedEventSink(tmp_path),
+    )
+    assert [replay.run_once() for _ in records] == [1, 1, 1]
+
+    assert consumer.commits == 3
+    assert sorted(read_events(tmp_path)["user_id"].to_pylist()) == ["u1", "u2", "u3"]
+
+
+def test_streaming_writer_keeps_one_file_per_hour_of_full_row_groups(tmp_path):
+    writer = StreamingEventWriter(tmp_path, row_group_size=40)
+    finished = []
+    for chunk in range(6):  # 30-minute chunks: 22:00 to 01:00 next day
+        writer.write(_table(START + timedelta(minutes=30 * chunk), 30))
+        finished.append(len(dataset(tmp_path).files))  # readers skip "_"-prefixed files
+    assert finished == [0, 0, 1, 1, 2, 2]
+    writer.close()
+
+    files = _files(tmp_path)
+    assert [path.parent.name for path in files] == ["hour=22", "hour=23", "hour=0"]
+    assert [str(path) for path in files] == writer.files
+    for path in files:
+        metadata = pq.ParquetFile(path).metadata
+        sizes = [metadata.row_group(idx).num_rows for idx in range(metadata.num_row_groups)]
+        assert sizes == [40, 20]
+    assert not list(tmp_path.rglob("_*"))
+    assert writer.rows_written == 180
+    table = read_events(tmp_path).sort_by("event_ts")
+    assert table.num_rows == 180
+    assert table["created_at"].null_count == 0
+
+
+def test_streaming_writer_starts_a_new_file_for_late_rows(tmp_path):
+    writer = StreamingEventWriter(tmp_path)
+    writer.write(_table(START, 10))
+    writer.write(_table(START + timedelta(hours=1), 10))
+    writer.write(_table(START + timedelta(minutes=30), 5))  # back into 22:00, already closed
+    writer.close()
+
+    per_hour = {}
+    for path in _files(tmp_path):
+        per_hour.setdefault(path.parent.name, []).append(path.name)
+    assert len(per_hour["hour=22"]) == 2
+    assert read_events(tmp_path).num_rows == 25
+
+
+def test_batch_job_streaming_mode_appends_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setenv("OFFLINE_EVENTS_PATH", str(tmp_path))
+    get_settings.cache_clear()
+    try:
+        batch_job.main(["--rows", "2500", "--streaming", "--chunk-rows", "300"])
+        batch_job.main(["--rows", "500"])
+    finally:
+        get_settings.cache_clear()
+
+    table = read_events(tmp_path)
+    assert table.num_rows == 3000
+    assert table["created_at"].null_count == 0
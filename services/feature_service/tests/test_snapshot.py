@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from feast import FeatureView, Field, FileSource
+from feast.types import Float32, Int64
+
+from services.feature_service.feast_repo.entities import user
+from services.feature_service.feast_repo.snapshot import export_snapshot
+from services.feature_service.ingestion.offline import PartitionedEventSink
+from services.serving.app.feature_snapshot import FeatureSnapshot
+
+NOW = datetime(2024, 2, 3, tzinfo=timezone.utc)
+
+
+class ViewStore:
+    def __init__(self, view):
+        self.view = view
+
+    def get_feature_view(self, name):
+        assert name == self.view.name
+        return self.view
+
+    def get_entity(self, name):
+        assert name == user.name
+        return user
+
+
+@pytest.fixture
+def events(tmp_path):
+    rows = [
+        # user, minutes before NOW, amount, created minutes before NOW
+        ("u1", 120, 1.0, 120),
+        ("u1", 30, 2.0, 30),
+        ("u1", 30, 3.0, 20),  # same event_ts, written later
+        ("u1", -5, 4.0, -5),  # after the snapshot's end
+        ("u2", 60 * 30, 5.0, 60 * 30),  # older than a day
+        ("u10", 10, 6.0, 10),
+    ]
+    users, minutes, amounts, created = zip(*rows, strict=True)
+    sink = PartitionedEventSink(tmp_path / "events")
+    sink.append(
+        pa.table(
+            {
+                "event_id": [f"evt-{idx:020d}" for idx in range(len(rows))],
+                "user_id": list(users),
+                "transaction_amount": list(amounts),
+                "country": ["US"] * len(rows),
+                "device": ["web"] * len(rows),
+                "event_ts": pd.to_datetime([NOW - timedelta(minutes=m) for m in minutes]),
+                "label": [1] * len(rows),
+                "created_at": pd.to_datetime([NOW - timedelta(minutes=m) for m in created]),
+            }
+        )
+    )
+    sink.close()
+    return tmp_path / "events"
+
+
+def _view(path, ttl=None):
+    return FeatureView(
+        name="transaction_features",
+        entities=[user],
+        ttl=ttl,
+        schema=[
+            Field(name="transaction_amount", dtype=Float32),
+            Field(name="label", dtype=Int64),
+        ],
+        source=FileSource(
+            path=str(path), timestamp_field="event_ts", created_timestamp_column="created_at"
+        ),
+    )
+
+
+def test_export_writes_the_latest_row_per_user_as_of_end(events, tmp_path):
+    path = tmp_path / "snapshot.arrow"
+
+    table = export_snapshot(ViewStore(_view(events)), "transaction_features", path, end=NOW)
+
+    assert table.num_rows == 3
+    snapshot = FeatureSnapshot(path)
+    assert snapshot.get("u1") == {"transaction_amount": 3.0, "label": 1}
+    assert snapshot.get("u2") == {"transaction_amount": 5.0, "label": 1}
+    assert snapshot.get("u10") == {"transaction_amount": 6.0, "label": 1}
+    assert snapshot._mapped.keys.tolist() == [b"u1", b"u10", b"u2"]
+    assert snapshot.metadata["feature_view"] == "transaction_features"
+    assert snapshot.metadata["end"] == NOW.isoformat()
+
+
+def test_export_drops_rows_older_than_the_view_ttl(events, tmp_path):
+    path = tmp_path / "snapshot.arrow"
+
+    export_snapshot(ViewStore(_view(events, timedelta(days=1))), "transaction_features", path, NOW)
+
+    snapshot = FeatureSnapshot(path)
+    assert len(snapshot) == 2
+    assert snapshot.get("u2") is None
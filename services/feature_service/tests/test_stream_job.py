@@ -0,0 +1,221 @@
+from collections import namedtuple
+
+from kafka import TopicPartition
+from prometheus_client import REGISTRY
+
+from services.common import wire
+from services.common.pubsub import FEATURE_UPDATES_CHANNEL, LocalPubSub
+from services.common.schemas import Event
+from services.feature_service.ingestion.aggregates import WindowedAggregator
+from services.feature_service.ingestion.stream_job import StreamIngestor
+
+Record = namedtuple("Record", "topic partition offset value")
+HeaderRecord = namedtuple("HeaderRecord", "topic partition offset value headers")
+
+
+def _event(user_id: str, amount: float, ts: str) -> dict:
+    return {
+        "event_id": "01HQA7F9G4G1YJ2R4D8K2J3A5S",
+        "user_id": user_id,
+        "transaction_amount": amount,
+        "country": "US",
+        "device": "ios",
+        "event_ts": ts,
+        "label": 0,
+    }
+
+
+class FakeConsumer:
+    def __init__(self, records):
+        self.records = list(records)
+        self.position = 0
+        self.commits = 0
+        self.seeks = []
+
+    def poll(self, timeout_ms=0, max_records=500):
+        batch = self.records[self.position : self.position + max_records]
+        self.position += len(batch)
+        return {TopicPartition("transactions", 0): batch} if batch else {}
+
+    def commit(self):
+        self.commits += 1
+
+    def seek(self, partition, offset):
+        self.seeks.append((partition, offset))
+        self.position = offset
+
+
+class FlakyStore:
+    def __init__(self, failures=0, view=None):
+        self.failures = failures
+        self.view = view
+        self.writes = []
+
+    def write_to_online_store(self, feature_view_name, df):
+        if self.failures and self.view in (None, feature_view_name):
+            self.failures -= 1
+            raise ConnectionError("redis unavailable")
+        self.writes.append((feature_view_name, df))
+
+
+RECORDS = [
+    Record("transactions", 0, 0, _event("u1", 10.0, "2024-02-01T00:00:00Z")),
+    Record("transactions", 0, 1, _event("u2", 20.0, "2024-02-01T00:00:01Z")),
+    Record("transactions", 0, 2, _event("u1", 30.0, "2024-02-01T00:00:02Z")),
+]
+
+
+def test_batch_keeps_latest_row_per_user_and_commits_after_write():
+    consumer, store, bus = FakeConsumer(RECORDS), FlakyStore(), LocalPubSub()
+    published = []
+    bus.subscribe(FEATURE_UPDATES_CHANNEL, published.append)
+    ingestor = StreamIngestor(consumer, store, bus, max_records=10, max_wait_ms=1)
+
+    assert ingestor.run_once() == 3
+
+    assert len(store.writes) == 1
+    view, frame = store.writes[0]
+    assert view == "transaction_features"
+    assert dict(zip(frame["user_id"], frame["transaction_amount"], strict=True)) == {
+        "u1": 30.0,
+        "u2": 20.0,
+    }
+    assert consumer.commits == 1
+    assert sorted(published) == ["u1", "u2"]
+
+
+def test_failed_write_rewinds_without_committing():
+    consumer, store = FakeConsumer(RECORDS), FlakyStore(failures=1)
+    ingestor = StreamIngestor(
+        consumer, store, LocalPubSub(), max_records=10, max_wait_ms=1, retry_backoff_s=0
+    )
+
+    assert ingestor.run_once() == 0
+    assert consumer.commits == 0
+    assert consumer.seeks == [(TopicPartition("transactions", 0), 0)]
+
+    assert ingestor.run_once() == 3
+    assert consumer.commits == 1
+    assert len(store.writes) == 1
+
+
+def test_retried_batch_is_folded_into_aggregates_once():
+    consumer = FakeConsumer(RECORDS)
+    store = FlakyStore(failures=1, view="transaction_aggregates")
+    ingestor = StreamIngestor(
+        consumer,
+        store,
+        LocalPubSub(),
+        max_records=10,
+        max_wait_ms=1,
+        retry_backoff_s=0,
+        aggregator=WindowedAggregator(),
+    )
+
+    assert ingestor.run_once() == 0
+    assert ingestor.run_once() == 3
+
+    view, aggregates = store.writes[-1]
+    assert view == "transaction_aggregates"
+    counts = dict(zip(aggregates["user_id"], aggregates["txn_count_24h"], strict=True))
+    assert counts == {"u1": 2, "u2": 1}
+
+
+def test_raw_json_and_binary_messages_share_a_topic():
+    events = [Event(**record.value) for record in RECORDS]
+    records = [
+        Record("transactions", 0, 0, wire.encode_json(events[0])),
+        Record("transactions", 0, 1, wire.encode_binary(events[1])),
+        Record("transactions", 0, 2, wire.encode_binary(events[2])),
+    ]
+    store = FlakyStore()
+    ingestor = StreamIngestor(FakeConsumer(records), store, LocalPubSub(), max_wait_ms=1)
+
+    assert ingestor.run_once() == 3
+    _, frame = store.writes[0]
+    assert dict(zip(frame["user_id"], frame["transaction_amount"], strict=True)) == {
+        "u1": 30.0,
+        "u2": 20.0,
+    }
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_batch_records_throughput_write_latency_and_freshness():
+    before = {
+        "messages": _sample("stream_ingest_messages_total", {"worker": "metrics"}),
+        "writes": _sample(
+            "stream_ingest_write_latency_seconds_count", {"feature_view": "transaction_features"}
+        ),
+        "fresh": _sample("stream_ingest_freshness_seconds_count"),
+        "stale": _sample("stream_ingest_freshness_seconds_bucket", {"le": "3600.0"}),
+    }
+    ingestor = StreamIngestor(
+        FakeConsumer(RECORDS), FlakyStore(), LocalPubSub(), max_wait_ms=1, worker="metrics"
+    )
+
+    assert ingestor.run_once() == 3
+
+    assert _sample("stream_ingest_messages_total", {"worker": "metrics"}) == before["messages"] + 3
+    assert (
+        _sample(
+            "stream_ingest_write_latency_seconds_count", {"feature_view": "transaction_features"}
+        )
+        == before["writes"] + 1
+    )
+    assert _sample("stream_ingest_freshness_seconds_count") == before["fresh"] + 3
+    # The fixture events are from 2024, so all three land beyond the last finite bucket.
+    assert _sample("stream_ingest_freshness_seconds_bucket", {"le": "3600.0"}) == before["stale"]
+
+
+class RecordingSink:
+    def __init__(self):
+        self.letters = []
+
+    def write(self, letters):
+        self.letters.extend(letters)
+
+
+def test_invalid_events_are_dead_lettered_without_stalling_the_batch():
+    labels = {"reason": "transaction_amount.greater_than_equal"}
+    before = _sample("stream_ingest_validation_failures_total", labels)
+    records = [
+        RECORDS[0],
+        Record("transactions", 0, 1, _event("u2", -5.0, "2024-02-01T00:00:01Z")),
+        Record("transactions", 0, 2, _event("u3", 5.0, "2999-01-01T00:00:00Z")),
+        Record("transactions", 0, 3, b"\xe7\x01truncated"),
+        RECORDS[2]._replace(offset=4),
+    ]
+    consumer, store, sink = FakeConsumer(records), FlakyStore(), RecordingSink()
+    ingestor = StreamIngestor(consumer, store, LocalPubSub(), max_wait_ms=1, dead_letters=sink)
+
+    assert ingestor.run_once() == 5
+
+    _, frame = store.writes[0]
+    assert list(frame["user_id"]) == ["u1"]
+    assert consumer.commits == 1
+    assert [(letter.offset, letter.error_type) for letter in sink.letters] == [
+        (1, "transaction_amount.greater_than_equal"),
+        (2, "value_error"),
+        (3, "WireFormatError"),
+    ]
+    assert _sample("stream_ingest_validation_failures_total", labels) == before + 1
+
+
+def test_unexpected_decode_errors_are_dead_lettered_not_dropped():
+    broken = HeaderRecord("transactions", 0, 1, b"{}", [("content-type", None)])
+    records = [RECORDS[0], broken, RECORDS[2]]
+    consumer, store, sink = FakeConsumer(records), FlakyStore(), RecordingSink()
+    ingestor = StreamIngestor(consumer, store, LocalPubSub(), max_wait_ms=1, dead_letters=sink)
+
+    assert ingestor.run_once() == 3
+
+    _, frame = store.writes[0]
+    assert list(frame["user_id"]) == ["u1"]
+    assert [(letter.offset, letter.error_type) for letter in sink.letters] == [
+        (1, "AttributeError")
+    ]
+    assert consumer.commits == 1
+    assert consumer.seeks == []
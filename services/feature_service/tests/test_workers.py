@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+
+from prometheus_client import REGISTRY
+
+from services.common.memory_broker import InMemoryBroker
+from services.common.pubsub import LocalPubSub
+from services.feature_service.ingestion.stream_job import StreamIngestor
+from services.feature_service.ingestion.workers import IngestionSupervisor, WorkerReport
+
+TOPIC = "transactions"
+
+
+class RecordingStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.writes = 0
+
+    def write_to_online_store(self, feature_view_name, df):
+        if feature_view_name != "transaction_features":
+            return
+        with self.lock:
+            self.writes += 1
+            for user_id, amount in zip(df["user_id"], df["transaction_amount"], strict=True):
+                self.rows[user_id] = amount
+
+
+def _produce(broker, count, users=20):
+    for idx in range(count):
+        user_id = f"user-{idx % users}"
+        event = {
+            "event_id": f"01HQA7F9G4G1YJ2R{idx:010d}",
+            "user_id": user_id,
+            "transaction_amount": float(idx),
+            "country": "US",
+            "device": "ios",
+            "event_ts": f"2024-02-01T00:{idx // 60 % 60:02d}:{idx % 60:02d}Z",
+            "label": 0,
+        }
+        broker.produce(TOPIC, json.dumps(event).encode(), key=user_id.encode())
+
+
+def _consumer(broker):
+    return broker.consumer("ingest", value_deserializer=lambda raw: json.loads(raw))
+
+
+def _drained(broker):
+    return all(
+        broker.committed("ingest", tp) == broker.end_offset(tp)
+        for tp in broker.partitions_for(TOPIC)
+    )
+
+
+def test_supervised_workers_split_partitions_and_keep_per_user_order():
+    broker = InMemoryBroker(partitions=4)
+    broker.create_topic(TOPIC)
+    _produce(broker, 400)
+    store = RecordingStore()
+    supervisor = IngestionSupervisor(
+        lambda: _consumer(broker),
+        lambda: store,
+        TOPIC,
+        workers=2,
+        use_processes=False,
+        max_records=50,
+        max_wait_ms=5,
+        report_interval_s=0.01,
+    )
+    supervisor.start()
+    deadline = time.monotonic() + 10
+    while not _drained(broker) and time.monotonic() < deadline:
+        supervisor.supervise_once(0.05)
+    supervisor.stop()
+
+    assert _drained(broker)
+    # The last event produced for each user is the one left in the store.
+    assert store.rows == {f"user-{u}": float(380 + u) for u in range(20)}
+    assert set(supervisor.last_reports) == {0, 1}
+    assert sum(report.messages_total for report in supervisor.last_reports.values()) == 400
+    assert all(sum(report.lag.values()) == 0 for report in supervisor.last_reports.values())
+
+
+def test_rebalance_flushes_in_flight_batch_before_revoking():
+    broker = InMemoryBroker(partitions=2)
+    broker.create_topic(TOPIC)
+    _produce(broker, 40, users=8)
+    store = RecordingStore()
+    first = StreamIngestor(_consumer(broker), store, LocalPubSub(), max_records=100, max_wait_ms=1)
+    first.subscribe(TOPIC)
+    assert len(first.poll_batch()) == 40  # polled but not yet written
+
+    second = StreamIngestor(_consumer(broker), store, LocalPubSub(), max_records=100, max_wait_ms=1)
+    second.subscribe(TOPIC)
+    first.poll_batch()  # sees the rebalance: flushes and commits before giving partitions up
+    assert store.writes == 1
+    assert _drained(broker)
+
+    _produce(broker, 40, users=8)
+    for _ in range(5):
+        first.run_once()
+        second.run_once()
+    assert _drained(broker)
+    assert first.messages_total + second.messages_total == 80
+    assert second.messages_total > 0
+
+
+def test_partition_lag_is_one_series_per_partition_across_rebalances():
+    supervisor = IngestionSupervisor(
+        lambda: None, lambda: None, TOPIC, workers=2, use_processes=False
+    )
+
+    def lag(partition):
+        return REGISTRY.get_sample_value("stream_ingest_partition_lag", {"partition": partition})
+
+    supervisor._record(WorkerReport(0, 10, {0: 5, 1: 7}, reported_at=1.0))
+    supervisor._record(WorkerReport(1, 10, {2: 3}, reported_at=1.0))
+    # Partition 1 moves to worker 1 before worker 0 reports again.
+    supervisor._record(WorkerReport(1, 20, {1: 4, 2: 3}, reported_at=2.0))
+    assert (lag("0"), lag("1"), lag("2")) == (5, 4, 3)
+
+    supervisor._record(WorkerReport(0, 20, {0: 2}, reported_at=3.0))
+    supervisor._record(WorkerReport(1, 30, {2: 1}, reported_at=3.0))  # partition 1 unowned
+    assert (lag("0"), lag("1"), lag("2")) == (2, 0, 1)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+from services.model_training.training_set import build_training_set
+
 
 def load_training_frame(
     path: str | Path = "data/sample/events.csv",
@@ -16,6 +19,24 @@ def load_training_frame(
     return features, target
 
 
+def read_labels(path: str | Path) -> pd.DataFrame:
+    """Labelled entity rows (``user_id``, ``event_ts``, ``label``) from a CSV or parquet file."""
+    if Path(path).suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, parse_dates=["event_ts"])
+
+
+def load_point_in_time_frame(
+    labels: pd.DataFrame, root: str | Path = "data/offline/events", **options: Any
+) -> tuple[pd.DataFrame, pd.Series]:
+    """Features as the offline store held them at each label's ``event_ts``."""
+    df = build_training_set(labels.dropna(subset=["label"]), root, **options)
+    df = df.dropna(subset=["transaction_amount", "country", "device"])
+    features = df[["transaction_amount", "country", "device", "event_ts"]].copy()
+    target = df["label"].astype(int)
+    return features, target
+
+
 def split_data(features: pd.DataFrame, target: pd.Series, test_size: float = 0.2, seed: int = 42):
     return train_test_split(
         features, target, test_size=test_size, random_state=seed, stratify=target
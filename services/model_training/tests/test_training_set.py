@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from services.feature_service.ingestion.offline import PartitionedEventSink
+from services.model_training.data_prep import load_point_in_time_frame
+from services.model_training.training_set import build_training_set, entity_chunks
+
+START = datetime(2024, 2, 1, 22, tzinfo=timezone.utc)
+
+
+def _write_history(root, rows):
+    """rows: (user_id, minutes after START, amount, created minutes after START)."""
+    users, minutes, amounts, created = zip(*rows, strict=True)
+    sink = PartitionedEventSink(root)
+    sink.append(
+        pa.table(
+            {
+                "event_id": [f"evt-{idx:020d}" for idx in range(len(rows))],
+                "user_id": list(users),
+                "transaction_amount": list(amounts),
+                "country": ["US"] * len(rows),
+                "device": ["web"] * len(rows),
+                "event_ts": pd.to_datetime([START + timedelta(minutes=m) for m in minutes]),
+                "label": [0] * len(rows),
+                "created_at": pd.to_datetime([START + timedelta(minutes=m) for m in created]),
+            }
+        )
+    )
+    sink.close()
+
+
+def _labels(rows):
+    users, minutes = zip(*rows, strict=True)
+    return pd.DataFrame(
+        {
+            "user_id": list(users),
+            "event_ts": [START + timedelta(minutes=m) for m in minutes],
+            "label": [idx % 2 for idx in range(len(rows))],
+        }
+    )
+
+
+def test_joins_the_latest_value_at_or_before_each_label_without_leakage(tmp_path):
+    _write_history(
+        tmp_path,
+        [
+            ("u1", 0, 1.0, 0),
+            ("u1", 30, 2.0, 30),
+            ("u1", 30, 3.0, 45),  # re-delivered later with a correction
+            ("u1", 90, 4.0, 90),  # crosses into the next hour partition
+            ("u2", 10, 5.0, 10),
+        ],
+    )
+    labels = _labels([("u1", 90), ("u2", 5), ("u1", 29), ("u3", 60), ("u1", 30), ("u2", 200)])
+
+    result = build_training_set(labels, tmp_path)
+
+    assert result["user_id"].tolist() == labels["user_id"].tolist()  # input order kept
+    assert result["label"].tolist() == labels["label"].tolist()
+    np.testing.assert_array_equal(
+        result["transaction_amount"], [4.0, np.nan, 1.0, np.nan, 3.0, 5.0]
+    )
+    assert result["country"].isna().tolist()[:3] == [False, True, False]
+
+
+def test_ttl_drops_stale_history(tmp_path):
+    _write_history(tmp_path, [("u1", 0, 1.0, 0), ("u2", 50, 2.0, 50)])
+    labels = _labels([("u1", 60), ("u2", 60)])
+
+    result = build_training_set(labels, tmp_path, ttl=timedelta(minutes=30))
+
+    np.testing.assert_array_equal(result["transaction_amount"], [np.nan, 2.0])
+
+
+def test_chunked_and_parallel_builds_match_a_row_by_row_lookup(tmp_path):
+    rng = np.random.default_rng(7)
+    history = [
+        (f"u{rng.integers(20)}", int(minute), float(idx), int(minute))
+        for idx, minute in enumerate(rng.integers(0, 240, 400))
+    ]
+    _write_history(tmp_path, history)
+    labels = _labels([(f"u{rng.integers(25)}", int(m)) for m in rng.integers(0, 300, 300)])
+
+    chunks = entity_chunks(labels, "user_id", chunk_rows=40)
+    assert len(chunks) > 2
+    assert sum(len(chunk) for chunk in chunks) == len(labels)
+    assert all(
+        not set(left["user_id"]) & set(right["user_id"])
+        for left, right in zip(chunks, chunks[1:], strict=False)
+    )
+
+    single = build_training_set(labels, tmp_path)
+    parallel = build_training_set(labels, tmp_path, chunk_rows=40, workers=2)
+    pd.testing.assert_frame_equal(single, parallel)
+
+    frame = pd.DataFrame(history, columns=["user_id", "minute", "amount", "created"])
+    expected = []
+    for user_id, minute in zip(labels["user_id"], labels["event_ts"], strict=True):
+        minute = (minute - START) / timedelta(minutes=1)
+        seen = frame[(frame["user_id"] == user_id) & (frame["minute"] <= minute)]
+        # Rows tied on event_ts and created_at resolve to the one written last.
+        seen = seen.sort_values(["minute", "created"], kind="stable")
+        expected.append(seen["amount"].iloc[-1] if len(seen) else np.nan)
+    np.testing.assert_array_equal(single["transaction_amount"], expected)
+
+
+def test_point_in_time_frame_keeps_rows_with_features(tmp_path):
+    _write_history(tmp_path, [("u1", 0, 1.0, 0)])
+    labels = _labels([("u1", 10), ("u2", 10)])
+    labels["event_ts"] = labels["event_ts"].dt.tz_localize(None)  # naive means UTC
+
+    features, target = load_point_in_time_frame(labels, tmp_path)
+
+    assert features.columns.tolist() == ["transaction_amount", "country", "device", "event_ts"]
+    assert features["transaction_amount"].tolist() == [1.0]
+    assert target.tolist() == [0]
+    assert build_training_set(labels.iloc[:0], tmp_path).columns.tolist()[-3:] == [
+        "transaction_amount",
+        "country",
+        "device",
+    ]
@@ -15,7 +15,12 @@ from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from services.common.config import get_settings
 from services.common.logging import configure_logging, get_logger
 from services.common.mlflow_utils import configure_mlflow_env
-from services.model_training.data_prep import load_training_frame, split_data
+from services.model_training.data_prep import (
+    load_point_in_time_frame,
+    load_training_frame,
+    read_labels,
+    split_data,
+)
 
 logger = get_logger(__name__)
 
@@ -49,7 +54,15 @@ def train() -> None:
 
     configure_logging()
     mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
-    features, target = load_training_frame()
+    if settings.training_labels_path:
+        features, target = load_point_in_time_frame(
+            read_labels(settings.training_labels_path),
+            settings.offline_events_path,
+            chunk_rows=settings.training_set_chunk_rows,
+            workers=min(settings.training_set_workers, os.cpu_count() or 1),
+        )
+    else:
+        features, target = load_training_frame()
     X_train, X_test, y_train, y_test = split_data(features, target)
     pipeline = build_pipeline()
     with mlflow.start_run(run_name="training") as run:
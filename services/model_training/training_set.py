@@ -0,0 +1,115 @@
+"""Point-in-time training sets built from the offline event history.
+
+Each labelled row ``(user_id, event_ts)`` gets the newest feature row for that
+user with ``event_ts`` at or before its own (and no older than ``ttl``), the
+rows Feast's ``get_historical_features`` returns; ties on ``event_ts`` go to the
+latest ``created_at``. Labels are split into chunks of contiguous user ids, each
+chunk reads only the history for its id range and time span from the
+``date=``/``hour=`` partitions and joins it with one sorted ``merge_asof``.
+Chunks are independent, so they run in a process pool.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from services.feature_service.ingestion.offline import read_events
+
+FEATURES = ["transaction_amount", "country", "device"]
+_ROW = "_row"
+_FEATURE_TS = "_feature_ts"
+
+
+def _utc_ns(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, utc=True).astype("datetime64[ns, UTC]")
+
+
+def entity_chunks(entities: pd.DataFrame, entity_key: str, chunk_rows: int) -> list[pd.DataFrame]:
+    """Split ``entities`` into chunks of about ``chunk_rows`` rows; no key spans two chunks."""
+    counts = entities[entity_key].value_counts(sort=False).sort_index()
+    chunk_of = (counts.cumsum() - 1) // max(chunk_rows, 1)
+    return [chunk for _, chunk in entities.groupby(entities[entity_key].map(chunk_of))]
+
+
+def _join_chunk(
+    root: str,
+    chunk: pd.DataFrame,
+    entity_key: str,
+    timestamp: str,
+    features: list[str],
+    ttl: timedelta | None,
+) -> pd.DataFrame:
+    keys = ds.field(entity_key)
+    # The store keeps microseconds; widen the bounds so no row at the edges is cut.
+    start = (chunk[timestamp].min() - ttl).floor("us") if ttl else None
+    end = chunk[timestamp].max().floor("us") + pd.Timedelta(1, "us")
+    history = read_events(
+        root,
+        start=start,
+        end=end,
+        columns=[entity_key, "event_ts", "created_at", *features],
+        predicate=(keys >= chunk[entity_key].min()) & (keys <= chunk[entity_key].max()),
+    ).to_pandas()
+    history = (
+        history.rename(columns={"event_ts": _FEATURE_TS})
+        .assign(**{_FEATURE_TS: lambda frame: _utc_ns(frame[_FEATURE_TS])})
+        .sort_values([_FEATURE_TS, "created_at"], kind="stable", na_position="first")
+        .drop_duplicates([entity_key, _FEATURE_TS], keep="last")
+    )
+    joined = pd.merge_asof(
+        chunk.sort_values(timestamp, kind="stable"),
+        history[[entity_key, _FEATURE_TS, *features]],
+        left_on=timestamp,
+        right_on=_FEATURE_TS,
+        by=entity_key,
+        tolerance=pd.Timedelta(ttl) if ttl else None,
+        direction="backward",
+    )
+    return joined.drop(columns=_FEATURE_TS)
+
+
+def build_training_set(
+    entities: pd.DataFrame,
+    root: str | Path,
+    features: list[str] | None = None,
+    entity_key: str = "user_id",
+    timestamp: str = "event_ts",
+    ttl: timedelta | None = None,
+    chunk_rows: int = 1_000_000,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """``entities`` with ``features`` as of each row's ``timestamp``, in the input order.
+
+    Rows without history (or only history older than ``ttl``) get missing values.
+    """
+    features = features or FEATURES
+    if entities.empty:
+        return entities.reindex(columns=[*entities.columns, *features])
+    entities = entities.assign(
+        **{timestamp: _utc_ns(entities[timestamp]), _ROW: np.arange(len(entities))}
+    )
+    chunks = entity_chunks(entities, entity_key, chunk_rows)
+    task = partial(
+        _join_chunk,
+        str(root),
+        entity_key=entity_key,
+        timestamp=timestamp,
+        features=features,
+        ttl=ttl,
+    )
+    if workers <= 1 or len(chunks) == 1:
+        joined = [task(chunk) for chunk in chunks]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(workers, len(chunks)), mp_context=context) as pool:
+            joined = list(pool.map(task, chunks))
+    result = pd.concat(joined, ignore_index=True).sort_values(_ROW, kind="stable")
+    return result.drop(columns=_ROW).reset_index(drop=True)
@@ -0,0 +1,269 @@
+"""Rate-controlled load generation for the event producer.
+
+Each generator process owns one ``KafkaProducer`` and paces sends with a
+token bucket. Sends are fire-and-forget with ack/error callbacks, so batching
+is left to the producer (``linger_ms``/``batch_size``/compression) instead of
+a blocking flush per batch. Ack latency goes into a log-bucketed histogram
+that merges across processes for the final report.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import multiprocessing
+import queue
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
+
+from services.common import wire
+from services.common.config import Settings
+from services.common.data import SyntheticEventGenerator
+from services.common.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 5% wide latency buckets from 10us to ~100s.
+LATENCY_BOUNDS = tuple(1e-5 * 1.05**idx for idx in range(int(math.log(1e7, 1.05)) + 1))
+
+
+class TokenBucket:
+    """Allows ``rate`` tokens per second with bursts of up to ``burst`` tokens."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate / 100)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens - 1e-9:  # float refill can fall a hair short
+                self._tokens = max(0.0, self._tokens - tokens)
+                return
+            self._sleep((tokens - self._tokens) / self.rate)
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BOUNDS) + 1)
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+
+    def merge(self, other: LatencyHistogram) -> None:
+        self.counts = [
+            mine + theirs for mine, theirs in zip(self.counts, other.counts, strict=True)
+        ]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the ``q`` quantile."""
+        total = self.total
+        if not total:
+            return math.nan
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BOUNDS[min(idx, len(LATENCY_BOUNDS) - 1)]
+        return LATENCY_BOUNDS[-1]
+
+
+@dataclass
+class LoadReport:
+    sent: int = 0
+    acked: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    elapsed_s: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def throughput(self) -> float:
+        return self.acked / self.elapsed_s if self.elapsed_s else 0.0
+
+    @classmethod
+    def merge(cls, reports: list[LoadReport]) -> LoadReport:
+        merged = cls()
+        for report in reports:
+            merged.sent += report.sent
+            merged.acked += report.acked
+            merged.errors.update(report.errors)
+            merged.elapsed_s = max(merged.elapsed_s, report.elapsed_s)
+            merged.latency.merge(report.latency)
+        return merged
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "acked": self.acked,
+            "errors": sum(self.errors.values()),
+            "error_types": dict(self.errors),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "throughput_eps": round(self.throughput, 1),
+            **{
+                f"p{int(q * 1000) / 10:g}_ms": round(self.latency.percentile(q) * 1000, 3)
+                for q in (0.5, 0.95, 0.99, 0.999)
+            },
+        }
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    topic: str
+    rate: float
+    duration_s: float = 0.0  # 0 runs until interrupted
+    processes: int = 1
+    chunk_size: int = 100
+    seed: int = 42
+    flush_timeout_s: float = 30.0
+    report_interval_s: float = 10.0
+    wire_format: str = "json"
+
+    @classmethod
+    def from_settings(cls, settings: Settings, **overrides: Any) -> LoadConfig:
+        config = cls(
+            topic=settings.event_topic,
+            rate=settings.producer_rate,
+            processes=settings.producer_processes,
+            wire_format=settings.event_wire_format,
+        )
+        return replace(
+            config, **{key: value for key, value in overrides.items() if value is not None}
+        )
+
+
+def generate_load(
+    producer: Any,
+    config: LoadConfig,
+    seed: int | None = None,
+    stop: Any = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> LoadReport:
+    """Send events at ``config.rate`` until ``duration_s`` elapses or ``stop`` is set."""
+    report = LoadReport()
+    generator = SyntheticEventGenerator(seed=config.seed if seed is None else seed)
+    chunk = max(1, min(config.chunk_size, int(config.rate // 10)))
+    bucket = TokenBucket(config.rate, burst=max(chunk, config.rate / 100), clock=clock, sleep=sleep)
+
+    def acked(started: float, _metadata: Any) -> None:
+        report.acked += 1
+        report.latency.record(clock() - started)
+
+    def failed(_started: float, exc: BaseException) -> None:
+        report.errors[type(exc).__name__] += 1
+
+    headers = wire.headers_for(config.wire_format)
+    started_at = clock()
+    deadline = started_at + config.duration_s if config.duration_s > 0 else math.inf
+    next_log = started_at + config.report_interval_s
+    try:
+        while clock() < deadline and not (stop is not None and stop.is_set()):
+            bucket.acquire(chunk)
+            for event in generator.stream(batch_size=chunk):
+                sent_at = clock()
+                try:
+                    future = producer.send(
+                        config.topic,
+                        value=event,
+                        key=event.user_id.encode("utf-8"),
+                        headers=headers,
+                    )
+                except Exception as exc:  # buffer full, serialization, closed producer
+                    report.errors[type(exc).__name__] += 1
+                    continue
+                report.sent += 1
+                future.add_callback(acked, sent_at)
+                future.add_errback(failed, sent_at)
+            if clock() >= next_log:
+                logger.info("Load generator progress: %s", report.summary())
+                next_log = clock() + config.report_interval_s
+    except KeyboardInterrupt:
+        pass
+    finally:
+        producer.flush(timeout=config.flush_timeout_s)
+        report.elapsed_s = clock() - started_at
+    return report
+
+
+def _generator_process(
+    index: int, producer_factory: Callable[[], Any], config: LoadConfig, stop: Any, reports: Any
+) -> None:
+    producer = producer_factory()
+    try:
+        reports.put(generate_load(producer, config, seed=config.seed + index, stop=stop))
+    finally:
+        producer.close()
+
+
+def run_load(config: LoadConfig, producer_factory: Callable[[], Any]) -> LoadReport:
+    """Run ``config.processes`` generators, each at an equal share of the target rate."""
+    if config.processes <= 1:
+        producer = producer_factory()
+        try:
+            return generate_load(producer, config)
+        finally:
+            producer.close()
+
+    share = replace(config, rate=config.rate / config.processes)
+    context = multiprocessing.get_context("spawn")
+    stop, reports = context.Event(), context.Queue()
+    handles = [
+        context.Process(
+            target=_generator_process,
+            args=(index, producer_factory, share, stop, reports),
+            name=f"loadgen-{index}",
+        )
+        for index in range(config.processes)
+    ]
+    for handle in handles:
+        handle.start()
+    results: list[LoadReport] = []
+    try:
+        while len(results) < len(handles):
+            try:
+                results.append(reports.get(timeout=1.0))
+            except queue.Empty:
+                # A generator that dies (e.g. no brokers) never reports; stop waiting for it.
+                crashed = [handle for handle in handles if handle.exitcode not in (None, 0)]
+                if len(results) + len(crashed) >= len(handles):
+                    break
+                if all(handle.exitcode is not None for handle in handles):
+                    break
+    except KeyboardInterrupt:
+        stop.set()
+        for _ in range(len(handles) - len(results)):
+            try:
+                results.append(reports.get(timeout=config.flush_timeout_s + 5))
+            except queue.Empty:
+                break
+    finally:
+        for handle in handles:
+            handle.join()
+    missing = len(handles) - len(results)
+    if missing and not results:
+        codes = [handle.exitcode for handle in handles]
+        raise RuntimeError(f"Every load generator exited without a report (exit codes {codes})")
+    if missing:
+        logger.error("%d of %d load generators exited without a report", missing, len(handles))
+    return LoadReport.merge(results)
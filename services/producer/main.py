@@ -1,43 +1,64 @@
 from __future__ import annotations
 
+import argparse
 import json
-import time
-from typing import Any
+from functools import partial
 
 from kafka import KafkaProducer
 
-from services.common.config import get_settings
-from services.common.data import SyntheticEventGenerator, events_to_dicts
+from services.common import wire
+from services.common.config import Settings, get_settings
 from services.common.logging import configure_logging, get_logger
+from services.producer.loadgen import LoadConfig, run_load
 
 logger = get_logger(__name__)
 
 
-def serialize(event: dict[str, Any]) -> bytes:
-    return json.dumps(event, default=str).encode("utf-8")
+def build_producer(settings: Settings) -> KafkaProducer:
+    compression = settings.producer_compression.lower()
+    return KafkaProducer(
+        bootstrap_servers=settings.kafka_brokers,
+        value_serializer=wire.serializer(settings.event_wire_format),
+        linger_ms=settings.producer_linger_ms,
+        batch_size=settings.producer_batch_size,
+        compression_type=None if compression == "none" else compression,
+        acks=settings.producer_acks,
+    )
 
 
-def main() -> None:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream synthetic events into Redpanda")
+    parser.add_argument("--rate", type=float, help="Target events/sec across all processes")
+    parser.add_argument("--duration", type=float, help="Seconds to run (0 = until interrupted)")
+    parser.add_argument("--processes", type=int, help="Generator processes")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--report-json", help="Write the final report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
     configure_logging()
+    args = parse_args(argv)
     settings = get_settings()
-    producer = KafkaProducer(bootstrap_servers=settings.kafka_brokers, value_serializer=serialize)
-    generator = SyntheticEventGenerator()
-    logger.info("Starting producer loop to %s", settings.kafka_brokers)
-
-    try:
-        while True:
-            batch = events_to_dicts(generator.stream(batch_size=5))
-            for event in batch:
-                producer.send(
-                    settings.event_topic, value=event, key=event["user_id"].encode("utf-8")
-                )
-            producer.flush()
-            time.sleep(1.0)
-    except KeyboardInterrupt:
-        logger.info("Stopping producer...")
-    finally:
-        producer.flush()
-        producer.close()
+    config = LoadConfig.from_settings(
+        settings,
+        rate=args.rate,
+        duration_s=args.duration,
+        processes=args.processes,
+        seed=args.seed,
+    )
+    logger.info(
+        "Producing %s events to %s at %.0f events/s with %d process(es)",
+        config.wire_format,
+        settings.kafka_brokers,
+        config.rate,
+        config.processes,
+    )
+    report = run_load(config, partial(build_producer, settings)).summary()
+    logger.info("Producer report: %s", report)
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import itertools
+import time
+
+import pytest
+from kafka.errors import KafkaTimeoutError
+from kafka.future import Future
+
+from services.producer.loadgen import (
+    LatencyHistogram,
+    LoadConfig,
+    LoadReport,
+    TokenBucket,
+    generate_load,
+    run_load,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeProducer:
+    """Each send takes 0.2ms and acks the previous one, 0.4ms after it was sent; every tenth send fails."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sends = itertools.count()
+        self.pending = None
+        self.flushed = False
+
+    def send(self, topic, value, key, headers=None):
+        self.clock.sleep(0.0002)
+        self._resolve()
+        idx = next(self.sends)
+        if idx == 25:
+            raise KafkaTimeoutError("buffer full")
+        self.pending = (idx, Future())
+        return self.pending[1]
+
+    def flush(self, timeout=None):
+        self.clock.sleep(0.0002)
+        self._resolve()
+        self.flushed = True
+
+    def _resolve(self):
+        if self.pending is not None:
+            idx, future = self.pending
+            if idx % 10 == 9:
+                future.failure(KafkaTimeoutError("expired"))
+            else:
+                future.success(None)
+            self.pending = None
+
+
+def test_token_bucket_paces_to_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, burst=10, clock=clock, sleep=clock.sleep)
+    for _ in range(110):
+        bucket.acquire()
+    # The first 10 tokens are the burst; the remaining 100 take one second.
+    assert abs(clock.now - 1.0) < 1e-6
+
+
+def test_generate_load_paces_and_counts_acks_errors_and_latency():
+    clock = FakeClock()
+    producer = FakeProducer(clock)
+    config = LoadConfig(topic="transactions", rate=100, duration_s=1.0, chunk_size=10)
+
+    report = generate_load(producer, config, clock=clock, sleep=clock.sleep)
+
+    assert producer.flushed
+    assert 100 <= report.sent <= 111
+    failed = sum(1 for idx in range(report.sent + 1) if idx != 25 and idx % 10 == 9)
+    assert report.errors["KafkaTimeoutError"] == 1 + failed
+    assert report.acked == report.sent - failed
+    assert report.latency.total == report.acked
+    assert 0.0004 <= report.latency.percentile(0.5) < 0.0004 * 1.05
+
+
+def test_reports_merge_across_processes():
+    first, second = LoadReport(sent=10, acked=9, elapsed_s=2.0), LoadReport(sent=5, acked=5)
+    first.errors["KafkaTimeoutError"] += 1
+    for seconds in (0.001, 0.002):
+        first.latency.record(seconds)
+    second.latency.record(0.1)
+
+    merged = LoadReport.merge([first, second])
+
+    assert (merged.sent, merged.acked, merged.throughput) == (15, 14, 7.0)
+    assert merged.summary()["errors"] == 1
+    assert merged.latency.total == 3
+    assert 0.1 <= merged.latency.percentile(0.99) < 0.106
+
+
+def test_histogram_percentile_is_within_one_bucket():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert 0.095 <= histogram.percentile(0.95) < 0.095 * 1.05
+
+
+def unreachable_producer():
+    raise ConnectionError("no brokers available")
+
+
+def test_run_load_fails_fast_when_every_generator_dies():
+    config = LoadConfig(topic="transactions", rate=100, duration_s=1, processes=2)
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="exited without a report"):
+        run_load(config, unreachable_producer)
+    assert time.monotonic() - started < 60
@@ -0,0 +1,151 @@
+"""Node-local, content-addressed cache of serialized model artifacts."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import joblib
+
+from services.common.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl; fall back to unlocked access
+    fcntl = None  # type: ignore[assignment]
+
+logger = get_logger(__name__)
+
+
+class ArtifactCache:
+    """Joblib blobs keyed by sha256, indexed by ``name/version``.
+
+    Replicas on one node point at the same directory; index updates are
+    serialized with an exclusive file lock. Entries are evicted least recently
+    used first once the blobs exceed ``max_bytes``, except the last known-good
+    version of each model, which is kept so a replica can start while the
+    registry is unreachable.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = 2 * 1024**3) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+        self.lock_path = self.root / ".lock"
+
+    def get(self, name: str, version: str) -> Any | None:
+        with self._locked() as index:
+            entry = index["entries"].get(f"{name}/{version}")
+            if entry is None:
+                return None
+            path = self.blob_dir / f"{entry['checksum']}.joblib"
+            if not path.exists() or _sha256(path) != entry["checksum"]:
+                logger.warning("Dropping corrupt cached artifact %s/%s", name, version)
+                del index["entries"][f"{name}/{version}"]
+                path.unlink(missing_ok=True)
+                return None
+            entry["last_used"] = time.time()
+        try:
+            return joblib.load(path)
+        except FileNotFoundError:  # evicted by another replica between index read and load
+            return None
+
+    def put(self, name: str, version: str, model: Any) -> str:
+        fd, tmp = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump(model, tmp)
+            checksum = _sha256(Path(tmp))
+            size = os.path.getsize(tmp)
+            # Publish the blob and its index entry together: another replica's
+            # eviction holds the same lock, so it cannot unlink a blob that has
+            # landed but is not indexed yet.
+            with self._locked() as index:
+                os.replace(tmp, self.blob_dir / f"{checksum}.joblib")
+                index["entries"][f"{name}/{version}"] = {
+                    "checksum": checksum,
+                    "size": size,
+                    "last_used": time.time(),
+                }
+                self._evict(index)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return checksum
+
+    def mark_good(self, name: str, version: str) -> None:
+        with self._locked() as index:
+            if f"{name}/{version}" in index["entries"]:
+                index["last_good"][name] = version
+
+    def last_good(self, name: str) -> tuple[str, Any] | None:
+        with self._locked() as index:
+            version = index["last_good"].get(name)
+        if version is None:
+            return None
+        model = self.get(name, version)
+        return (version, model) if model is not None else None
+
+    def total_bytes(self) -> int:
+        with self._locked() as index:
+            return self._blob_bytes(index)
+
+    def _evict(self, index: dict[str, Any]) -> None:
+        protected = {f"{name}/{version}" for name, version in index["last_good"].items()}
+        candidates = sorted(
+            (key for key in index["entries"] if key not in protected),
+            key=lambda key: index["entries"][key]["last_used"],
+        )
+        while self._blob_bytes(index) > self.max_bytes and candidates:
+            key = candidates.pop(0)
+            checksum = index["entries"].pop(key)["checksum"]
+            if all(entry["checksum"] != checksum for entry in index["entries"].values()):
+                (self.blob_dir / f"{checksum}.joblib").unlink(missing_ok=True)
+            logger.info("Evicted cached artifact %s", key)
+
+    @staticmethod
+    def _blob_bytes(index: dict[str, Any]) -> int:
+        sizes = {entry["checksum"]: entry["size"] for entry in index["entries"].values()}
+        return sum(sizes.values())
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict[str, Any]]:
+        with open(self.lock_path, "a+", encoding="utf-8") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = self._read_index()
+                before = json.dumps(index, sort_keys=True)
+                yield index
+                if json.dumps(index, sort_keys=True) != before:
+                    self._write_index(index)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self) -> dict[str, Any]:
+        if not self.index_path.exists():
+            return {"entries": {}, "last_good": {}}
+        return json.loads(self.index_path.read_text(encoding="utf-8"))
+
+    def _write_index(self, index: dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(index, handle)
+        os.replace(tmp, self.index_path)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
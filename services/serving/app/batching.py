@@ -0,0 +1,120 @@
+"""Dynamic micro-batching for concurrent single-item requests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Sequence, TypeVar
+
+from services.serving.app.metrics import BATCH_QUEUE_WAIT, BATCH_SIZE
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class _Pending(Generic[T, R]):
+    item: T
+    future: asyncio.Future[R]
+    enqueued: float
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects concurrent submissions and hands them to ``handler`` as one batch.
+
+    A batch is dispatched once ``max_batch_size`` items are queued or the oldest
+    item has waited ``max_wait_ms``, whichever comes first. The batcher binds
+    lazily to the running event loop, so it works under plain uvicorn and inside
+    Ray Serve replicas alike. A ``max_batch_size`` of 1 disables batching.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[Sequence[R]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "default",
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be > 0")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max(max_wait_ms, 0.0) / 1000.0
+        self.name = name
+        self._batch_size = BATCH_SIZE.labels(batcher=name)
+        self._queue_wait = BATCH_QUEUE_WAIT.labels(batcher=name)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[_Pending[T, R]] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._inflight: set[asyncio.Task[Any]] = set()
+
+    async def submit(self, item: T) -> R:
+        if self.max_batch_size == 1:
+            self._batch_size.observe(1)
+            self._queue_wait.observe(0.0)
+            return (await self.handler([item]))[0]
+        queue = self._ensure_worker()
+        future: asyncio.Future[R] = asyncio.get_running_loop().create_future()
+        queue.put_nowait(_Pending(item, future, time.perf_counter()))
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _ensure_worker(self) -> asyncio.Queue[_Pending[T, R]]:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        if queue is None or self._loop is not loop or self._worker is None or self._worker.done():
+            queue = asyncio.Queue()
+            self._loop = loop
+            self._queue = queue
+            self._worker = loop.create_task(self._run(queue))
+        return queue
+
+    async def _run(self, queue: asyncio.Queue[_Pending[T, R]]) -> None:
+        while True:
+            batch = [await queue.get()]
+            deadline = batch[0].enqueued + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except TimeoutError:
+                    break
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[_Pending[T, R]]) -> None:
+        now = time.perf_counter()
+        self._batch_size.observe(len(batch))
+        for pending in batch:
+            self._queue_wait.observe(now - pending.enqueued)
+        try:
+            results = await self.handler([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as exc:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+            return
+        for pending, result in zip(batch, results, strict=True):
+            if not pending.future.done():
+                pending.future.set_result(result)
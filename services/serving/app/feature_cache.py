@@ -0,0 +1,91 @@
+"""Bounded TTL/LRU cache in front of the online feature store."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from services.common.pubsub import FEATURE_UPDATES_CHANNEL, PubSub
+from services.serving.app.metrics import (
+    FEATURE_CACHE_EVICTIONS,
+    FEATURE_CACHE_HITS,
+    FEATURE_CACHE_MISSES,
+    FEATURE_CACHE_STALENESS,
+)
+
+
+class FeatureCache:
+    """Per-user feature rows evicted by size (LRU), age (TTL) or invalidation.
+
+    Invalidations are remembered for users that are not cached, so a lookup that
+    was already in flight when the stream job published an update cannot put
+    its stale result back into the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._invalidated: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str) -> dict[str, Any] | None:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                FEATURE_CACHE_MISSES.inc()
+                return None
+            stored_at, row = entry
+            age = now - stored_at
+            if age > self.ttl_seconds:
+                del self._entries[user_id]
+                FEATURE_CACHE_EVICTIONS.labels(reason="ttl").inc()
+                FEATURE_CACHE_MISSES.inc()
+                return None
+            self._entries.move_to_end(user_id)
+        FEATURE_CACHE_HITS.inc()
+        FEATURE_CACHE_STALENESS.observe(age)
+        return row
+
+    def put(self, user_id: str, row: dict[str, Any], fetched_at: float | None = None) -> bool:
+        """Cache ``row`` unless ``user_id`` was invalidated after ``fetched_at``."""
+
+        now = self.clock()
+        fetched_at = now if fetched_at is None else fetched_at
+        with self._lock:
+            invalidated_at = self._invalidated.get(user_id)
+            if invalidated_at is not None and invalidated_at >= fetched_at:
+                return False
+            self._entries[user_id] = (fetched_at, row)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                FEATURE_CACHE_EVICTIONS.labels(reason="size").inc()
+        return True
+
+    def invalidate(self, user_id: str) -> None:
+        now = self.clock()
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                FEATURE_CACHE_EVICTIONS.labels(reason="invalidated").inc()
+            self._invalidated[user_id] = now
+            self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > self.max_entries:
+                self._invalidated.popitem(last=False)
+
+    def attach(self, bus: PubSub, channel: str = FEATURE_UPDATES_CHANNEL) -> Callable[[], None]:
+        return bus.subscribe(channel, self.invalidate)
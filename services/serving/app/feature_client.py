@@ -1,25 +1,130 @@
-from typing import Dict
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Mapping, Sequence
 
 from feast import FeatureStore
 
 from services.common.config import get_settings
 from services.common.logging import get_logger
+from services.common.pubsub import get_feature_update_bus
 from services.common.schemas import Event, FeatureVector
+from services.serving.app.batching import MicroBatcher
+from services.serving.app.feature_cache import FeatureCache
+from services.serving.app.feature_snapshot import FeatureSnapshot
+from services.serving.app.metrics import (
+    FEATURE_FETCH_LATENCY,
+    FEATURE_LOOKUPS_COALESCED,
+    FEATURE_STORE_ROUNDTRIP,
+)
 
 logger = get_logger(__name__)
 
+FEATURE_REFS = [
+    "transaction_features:transaction_amount",
+    "transaction_features:label",
+    "transaction_aggregates:amount_zscore_1h",
+]
+FEATURE_NAMES = tuple(ref.split(":", 1)[1] for ref in FEATURE_REFS)
+ZSCORE_FEATURE = "amount_zscore_1h"
+
+
+def _zscore(value: Any) -> float | None:
+    # Users without streamed history have no aggregates yet.
+    return float(value) if value is not None else None
+
+
+class _OnlineResponse:
+    def __init__(self, payload: Dict[str, list[Any]]) -> None:
+        self._payload = payload
+
+    def to_dict(self) -> Dict[str, list[Any]]:
+        return self._payload
+
+
+class InMemoryOnlineStore:
+    """Process-local stand-in for the Feast online store.
+
+    Mirrors the ``get_online_features(...).to_dict()`` shape so serving can be
+    exercised and benchmarked without Redis. ``latency_ms`` simulates the
+    network round-trip of a real store.
+    """
+
+    def __init__(
+        self,
+        rows: Mapping[str, Mapping[str, Any]] | None = None,
+        latency_ms: float = 0.0,
+    ) -> None:
+        self.rows: dict[str, dict[str, Any]] = {key: dict(row) for key, row in (rows or {}).items()}
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def put(self, user_id: str, features: Mapping[str, Any]) -> None:
+        self.rows[user_id] = dict(features)
+
+    def get_online_features(
+        self, features: Sequence[str], entity_rows: Sequence[Mapping[str, Any]]
+    ) -> _OnlineResponse:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        names = [ref.split(":", 1)[-1] for ref in features]
+        user_ids = [row["user_id"] for row in entity_rows]
+        payload: Dict[str, list[Any]] = {"user_id": user_ids}
+        for name in names:
+            payload[name] = [self.rows.get(user_id, {}).get(name) for user_id in user_ids]
+        return _OnlineResponse(payload)
+
 
 class FeatureService:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        store: Any | None = None,
+        cache: FeatureCache | None = None,
+        snapshot: FeatureSnapshot | None = None,
+    ) -> None:
         settings = get_settings()
-        self.store = FeatureStore(repo_path=settings.feast_repo_path)
+        if store is not None:
+            self.store = store
+        elif settings.feature_store_backend == "memory":
+            self.store = InMemoryOnlineStore()
+        else:
+            self.store = FeatureStore(repo_path=settings.feast_repo_path)
+        self._batcher: MicroBatcher[str, dict[str, Any] | None] = MicroBatcher(
+            self._lookup_batch,
+            max_batch_size=settings.feature_batch_max_size,
+            max_wait_ms=settings.feature_batch_max_wait_ms,
+            name="feature-fetch",
+        )
+        self._inflight: dict[str, asyncio.Future[dict[str, Any] | None]] = {}
+        self.cache = cache
+        if self.cache is None and settings.feature_cache_enabled:
+            self.cache = FeatureCache(
+                max_entries=settings.feature_cache_max_entries,
+                ttl_seconds=settings.feature_cache_ttl_s,
+            )
+            self.cache.attach(get_feature_update_bus())
+            if settings.feature_update_bus == "local" and not isinstance(
+                self.store, InMemoryOnlineStore
+            ):
+                # The stream job publishes from its own process; only Redis carries that here.
+                logger.warning(
+                    "FEATURE_UPDATE_BUS=local: stream updates will not invalidate cached "
+                    "features, which are served until FEATURE_CACHE_TTL_S expires them"
+                )
+        self.snapshot = snapshot
+        if self.snapshot is None and settings.feature_snapshot_enabled:
+            self.snapshot = FeatureSnapshot(
+                settings.feature_snapshot_path,
+                check_interval_s=settings.feature_snapshot_check_interval_s,
+            )
 
     def fetch(self, event: Event) -> FeatureVector:
+        start = time.perf_counter()
         try:
             features: Dict[str, Dict[str, float]] = self.store.get_online_features(
-                features=[
-                    f"transaction_features:{name}" for name in ("transaction_amount", "label")
-                ],
+                features=FEATURE_REFS,
                 entity_rows=[{"user_id": event.user_id}],
             ).to_dict()
         except Exception as exc:  # pragma: no cover - fallback path
@@ -27,12 +132,105 @@ class FeatureService:
             features = {
                 "transaction_amount": [event.transaction_amount],
                 "label": [event.label or 0],
+                ZSCORE_FEATURE: [None],
             }
+        FEATURE_FETCH_LATENCY.labels(mode="sync").observe(time.perf_counter() - start)
         return FeatureVector(
             user_id=event.user_id,
             transaction_amount=event.transaction_amount,
             event_ts=event.event_ts,
-            amount_zscore=float(features.get("transaction_amount", [event.transaction_amount])[0]),
+            amount_zscore=_zscore(features.get(ZSCORE_FEATURE, [None])[0]),
             country_onehot=None,
             device_onehot=None,
         )
+
+    async def fetch_async(self, event: Event) -> FeatureVector:
+        """Fetch features without blocking the event loop.
+
+        Cached rows are served directly. Otherwise concurrent lookups are merged
+        into one multi-entity store call and duplicate in-flight lookups for the
+        same ``user_id`` share one result.
+        """
+
+        start = time.perf_counter()
+        row = self.cache.get(event.user_id) if self.cache is not None else None
+        if row is None:
+            row = await self._lookup(event.user_id)
+        FEATURE_FETCH_LATENCY.labels(mode="async").observe(time.perf_counter() - start)
+        return FeatureVector(
+            user_id=event.user_id,
+            transaction_amount=event.transaction_amount,
+            event_ts=event.event_ts,
+            amount_zscore=_zscore(row.get(ZSCORE_FEATURE) if row else None),
+            country_onehot=None,
+            device_onehot=None,
+        )
+
+    async def _lookup(self, user_id: str) -> dict[str, Any] | None:
+        future = self._inflight.get(user_id)
+        if future is not None:
+            FEATURE_LOOKUPS_COALESCED.inc()
+            return await asyncio.shield(future)
+        fetched_at = self.cache.clock() if self.cache is not None else 0.0
+        future = asyncio.ensure_future(self._batcher.submit(user_id))
+        self._inflight[user_id] = future
+        future.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        row = await asyncio.shield(future)
+        if row is not None and self.cache is not None:
+            self.cache.put(user_id, row, fetched_at=fetched_at)
+        return row
+
+    async def _lookup_batch(self, user_ids: list[str]) -> list[dict[str, Any] | None]:
+        return await asyncio.to_thread(self._lookup_rows, user_ids)
+
+    def _lookup_rows(self, user_ids: list[str]) -> list[dict[str, Any] | None]:
+        """Rows from the snapshot where it has them, the online store for the rest.
+
+        The store is skipped when every user is in the snapshot and it covers
+        every feature; otherwise one call fetches what the snapshot cannot serve.
+        """
+
+        if self.snapshot is None:
+            return self._store_rows(user_ids, FEATURE_REFS)
+        snapshot_rows = self.snapshot.get_many(user_ids)
+        refs = FEATURE_REFS
+        if all(row is not None for row in snapshot_rows):
+            covered = self.snapshot.features
+            refs = [
+                ref
+                for ref, name in zip(FEATURE_REFS, FEATURE_NAMES, strict=True)
+                if name not in covered
+            ]
+        store_rows = self._store_rows(user_ids, refs) if refs else [{}] * len(user_ids)
+        rows: list[dict[str, Any] | None] = []
+        for snapshot_row, store_row in zip(snapshot_rows, store_rows, strict=True):
+            if snapshot_row is None:
+                rows.append(store_row)
+                continue
+            row = dict.fromkeys(FEATURE_NAMES)
+            row.update(store_row or {})
+            row.update((name, snapshot_row[name]) for name in FEATURE_NAMES if name in snapshot_row)
+            rows.append(row)
+        return rows
+
+    def _store_rows(self, user_ids: list[str], refs: list[str]) -> list[dict[str, Any] | None]:
+        start = time.perf_counter()
+        try:
+            payload = self.store.get_online_features(
+                features=refs,
+                entity_rows=[{"user_id": user_id} for user_id in user_ids],
+            ).to_dict()
+        except Exception as exc:
+            logger.warning("Falling back to raw features due to: %s", exc)
+            return [None] * len(user_ids)
+        finally:
+            FEATURE_STORE_ROUNDTRIP.observe(time.perf_counter() - start)
+        names = [ref.split(":", 1)[1] for ref in refs]
+        rows: list[dict[str, Any] | None] = []
+        for idx in range(len(user_ids)):
+            row = {}
+            for name in names:
+                values = payload.get(name) or []
+                row[name] = values[idx] if idx < len(values) else None
+            rows.append(row)
+        return rows
@@ -1,23 +1,42 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
-from typing import Callable
+from functools import partial
+from typing import Any, Callable
 
 import mlflow
-import pandas as pd
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.exceptions import RequestValidationError
+from opentelemetry import trace
+from opentelemetry.propagate import extract
+from opentelemetry.trace import SpanKind
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from prometheus_client.exposition import choose_encoder
 from prometheus_fastapi_instrumentator import Instrumentator
+from pydantic import ValidationError
 
-from services.common.config import get_settings
+from services.common.config import Settings, get_settings
+from services.common.fastpath import dumps_response, loads, validate_request_fast
 from services.common.logging import configure_logging, get_logger
 from services.common.mlflow_utils import configure_mlflow_env
 from services.common.schemas import InferenceRequest, InferenceResponse
+from services.common.tracing import init_tracer
+from services.serving.app.artifact_cache import ArtifactCache
+from services.serving.app.batching import MicroBatcher
 from services.serving.app.canary import CanaryStrategy
 from services.serving.app.feature_client import FeatureService
-from services.serving.app.metrics import EXCEPTION_COUNTER, REQUEST_COUNTER, REQUEST_LATENCY
-from services.serving.app.model_loader import load_model, staging_model_uri
+from services.serving.app.metrics import (
+    EXCEPTION_COUNTER,
+    MULTIPROCESS_MODE,
+    REQUEST_COUNTER,
+    REQUEST_LATENCY,
+)
+from services.serving.app.model_manager import ModelManager
+from services.serving.app.registry import build_registry
 from services.serving.app.shadow import ShadowInvoker
+from services.serving.app.stages import StageTimer, current_trace_id
 
 try:
     from ray import serve
@@ -26,6 +45,8 @@ except ImportError:  # pragma: no cover - ray optional for local dev
 
 logger = get_logger(__name__)
 configure_logging()
+init_tracer("serving")
+_tracer = trace.get_tracer(__name__)
 
 _service_provider: Callable[[], InferenceService] | None = None
 
@@ -50,58 +71,116 @@ def _ray_enabled() -> bool:
 
 
 app = FastAPI(title="Drift-Aware Inference API", version="0.1.0")
-Instrumentator().instrument(app).expose(app)
+Instrumentator().instrument(app)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request) -> Response:
+    # OpenMetrics negotiation is what carries the stage-latency exemplars.
+    encoder, content_type = choose_encoder(request.headers.get("accept", ""))
+    registry = REGISTRY
+    if MULTIPROCESS_MODE:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(content=encoder(registry), media_type=content_type)
+
+
+def build_model_manager(settings: Settings) -> ModelManager:
+    """Create the model manager and load the served version."""
+
+    models = ModelManager(
+        build_registry(settings),
+        name=settings.model_name,
+        alias=settings.model_alias,
+        poll_interval_s=settings.model_poll_interval_s,
+        warmup_requests=settings.model_warmup_requests,
+        compiled=settings.compiled_scorer_enabled,
+        cache=(
+            ArtifactCache(settings.artifact_cache_dir, settings.artifact_cache_max_bytes)
+            if settings.artifact_cache_enabled
+            else None
+        ),
+    )
+    models.load_initial()
+    return models
 
 
 class InferenceService:
-    def __init__(self) -> None:
+    def __init__(self, models: ModelManager | None = None) -> None:
         settings = get_settings()
         configure_mlflow_env(settings)
         mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
         self.settings = settings
         self.feature_service = FeatureService()
         self.canary = CanaryStrategy()
-        self.baseline_model = load_model(staging_model_uri())
-        self.canary_model = self.baseline_model  # placeholder for new candidate
-        self.shadow = ShadowInvoker(self.baseline_model) if settings.shadow_enabled else None
+        self.models = models or build_model_manager(settings)
+        self.shadow = ShadowInvoker(self.models) if settings.shadow_enabled else None
+        self.batchers: dict[str, MicroBatcher[dict[str, Any], tuple[float, str]]] = {
+            variant: MicroBatcher(
+                partial(self._score_batch, variant),
+                max_batch_size=settings.serving_batch_max_size,
+                max_wait_ms=settings.serving_batch_max_wait_ms,
+                name=f"predict-{variant}",
+            )
+            for variant in ("baseline", "canary")
+        }
         logger.info("Inference service ready with split %.2f", settings.canary_split)
 
-    def _predict(self, model, features: pd.DataFrame) -> float:
-        return float(model.predict_proba(features)[0][1])
+    async def _score_batch(
+        self, variant: str, rows: list[dict[str, Any]]
+    ) -> list[tuple[float, str]]:
+        served = self.models.current  # canary shares the served model until a candidate exists
+        # Off the event loop, so one batch's scoring does not stall every other request.
+        scores = await asyncio.to_thread(served.scorer.score_rows, rows)
+        return [(score, served.version) for score in scores.tolist()]
 
     async def health(self) -> dict[str, str]:
         return {"status": "ok"}
 
-    async def predict(self, request: InferenceRequest) -> InferenceResponse:
-        features = self.feature_service.fetch(request.event)
-        frame = pd.DataFrame(
-            [
-                {
-                    "transaction_amount": features.transaction_amount,
-                    "country": request.event.country,
-                    "device": request.event.device,
-                    "event_ts": request.event.event_ts,
-                }
-            ]
-        )
+    async def predict(
+        self, request: InferenceRequest, stages: StageTimer | None = None
+    ) -> InferenceResponse:
+        """Score one request.
+
+        Callers that time parsing and serialization pass their own ``stages``
+        and flush it themselves; otherwise the stages are recorded here.
+        """
+
+        timer = stages or StageTimer()
+        self.models.ensure_started()
+        features = await self.feature_service.fetch_async(request.event)
+        timer.mark("feature_fetch")
+        row = {
+            "transaction_amount": features.transaction_amount,
+            "country": request.event.country,
+            "device": request.event.device,
+            "event_ts": request.event.event_ts,
+        }
+        timer.mark("frame")
         decision = self.canary.choose()
-        model = self.canary_model if decision.variant == "canary" else self.baseline_model
+        timer.mark("canary")
         REQUEST_COUNTER.labels(model_variant=decision.variant).inc()
         with REQUEST_LATENCY.labels(model_variant=decision.variant).time():
             try:
-                score = self._predict(model, frame)
+                score, model_version = await self.batchers[decision.variant].submit(row)
             except Exception:  # pragma: no cover - metrics and raise
                 EXCEPTION_COUNTER.labels(model_variant=decision.variant).inc()
                 raise
+        timer.mark("score")
         if self.shadow:
-            await self.shadow.submit(frame.iloc[0].to_dict())
-        return InferenceResponse(
+            await self.shadow.submit(row, baseline_score=score)
+        timer.mark("shadow_enqueue")
+        response = InferenceResponse(
             user_id=request.user_id,
-            model_version="staging",
+            model_version=model_version,
             score=score,
             decision="approve" if score < 0.5 else "review",
             canary_variant=decision.variant,
+            trace_id=current_trace_id(),
         )
+        if stages is None:
+            timer.flush(decision.variant)
+        return response
 
 
 @app.get("/health")
@@ -109,9 +188,45 @@ async def health_endpoint() -> dict[str, str]:  # pragma: no cover - simple endp
     return await _get_service().health()
 
 
+_FAST_VALIDATION = get_settings().fast_validation
+
+
+def _parse_request(body: bytes) -> InferenceRequest:
+    if _FAST_VALIDATION:
+        return validate_request_fast(loads(body))
+    return InferenceRequest.model_validate_json(body)
+
+
+def _dump_response(response: InferenceResponse) -> bytes:
+    if _FAST_VALIDATION:
+        return dumps_response(response)
+    return response.model_dump_json().encode()
+
+
 @app.post("/predict", response_model=InferenceResponse)
-async def predict_endpoint(request: InferenceRequest) -> InferenceResponse:
-    return await _get_service().predict(request)
+async def predict_endpoint(request: Request) -> Response:
+    # One server span per request: its trace ID goes into the response and onto
+    # slow-stage exemplars, and an incoming traceparent header continues its trace.
+    with _tracer.start_as_current_span(
+        "POST /predict", context=extract(request.headers), kind=SpanKind.SERVER
+    ):
+        stages = StageTimer()
+        try:
+            inference_request = _parse_request(await request.body())
+        except ValidationError as exc:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+            ) from exc
+        except ValueError as exc:
+            raise RequestValidationError(
+                [{"type": "json_invalid", "loc": ("body",), "msg": str(exc), "input": None}]
+            ) from exc
+        stages.mark("parse")
+        response = await _get_service().predict(inference_request, stages=stages)
+        content = _dump_response(response)
+        stages.mark("serialize")
+        stages.flush(response.canary_variant)
+    return Response(content=content, media_type="application/json")
 
 
 USE_RAY_SERVE = _ray_enabled()
@@ -123,8 +238,8 @@ if USE_RAY_SERVE:
     @serve.deployment(ray_actor_options={"num_cpus": 1})
     @serve.ingress(app)
     class InferenceDeployment(InferenceService):
-        def __init__(self) -> None:
-            super().__init__()
+        def __init__(self, models: ModelManager | None = None) -> None:
+            super().__init__(models)
             _set_service_provider(lambda: self)
 
     def deployment():
@@ -133,10 +248,10 @@ if USE_RAY_SERVE:
 else:
     _fallback_service: InferenceService | None = None
 
-    def init_fallback_service() -> InferenceService:
+    def init_fallback_service(models: ModelManager | None = None) -> InferenceService:
         global _fallback_service
         if _fallback_service is None:
-            _fallback_service = InferenceDeployment()
+            _fallback_service = InferenceDeployment(models)
         return _fallback_service
 
     def deployment():  # pragma: no cover - not used without ray
@@ -147,8 +262,8 @@ else:
     class InferenceDeployment(InferenceService):
         func_or_class: type[InferenceDeployment]
 
-        def __init__(self) -> None:
-            super().__init__()
+        def __init__(self, models: ModelManager | None = None) -> None:
+            super().__init__(models)
             _set_service_provider(lambda: self)
 
     InferenceDeployment.func_or_class = InferenceDeployment
@@ -1,17 +1,144 @@
-from services.common.config import get_settings
+import gc
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+from services.common.config import Settings, get_settings
 from services.common.logging import configure_logging, get_logger
 from services.common.mlflow_utils import configure_mlflow_env
-from services.serving.app import inference
 
 logger = get_logger(__name__)
 
+HOST = "0.0.0.0"  # noqa: S104 - dev server binding
+PORT = 8000
+RESTART_MIN_UPTIME_S = 10.0
+RESTART_BACKOFF_MAX_S = 30.0
+
+
+def _prepare_multiprocess_dir() -> str | None:
+    """Point prometheus_client at a shared metrics dir; returns it if this process created it.
+
+    prometheus_client picks its value backend when first imported, so this has
+    to run before anything imports the serving app. A directory the operator
+    set is used as is: it is theirs to clean, not ours to delete.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path is not None:
+        os.makedirs(path, exist_ok=True)
+        if any(Path(path).glob("*.db")):
+            logger.warning("%s holds metric files from an earlier run; they are merged in", path)
+        return None
+    path = tempfile.mkdtemp(prefix="serving-metrics-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+def _restart_delay(uptime_s: float, previous_s: float) -> float:
+    """Seconds to wait before replacing a worker that ran for ``uptime_s``.
+
+    A worker that crashes on start would otherwise be re-forked in a tight
+    loop; the wait doubles with each early crash, up to
+    ``RESTART_BACKOFF_MAX_S``, and resets once a worker has stayed up.
+    """
+    if uptime_s >= RESTART_MIN_UPTIME_S:
+        return 0.0
+    return min(RESTART_BACKOFF_MAX_S, max(0.5, previous_s * 2))
+
+
+def _serve_prefork(settings: Settings) -> None:
+    """Load the model once, then fork workers that share the listening socket.
+
+    Workers inherit the loaded model copy-on-write. ``gc.freeze`` moves every
+    object allocated so far out of the collector's reach, so collections in
+    the workers do not touch (and copy) the pages holding the model.
+    """
+
+    import uvicorn
+    from prometheus_client import multiprocess
+
+    from services.serving.app import inference
+
+    models = inference.build_model_manager(settings)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    gc.collect()
+    gc.freeze()
+
+    def spawn() -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                inference.init_fallback_service(models)
+                server = uvicorn.Server(uvicorn.Config(inference.app, log_level="info"))
+                server.run(sockets=[sock])
+                code = 0
+            finally:
+                os._exit(code)  # never unwind into the parent's cleanup
+        return pid
+
+    stopping = False
+
+    def stop(signum: int, _frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass  # exited but not reaped yet
+
+    workers = {spawn(): time.monotonic() for _ in range(settings.serving_workers)}
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Serving model %s with %d workers", models.current.version, len(workers))
+    delay = 0.0
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, time.monotonic())
+        multiprocess.mark_process_dead(pid)
+        if stopping:
+            continue
+        delay = _restart_delay(time.monotonic() - started, delay)
+        logger.warning("Worker %d exited with status %d; restarting in %.1fs", pid, status, delay)
+        deadline = time.monotonic() + delay
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if not stopping:
+            workers[spawn()] = time.monotonic()
+    sock.close()
+
 
 def main() -> None:
     configure_logging()
     settings = get_settings()
     configure_mlflow_env(settings)
+    metrics_dir = _prepare_multiprocess_dir() if settings.serving_workers > 1 else None
+    try:
+        _serve(settings)
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def _serve(settings: Settings) -> None:
+    from services.serving.app import inference
 
     if inference.USE_RAY_SERVE:
+        if settings.serving_workers > 1:
+            raise RuntimeError("SERVING_WORKERS > 1 requires ENABLE_RAY_SERVE=0")
         import ray
         from ray import serve
 
@@ -19,6 +146,8 @@ def main() -> None:
         serve.start(detached=True)
         serve.run(inference.deployment())
         logger.info("Ray Serve running with canary split %.2f", settings.canary_split)
+    elif settings.serving_workers > 1:
+        _serve_prefork(settings)
     else:
         import uvicorn
 
@@ -26,8 +155,8 @@ def main() -> None:
         logger.info("Ray Serve disabled; starting FastAPI app locally")
         uvicorn.run(
             "services.serving.app.inference:app",
-            host="0.0.0.0",  # noqa: S104 - dev server binding
-            port=8000,
+            host=HOST,
+            port=PORT,
             log_level="info",
         )
 
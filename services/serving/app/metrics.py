@@ -1,4 +1,8 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram, values
+
+# prometheus_client picks mmap-backed values at import time when
+# PROMETHEUS_MULTIPROC_DIR is set; checking the env var later is not reliable.
+MULTIPROCESS_MODE = values.ValueClass is not values.MutexValue
 
 REQUEST_LATENCY = Histogram(
     "serving_app_request_latency_seconds",
@@ -18,3 +22,105 @@ EXCEPTION_COUNTER = Counter(
     "Prediction exceptions",
     labelnames=("model_variant",),
 )
+
+BATCH_SIZE = Histogram(
+    "serving_app_batch_size",
+    "Number of requests scored per micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+    labelnames=("batcher",),
+)
+
+BATCH_QUEUE_WAIT = Histogram(
+    "serving_app_batch_queue_wait_seconds",
+    "Time a request waited in the micro-batch queue before dispatch",
+    buckets=(0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025),
+    labelnames=("batcher",),
+)
+
+FEATURE_FETCH_LATENCY = Histogram(
+    "serving_app_feature_fetch_latency_seconds",
+    "Per-lookup online feature latency as seen by the request",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+    labelnames=("mode",),
+)
+
+FEATURE_STORE_ROUNDTRIP = Histogram(
+    "serving_app_feature_store_roundtrip_seconds",
+    "Latency of one (possibly multi-entity) online store call",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+FEATURE_LOOKUPS_COALESCED = Counter(
+    "serving_app_feature_lookups_coalesced_total",
+    "Lookups that joined an in-flight fetch for the same user_id",
+)
+
+FEATURE_CACHE_HITS = Counter(
+    "serving_app_feature_cache_hits_total",
+    "Feature lookups served from the in-process cache",
+)
+
+FEATURE_CACHE_MISSES = Counter(
+    "serving_app_feature_cache_misses_total",
+    "Feature lookups that had to go to the online store",
+)
+
+FEATURE_CACHE_EVICTIONS = Counter(
+    "serving_app_feature_cache_evictions_total",
+    "Feature cache evictions",
+    labelnames=("reason",),
+)
+
+FEATURE_CACHE_STALENESS = Histogram(
+    "serving_app_feature_cache_staleness_seconds",
+    "Age of cached feature rows when served",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+FEATURE_SNAPSHOT_LOOKUPS = Counter(
+    "serving_app_feature_snapshot_lookups_total",
+    "Feature lookups against the memory-mapped snapshot",
+    labelnames=("result",),
+)
+
+FEATURE_SNAPSHOT_ROWS = Gauge(
+    "serving_app_feature_snapshot_rows",
+    "Entities in the currently mapped feature snapshot",
+    multiprocess_mode="max",
+)
+
+SHADOW_QUEUE_DEPTH = Gauge(
+    "serving_app_shadow_queue_depth",
+    "Shadow payloads waiting to be scored",
+    multiprocess_mode="livesum",
+)
+
+SHADOW_DROPPED = Counter(
+    "serving_app_shadow_dropped_total",
+    "Shadow payloads dropped because the queue was full",
+    labelnames=("policy",),
+)
+
+SHADOW_BATCH_LATENCY = Histogram(
+    "serving_app_shadow_batch_latency_seconds",
+    "Time to score one batch of shadow payloads",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+
+SHADOW_SCORE_DELTA = Histogram(
+    "serving_app_shadow_score_delta",
+    "Absolute difference between shadow and baseline scores",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.2, 0.5, 1.0),
+)
+
+SHADOW_DECISION_FLIPS = Counter(
+    "serving_app_shadow_decision_flips_total",
+    "Shadow scores that would have changed the approve/review decision",
+)
+
+MODEL_LOAD_LATENCY = Histogram(
+    "serving_app_model_load_seconds",
+    "Time to materialize a model version, by artifact source",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0),
+    labelnames=("source",),
+)
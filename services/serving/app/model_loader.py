@@ -1,7 +1,15 @@
+from __future__ import annotations
+
 from functools import lru_cache
-from typing import Any
+from typing import Any, Mapping, Protocol, Sequence
 
 import mlflow.sklearn
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 from services.common.logging import get_logger
 
@@ -12,6 +20,141 @@ class ModelLoadError(RuntimeError):
     """Raised when an MLflow model cannot be loaded."""
 
 
+class UnsupportedPipelineError(ValueError):
+    """Raised when a fitted pipeline cannot be compiled into a NumPy scorer."""
+
+
+class Scorer(Protocol):
+    def score_rows(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray: ...
+
+
+class SklearnScorer:
+    """Scores rows through the fitted estimator's own ``predict_proba``."""
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+
+    def score_rows(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        proba = np.asarray(self.model.predict_proba(pd.DataFrame(list(rows))), dtype=np.float64)
+        return proba[:, 1]
+
+
+class CompiledScorer:
+    """StandardScaler + OneHotEncoder + binary LogisticRegression as flat arrays.
+
+    The scaler is folded into the numeric weights and every category is mapped
+    straight to its coefficient, so scoring is one dot product plus a dict lookup
+    per categorical column. Unknown categories contribute zero, matching
+    ``OneHotEncoder(handle_unknown="ignore")``.
+    """
+
+    def __init__(
+        self,
+        numeric_columns: Sequence[str],
+        numeric_weights: np.ndarray,
+        categorical_weights: Mapping[str, Mapping[Any, float]],
+        intercept: float,
+    ) -> None:
+        self.numeric_columns = tuple(numeric_columns)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=np.float64)
+        self.categorical_weights = {
+            column: dict(weights) for column, weights in categorical_weights.items()
+        }
+        self.intercept = float(intercept)
+
+    def score_rows(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        columns: dict[str, Sequence[Any]] = {
+            column: [row[column] for row in rows]
+            for column in (*self.numeric_columns, *self.categorical_weights)
+        }
+        return self.score_columns(columns)
+
+    def score_columns(self, columns: Mapping[str, Sequence[Any]]) -> np.ndarray:
+        if self.numeric_columns:
+            numeric = np.column_stack(
+                [np.asarray(columns[name], dtype=np.float64) for name in self.numeric_columns]
+            )
+            logits = numeric @ self.numeric_weights + self.intercept
+        else:
+            size = len(next(iter(columns.values())))
+            logits = np.full(size, self.intercept, dtype=np.float64)
+        for column, weights in self.categorical_weights.items():
+            values = columns[column]
+            logits += np.fromiter(
+                (weights.get(value, 0.0) for value in values), dtype=np.float64, count=len(values)
+            )
+        return 1.0 / (1.0 + np.exp(-logits))
+
+
+def _unwrap_step(transformer: Any) -> Any:
+    if isinstance(transformer, Pipeline):
+        if len(transformer.steps) != 1:
+            raise UnsupportedPipelineError("Only single-step column pipelines can be compiled")
+        return transformer.steps[0][1]
+    return transformer
+
+
+def compile_pipeline(model: Any) -> CompiledScorer:
+    """Extract scaler, vocabulary and coefficient arrays from a fitted pipeline."""
+
+    if not isinstance(model, Pipeline) or len(model.steps) != 2:
+        raise UnsupportedPipelineError("Expected Pipeline(preprocess, model)")
+    preprocessor, classifier = model.steps[0][1], model.steps[1][1]
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise UnsupportedPipelineError("Preprocessing step must be a ColumnTransformer")
+    if not isinstance(classifier, LogisticRegression) or len(classifier.classes_) != 2:
+        raise UnsupportedPipelineError("Final step must be a binary LogisticRegression")
+
+    coef = np.asarray(classifier.coef_, dtype=np.float64).ravel()
+    intercept = float(np.asarray(classifier.intercept_, dtype=np.float64)[0])
+    numeric_columns: list[str] = []
+    numeric_weights: list[float] = []
+    categorical_weights: dict[str, dict[Any, float]] = {}
+    offset = 0
+    for _, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop":
+            continue
+        if transformer == "passthrough" or not all(isinstance(col, str) for col in columns):
+            raise UnsupportedPipelineError("Only named, transformed columns can be compiled")
+        step = _unwrap_step(transformer)
+        if isinstance(step, StandardScaler):
+            mean = step.mean_ if step.with_mean else np.zeros(len(columns))
+            scale = step.scale_ if step.with_std else np.ones(len(columns))
+            weights = coef[offset : offset + len(columns)] / scale
+            numeric_columns.extend(columns)
+            numeric_weights.extend(weights.tolist())
+            intercept -= float(np.dot(mean, weights))
+            offset += len(columns)
+        elif isinstance(step, OneHotEncoder):
+            if step.handle_unknown != "ignore" or step.drop_idx_ is not None:
+                raise UnsupportedPipelineError("OneHotEncoder must ignore unknowns and not drop")
+            if getattr(step, "infrequent_categories_", None) is not None and any(
+                group is not None for group in step.infrequent_categories_
+            ):
+                raise UnsupportedPipelineError("Infrequent category grouping is not supported")
+            for column, vocabulary in zip(columns, step.categories_, strict=True):
+                categorical_weights[column] = {
+                    value: float(coef[offset + idx]) for idx, value in enumerate(vocabulary)
+                }
+                offset += len(vocabulary)
+        else:
+            raise UnsupportedPipelineError(f"Unsupported transformer {type(step).__name__}")
+    if offset != coef.size:
+        raise UnsupportedPipelineError("Feature layout does not match classifier coefficients")
+    return CompiledScorer(
+        numeric_columns, np.asarray(numeric_weights), categorical_weights, intercept
+    )
+
+
+def build_scorer(model: Any, compiled: bool = True) -> Scorer:
+    if compiled:
+        try:
+            return compile_pipeline(model)
+        except UnsupportedPipelineError as exc:
+            logger.info("Using sklearn scoring path: %s", exc)
+    return SklearnScorer(model)
+
+
 @lru_cache(maxsize=4)
 def load_model(model_uri: str) -> Any:
     logger.info("Loading model from %s", model_uri)
@@ -0,0 +1,167 @@
+"""Background registry polling and atomic hot swaps of the served model."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from services.common.data import SyntheticEventGenerator
+from services.common.logging import get_logger
+from services.serving.app.artifact_cache import ArtifactCache
+from services.serving.app.metrics import MODEL_LOAD_LATENCY
+from services.serving.app.model_loader import Scorer, build_scorer
+from services.serving.app.registry import ModelRegistry
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ServedModel:
+    version: str
+    model: Any
+    scorer: Scorer
+
+
+def warmup_rows(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    generator = SyntheticEventGenerator(seed=seed)
+    rows = []
+    for _ in range(count):
+        event = generator.sample()
+        rows.append(
+            {
+                "transaction_amount": event.transaction_amount,
+                "country": event.country,
+                "device": event.device,
+                "event_ts": event.event_ts,
+            }
+        )
+    return rows
+
+
+class ModelManager:
+    """Keeps the served model in sync with a registry alias.
+
+    New versions are loaded and warmed on a background thread, then published
+    with a single reference swap. Callers read ``current`` once per request, so
+    in-flight requests finish on the model they started with. With an
+    ``ArtifactCache`` attached, versions already on the node skip the registry
+    download and a replica can start from the last known-good version while
+    the registry is down.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        name: str,
+        alias: str,
+        poll_interval_s: float = 30.0,
+        warmup_requests: int = 64,
+        compiled: bool = True,
+        cache: ArtifactCache | None = None,
+    ) -> None:
+        self.registry = registry
+        self.cache = cache
+        self.name = name
+        self.alias = alias
+        self.poll_interval_s = poll_interval_s
+        self.warmup_requests = warmup_requests
+        self.compiled = compiled
+        self._current: ServedModel | None = None
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def current(self) -> ServedModel:
+        if self._current is None:
+            raise RuntimeError("No model loaded; call load_initial() first")
+        return self._current
+
+    def load_initial(self) -> ServedModel:
+        try:
+            self.poll_once()
+        except Exception as exc:
+            cached = self.cache.last_good(self.name) if self.cache is not None else None
+            if cached is None:
+                raise
+            version, model = cached
+            logger.warning(
+                "Registry unavailable (%s); starting from cached %s v%s", exc, self.name, version
+            )
+            self._swap(version, model)
+        return self.current
+
+    def poll_once(self) -> bool:
+        """Load, warm and swap in the aliased version if it changed."""
+
+        with self._poll_lock:
+            version = self.registry.resolve(self.name, self.alias)
+            if self._current is not None and self._current.version == version:
+                return False
+            self._swap(version, self._load(version))
+        if self.cache is not None:
+            self.cache.mark_good(self.name, version)
+        return True
+
+    def _load(self, version: str) -> Any:
+        start = time.perf_counter()
+        model = self.cache.get(self.name, version) if self.cache is not None else None
+        source = "cache"
+        if model is None:
+            source = "registry"
+            model = self.registry.load(self.name, version)
+            if self.cache is not None:
+                try:
+                    self.cache.put(self.name, version, model)
+                except Exception as exc:
+                    logger.warning("Could not cache %s v%s: %s", self.name, version, exc)
+        elapsed = time.perf_counter() - start
+        MODEL_LOAD_LATENCY.labels(source=source).observe(elapsed)
+        logger.info("Loaded %s v%s from %s in %.3fs", self.name, version, source, elapsed)
+        return model
+
+    def _swap(self, version: str, model: Any) -> None:
+        start = time.perf_counter()
+        served = ServedModel(
+            version=version, model=model, scorer=build_scorer(model, self.compiled)
+        )
+        self._warmup(served)
+        previous = self._current
+        self._current = served
+        logger.info(
+            "Serving %s v%s (previous %s) after %.3fs warmup",
+            self.name,
+            version,
+            previous.version if previous else None,
+            time.perf_counter() - start,
+        )
+
+    def ensure_started(self) -> None:
+        if self.poll_interval_s <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name="model-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval_s + 1)
+            self._thread = None
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval_s):
+            try:
+                self.poll_once()
+            except Exception as exc:
+                logger.warning("Model poll failed; keeping current version: %s", exc)
+
+    def _warmup(self, served: ServedModel) -> None:
+        if self.warmup_requests <= 0:
+            return
+        rows = warmup_rows(self.warmup_requests)
+        for row in rows:
+            served.scorer.score_rows([row])
+        served.scorer.score_rows(rows)
@@ -0,0 +1,88 @@
+"""Model registry backends the serving model manager can poll."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Protocol
+
+import joblib
+
+from services.common.config import Settings
+from services.serving.app.model_loader import ModelLoadError, load_model
+
+
+class ModelRegistry(Protocol):
+    def resolve(self, name: str, alias: str) -> str: ...
+
+    def load(self, name: str, version: str) -> Any: ...
+
+
+class MlflowModelRegistry:
+    """Resolves aliases through the MLflow registry and loads sklearn flavours."""
+
+    def __init__(self, client: Any | None = None) -> None:
+        if client is None:
+            from mlflow.tracking import MlflowClient
+
+            client = MlflowClient()
+        self.client = client
+
+    def resolve(self, name: str, alias: str) -> str:
+        return str(self.client.get_model_version_by_alias(name, alias).version)
+
+    def load(self, name: str, version: str) -> Any:
+        return load_model(f"models:/{name}/{version}")
+
+
+class FileModelRegistry:
+    """Directory-backed registry stand-in for local runs and tests.
+
+    Layout: ``<root>/<name>/aliases.json`` maps alias to version and
+    ``<root>/<name>/<version>/model.joblib`` holds each model.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def register(self, name: str, version: str, model: Any) -> Path:
+        target = self.root / name / str(version) / "model.joblib"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(model, target)
+        return target
+
+    def set_alias(self, name: str, alias: str, version: str) -> None:
+        aliases = self._aliases(name)
+        aliases[alias] = str(version)
+        path = self.root / name / "aliases.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(aliases, handle)
+        os.replace(tmp, path)
+
+    def resolve(self, name: str, alias: str) -> str:
+        try:
+            return self._aliases(name)[alias]
+        except KeyError as exc:
+            raise ModelLoadError(f"Alias {alias} not set for {name}") from exc
+
+    def load(self, name: str, version: str) -> Any:
+        path = self.root / name / str(version) / "model.joblib"
+        if not path.exists():
+            raise ModelLoadError(f"Model {name} v{version} not found under {self.root}")
+        return joblib.load(path)
+
+    def _aliases(self, name: str) -> dict[str, str]:
+        path = self.root / name / "aliases.json"
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+
+def build_registry(settings: Settings) -> ModelRegistry:
+    if settings.model_registry_backend == "file":
+        return FileModelRegistry(settings.model_registry_path)
+    return MlflowModelRegistry()
@@ -1,10 +1,125 @@
-import pandas as pd
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from services.common.config import get_settings
+from services.common.logging import get_logger
+from services.serving.app.metrics import (
+    SHADOW_BATCH_LATENCY,
+    SHADOW_DECISION_FLIPS,
+    SHADOW_DROPPED,
+    SHADOW_QUEUE_DEPTH,
+    SHADOW_SCORE_DELTA,
+)
+from services.serving.app.model_loader import Scorer, build_scorer
+from services.serving.app.model_manager import ModelManager
+
+logger = get_logger(__name__)
+
+DROP_POLICIES = ("drop_oldest", "drop_new")
 
 
 class ShadowInvoker:
-    def __init__(self, model) -> None:
-        self.model = model
+    """Scores shadow traffic in the background, off the request path.
+
+    ``submit`` only enqueues onto a bounded queue; when the queue is full either
+    the oldest queued payload or the incoming one is dropped. Worker tasks drain
+    the queue in batches and record how far the shadow score lands from the
+    baseline score that was served.
+
+    Given a ``ModelManager`` instead of a model, each batch is scored with the
+    manager's current version, so the shadow follows hot swaps.
+    """
+
+    def __init__(
+        self,
+        model: Any | ModelManager,
+        max_queue: int | None = None,
+        batch_size: int | None = None,
+        workers: int | None = None,
+        drop_policy: str | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.models: ModelManager | None = None
+        if isinstance(model, ModelManager):
+            self.models = model
+        else:
+            self._scorer = build_scorer(model, settings.compiled_scorer_enabled)
+        self.max_queue = max_queue or settings.shadow_queue_size
+        self.batch_size = batch_size or settings.shadow_batch_size
+        self.workers = workers or settings.shadow_workers
+        self.drop_policy = drop_policy or settings.shadow_drop_policy
+        if self.drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[tuple[dict[str, Any], float | None]] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def scorer(self) -> Scorer:
+        return self.models.current.scorer if self.models is not None else self._scorer
+
+    async def submit(self, payload: dict[str, Any], baseline_score: float | None = None) -> None:
+        queue = self._ensure_workers()
+        if queue.full():
+            if self.drop_policy == "drop_new":
+                SHADOW_DROPPED.labels(policy=self.drop_policy).inc()
+                return
+            queue.get_nowait()
+            queue.task_done()
+            SHADOW_DROPPED.labels(policy=self.drop_policy).inc()
+        queue.put_nowait((payload, baseline_score))
+        SHADOW_QUEUE_DEPTH.set(queue.qsize())
+
+    async def drain(self) -> None:
+        """Wait until every queued payload has been scored."""
+
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _ensure_workers(self) -> asyncio.Queue[tuple[dict[str, Any], float | None]]:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        if queue is None or self._loop is not loop:
+            queue = asyncio.Queue(maxsize=self.max_queue)
+            self._loop = loop
+            self._queue = queue
+            self._tasks = []
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._work(queue)))
+        return queue
+
+    async def _work(self, queue: asyncio.Queue[tuple[dict[str, Any], float | None]]) -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            SHADOW_QUEUE_DEPTH.set(queue.qsize())
+            try:
+                await self._score(batch)
+            except Exception as exc:
+                logger.warning("Shadow scoring failed for %d payloads: %s", len(batch), exc)
+            finally:
+                for _ in batch:
+                    queue.task_done()
 
-    async def submit(self, payload) -> None:
-        frame = pd.DataFrame([payload])
-        self.model.predict_proba(frame)
+    async def _score(self, batch: list[tuple[dict[str, Any], float | None]]) -> None:
+        start = time.perf_counter()
+        scorer = self.scorer  # read once so a swap mid-batch cannot split it
+        scores = await asyncio.to_thread(scorer.score_rows, [payload for payload, _ in batch])
+        SHADOW_BATCH_LATENCY.observe(time.perf_counter() - start)
+        for (_, baseline), shadow in zip(batch, scores, strict=False):
+            if baseline is None:
+                continue
+            SHADOW_SCORE_DELTA.observe(abs(float(shadow) - baseline))
+            if (float(shadow) < 0.5) != (baseline < 0.5):
+                SHADOW_DECISION_FLIPS.inc()
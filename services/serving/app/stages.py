@@ -0,0 +1,203 @@
+"""Per-stage latency accounting for the predict path."""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any, Iterator
+
+from opentelemetry import trace
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram
+from prometheus_client.metrics_core import HistogramMetricFamily, Metric
+from prometheus_client.registry import Collector
+from prometheus_client.samples import Exemplar
+from prometheus_client.utils import floatToGoString
+
+from services.common.config import get_settings
+from services.serving.app.metrics import MULTIPROCESS_MODE
+
+STAGES = (
+    "parse",
+    "feature_fetch",
+    "frame",
+    "canary",
+    "score",
+    "shadow_enqueue",
+    "serialize",
+)
+
+STAGE_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+
+
+def current_trace_id() -> str | None:
+    """Hex ID of the trace the current span belongs to, if one is being recorded."""
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
+
+
+def _trace_exemplar() -> dict[str, str] | None:
+    trace_id = current_trace_id()
+    return {"trace_id": trace_id} if trace_id else None
+
+
+class _Series:
+    __slots__ = ("counts", "total", "exemplars")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+        self.exemplars: list[Exemplar | None] = [None] * size
+
+
+class StageLatencyHistogram(Collector):
+    """Histogram of stage durations, labelled by stage and model variant.
+
+    ``prometheus_client.Histogram.observe`` takes a lock and costs about a
+    microsecond, which seven stages per request would multiply past the
+    budget. Stages are only observed from the event loop thread, so a bisect
+    and two list updates are enough here. Each bucket keeps its most recent
+    exemplar.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = STAGE_BUCKETS,
+        registry: CollectorRegistry | None = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.bounds = tuple(buckets)
+        self._bucket_names = [floatToGoString(bound) for bound in (*self.bounds, float("inf"))]
+        self._series: dict[tuple[str, str], _Series] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def series(self, stage: str, variant: str) -> _Series:
+        series = self._series.get((stage, variant))
+        if series is None:
+            series = self._series[(stage, variant)] = _Series(len(self.bounds) + 1)
+        return series
+
+    def observe(
+        self, stage: str, variant: str, seconds: float, exemplar: dict[str, str] | None = None
+    ) -> None:
+        series = self.series(stage, variant)
+        idx = bisect_left(self.bounds, seconds)
+        series.counts[idx] += 1
+        series.total += seconds
+        if exemplar is not None:
+            series.exemplars[idx] = Exemplar(exemplar, seconds, time.time())
+
+    def observe_stages(
+        self, variant: str, durations: list[tuple[str, float]], exemplar_threshold: float
+    ) -> None:
+        bounds = self.bounds
+        for stage, seconds in durations:
+            if seconds >= exemplar_threshold:
+                self.observe(stage, variant, seconds, _trace_exemplar())
+                continue
+            series = self._series.get((stage, variant)) or self.series(stage, variant)
+            series.counts[bisect_left(bounds, seconds)] += 1
+            series.total += seconds
+
+    def collect(self) -> Iterator[Metric]:
+        family = HistogramMetricFamily(
+            self.name, self.documentation, labels=("stage", "model_variant")
+        )
+        for (stage, variant), series in list(self._series.items()):
+            cumulative = 0
+            buckets: list[tuple] = []
+            for bucket, count, exemplar in zip(
+                self._bucket_names, series.counts, series.exemplars, strict=True
+            ):
+                cumulative += count
+                buckets.append((bucket, cumulative, exemplar) if exemplar else (bucket, cumulative))
+            family.add_metric([stage, variant], buckets, series.total)
+        yield family
+
+
+class SharedStageLatencyHistogram:
+    """Stage histogram for pre-forked workers.
+
+    Backed by ``prometheus_client``'s mmap values so every worker's
+    observations are aggregated; the multiprocess collector cannot expose
+    exemplars, so they are dropped.
+    """
+
+    def __init__(
+        self, name: str, documentation: str, buckets: tuple[float, ...] = STAGE_BUCKETS
+    ) -> None:
+        self._histogram = Histogram(
+            name, documentation, labelnames=("stage", "model_variant"), buckets=buckets
+        )
+        self._children: dict[tuple[str, str], Any] = {}
+
+    def observe(
+        self, stage: str, variant: str, seconds: float, exemplar: dict[str, str] | None = None
+    ) -> None:
+        child = self._children.get((stage, variant))
+        if child is None:
+            child = self._children[(stage, variant)] = self._histogram.labels(
+                stage=stage, model_variant=variant
+            )
+        child.observe(seconds)
+
+    def observe_stages(
+        self, variant: str, durations: list[tuple[str, float]], exemplar_threshold: float
+    ) -> None:
+        for stage, seconds in durations:
+            self.observe(stage, variant, seconds)
+
+
+_STAGE_LATENCY_ARGS = (
+    "serving_app_stage_latency_seconds",
+    "Time spent in each stage of a prediction request",
+)
+STAGE_LATENCY: StageLatencyHistogram | SharedStageLatencyHistogram = (
+    SharedStageLatencyHistogram(*_STAGE_LATENCY_ARGS)
+    if MULTIPROCESS_MODE
+    else StageLatencyHistogram(*_STAGE_LATENCY_ARGS)
+)
+
+
+class StageTimer:
+    """Splits one request into consecutive stages.
+
+    ``mark(stage)`` closes the stage that started at the previous mark. The
+    model variant is only known after canary routing, so durations are kept
+    until ``flush`` records them; stages slower than the exemplar threshold
+    carry the current trace ID.
+    """
+
+    __slots__ = ("_last", "_durations")
+
+    exemplar_threshold_s = get_settings().stage_exemplar_threshold_ms / 1000.0
+
+    def __init__(self) -> None:
+        self._durations: list[tuple[str, float]] = []
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._durations.append((stage, now - self._last))
+        self._last = now
+
+    def flush(self, variant: str) -> None:
+        STAGE_LATENCY.observe_stages(variant, self._durations, self.exemplar_threshold_s)
+        self._durations.clear()
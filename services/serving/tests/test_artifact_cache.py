@@ -0,0 +1,90 @@
+import pytest
+
+from services.serving.app.artifact_cache import ArtifactCache
+from services.serving.app.model_manager import ModelManager
+from services.serving.app.registry import FileModelRegistry
+
+
+class PayloadModel:
+    def __init__(self, payload: bytes = b"") -> None:
+        self.payload = payload
+
+    def predict_proba(self, frame):
+        return [[0.7, 0.3]] * len(frame)
+
+
+def test_cache_round_trips_and_shares_identical_blobs(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    first = cache.put("fraud-detector", "1", PayloadModel(b"same"))
+    second = cache.put("fraud-detector", "2", PayloadModel(b"same"))
+
+    assert first == second
+    assert cache.get("fraud-detector", "1").payload == b"same"
+    assert cache.get("fraud-detector", "3") is None
+    assert len(list((tmp_path / "blobs").glob("*.joblib"))) == 1
+
+
+def test_cache_evicts_lru_but_keeps_last_good(tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=15_000)
+    cache.put("fraud-detector", "1", PayloadModel(b"a" * 5_000))
+    cache.mark_good("fraud-detector", "1")
+    cache.put("fraud-detector", "2", PayloadModel(b"b" * 5_000))
+    cache.put("fraud-detector", "3", PayloadModel(b"c" * 5_000))
+
+    assert cache.get("fraud-detector", "1") is not None
+    assert cache.get("fraud-detector", "2") is None
+    assert cache.get("fraud-detector", "3") is not None
+    assert cache.total_bytes() <= 15_000
+
+
+def test_manager_starts_from_last_good_when_registry_is_down(tmp_path):
+    registry = FileModelRegistry(tmp_path / "registry")
+    registry.register("fraud-detector", "4", PayloadModel())
+    registry.set_alias("fraud-detector", "Staging", "4")
+    cache = ArtifactCache(tmp_path / "cache")
+    ModelManager(
+        registry, "fraud-detector", "Staging", warmup_requests=0, cache=cache
+    ).load_initial()
+
+    class DownRegistry:
+        def resolve(self, name, alias):
+            raise ConnectionError("registry unreachable")
+
+    manager = ModelManager(
+        DownRegistry(), "fraud-detector", "Staging", warmup_requests=0, cache=cache
+    )
+    assert manager.load_initial().version == "4"
+
+    empty = ModelManager(
+        DownRegistry(), "fraud-detector", "Staging", cache=ArtifactCache(tmp_path / "empty")
+    )
+    with pytest.raises(ConnectionError):
+        empty.load_initial()
+
+
+def test_put_publishes_the_blob_while_holding_the_index_lock(tmp_path, monkeypatch):
+    import fcntl
+
+    from services.serving.app import artifact_cache
+
+    cache = ArtifactCache(tmp_path)
+    held = []
+    real_replace = artifact_cache.os.replace
+
+    def replace(src, dst):
+        if str(dst).endswith(".joblib"):
+            with open(cache.lock_path, "a+") as probe:  # a second replica's view of the lock
+                try:
+                    fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    held.append(True)
+                else:
+                    fcntl.flock(probe, fcntl.LOCK_UN)
+                    held.append(False)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(artifact_cache.os, "replace", replace)
+    cache.put("fraud-detector", "1", PayloadModel(b"a"))
+
+    assert held == [True]
+    assert cache.get("fraud-detector", "1").payload == b"a"
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from services.serving.app.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_one_batch():
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=20, name="test")
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    await batcher.close()
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_size():
+    sizes = []
+
+    async def handler(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(handler, max_batch_size=3, max_wait_ms=20, name="test")
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+    await batcher.close()
+
+    assert results == list(range(7))
+    assert sizes == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_reach_every_caller():
+    async def handler(items):
+        raise RuntimeError("model down")
+
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=5, name="test")
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    await batcher.close()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_size_one_bypasses_queue():
+    calls = []
+
+    async def handler(items):
+        calls.append(items)
+        return ["ok"]
+
+    batcher = MicroBatcher(handler, max_batch_size=1, name="test")
+    assert await batcher.submit("x") == "ok"
+    assert calls == [["x"]]
@@ -62,6 +62,9 @@ async def test_shadow_invoker_runs_prediction(simple_event):
 
     invoker = ShadowInvoker(StubModel())
     await invoker.submit(simple_event.model_dump())
+    assert calls == []
+    await invoker.drain()
+    await invoker.close()
     assert len(calls) == 1
     assert calls[0][0]["transaction_amount"] == pytest.approx(10.0)
 
@@ -72,7 +75,9 @@ def test_feature_service_fetches(monkeypatch, simple_event):
     monkeypatch.setattr(
         feature_client,
         "FeatureStore",
-        lambda repo_path: DummyStore({"transaction_amount": [0.25], "label": [0]}),
+        lambda repo_path: DummyStore(
+            {"transaction_amount": [10.0], "label": [0], "amount_zscore_1h": [0.25]}
+        ),
     )
     svc = FeatureService()
     features = svc.fetch(simple_event)
@@ -92,5 +97,5 @@ def test_feature_service_fallback(monkeypatch, simple_event):
     )
     svc = FeatureService()
     features = svc.fetch(simple_event)
-    assert features.amount_zscore == pytest.approx(simple_event.transaction_amount)
+    assert features.amount_zscore is None
     assert features.transaction_amount == simple_event.transaction_amount
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+
+from services.common.data import SyntheticEventGenerator
+from services.model_training.train import build_pipeline
+from services.serving.app.model_loader import (
+    CompiledScorer,
+    SklearnScorer,
+    UnsupportedPipelineError,
+    build_scorer,
+    compile_pipeline,
+)
+
+
+@pytest.fixture(scope="module")
+def fitted_pipeline():
+    generator = SyntheticEventGenerator(seed=7)
+    frame = pd.DataFrame([event.model_dump() for event in generator.stream(batch_size=400)])
+    frame.loc[frame.index[:40], "label"] = 1
+    pipeline = build_pipeline()
+    pipeline.fit(frame[["transaction_amount", "country", "device", "event_ts"]], frame["label"])
+    return pipeline, frame
+
+
+def test_compiled_scorer_matches_predict_proba(fitted_pipeline):
+    pipeline, frame = fitted_pipeline
+    rows = frame[["transaction_amount", "country", "device", "event_ts"]].to_dict("records")
+    rows.append({"transaction_amount": 12.5, "country": "JP", "device": "tv", "event_ts": None})
+
+    scorer = compile_pipeline(pipeline)
+    expected = pipeline.predict_proba(pd.DataFrame(rows))[:, 1]
+
+    np.testing.assert_allclose(scorer.score_rows(rows), expected, rtol=0, atol=1e-9)
+
+
+def test_build_scorer_falls_back_for_unsupported_pipeline(fitted_pipeline):
+    pipeline, _ = fitted_pipeline
+    wrapped = Pipeline(steps=[("impute", SimpleImputer()), *pipeline.steps])
+
+    with pytest.raises(UnsupportedPipelineError):
+        compile_pipeline(wrapped)
+    assert isinstance(build_scorer(wrapped), SklearnScorer)
+    assert isinstance(build_scorer(pipeline), CompiledScorer)
+    assert isinstance(build_scorer(pipeline, compiled=False), SklearnScorer)
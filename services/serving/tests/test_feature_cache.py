@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from services.common.pubsub import FEATURE_UPDATES_CHANNEL, LocalPubSub
+from services.common.schemas import Event
+from services.serving.app.feature_cache import FeatureCache
+from services.serving.app.feature_client import FeatureService, InMemoryOnlineStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_expires_entries_after_ttl():
+    clock = FakeClock()
+    cache = FeatureCache(max_entries=10, ttl_seconds=5.0, clock=clock)
+    cache.put("user-1", {"transaction_amount": 1.0})
+
+    clock.now = 4.0
+    assert cache.get("user-1") == {"transaction_amount": 1.0}
+    clock.now = 6.0
+    assert cache.get("user-1") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FeatureCache(max_entries=2, ttl_seconds=60.0, clock=FakeClock())
+    cache.put("user-1", {"v": 1})
+    cache.put("user-2", {"v": 2})
+    cache.get("user-1")
+    cache.put("user-3", {"v": 3})
+
+    assert cache.get("user-2") is None
+    assert cache.get("user-1") == {"v": 1}
+    assert cache.get("user-3") == {"v": 3}
+
+
+def test_invalidation_drops_entry_and_rejects_stale_fetches():
+    clock = FakeClock()
+    bus = LocalPubSub()
+    cache = FeatureCache(max_entries=10, ttl_seconds=60.0, clock=clock)
+    cache.attach(bus)
+    cache.put("user-1", {"v": 1})
+
+    clock.now = 1.0
+    assert bus.publish(FEATURE_UPDATES_CHANNEL, "user-1") == 1
+    assert cache.get("user-1") is None
+    assert cache.put("user-1", {"v": "stale"}, fetched_at=0.5) is False
+    assert cache.put("user-1", {"v": 2}, fetched_at=1.5) is True
+
+
+@pytest.mark.asyncio
+async def test_feature_service_serves_repeat_lookups_from_cache():
+    store = InMemoryOnlineStore({"user-1": {"amount_zscore_1h": 3.0, "label": 0}})
+    cache = FeatureCache(max_entries=10, ttl_seconds=60.0)
+    svc = FeatureService(store=store, cache=cache)
+    event = Event(
+        event_id="01HQA7F9G4G1YJ2R4D8K2J3A5S",
+        user_id="user-1",
+        transaction_amount=10.0,
+        country="US",
+        device="ios",
+        event_ts=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+    first = await svc.fetch_async(event)
+    second = await svc.fetch_async(event)
+
+    assert first.amount_zscore == second.amount_zscore == pytest.approx(3.0)
+    assert store.calls == 1
+
+
+class RemoteStore:
+    """Stands in for a store other processes write to, such as Feast on Redis."""
+
+    def get_online_features(self, features, entity_rows):
+        return InMemoryOnlineStore().get_online_features(features, entity_rows)
+
+
+def test_local_bus_in_front_of_a_shared_store_is_flagged(caplog):
+    with caplog.at_level("WARNING", logger="services.serving.app.feature_client"):
+        FeatureService(store=InMemoryOnlineStore())
+        assert "FEATURE_UPDATE_BUS" not in caplog.text
+
+        FeatureService(store=RemoteStore())
+        assert "FEATURE_UPDATE_BUS=local" in caplog.text
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from services.common.schemas import Event
+from services.serving.app.feature_client import FeatureService, InMemoryOnlineStore
+
+
+def _event(user_id: str, amount: float = 10.0) -> Event:
+    return Event(
+        event_id="01HQA7F9G4G1YJ2R4D8K2J3A5S",
+        user_id=user_id,
+        transaction_amount=amount,
+        country="US",
+        device="ios",
+        event_ts=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+class RecordingStore(InMemoryOnlineStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.entity_batches = []
+
+    def get_online_features(self, features, entity_rows):
+        self.entity_batches.append([row["user_id"] for row in entity_rows])
+        return super().get_online_features(features, entity_rows)
+
+
+@pytest.mark.asyncio
+async def test_fetch_async_merges_concurrent_lookups():
+    store = RecordingStore(
+        {f"user-{idx}": {"amount_zscore_1h": float(idx), "label": 0} for idx in range(4)},
+        latency_ms=5,
+    )
+    svc = FeatureService(store=store)
+
+    vectors = await asyncio.gather(*(svc.fetch_async(_event(f"user-{idx}")) for idx in range(4)))
+
+    assert [vector.amount_zscore for vector in vectors] == [0.0, 1.0, 2.0, 3.0]
+    assert store.entity_batches == [["user-0", "user-1", "user-2", "user-3"]]
+
+
+@pytest.mark.asyncio
+async def test_fetch_async_collapses_duplicate_user_lookups():
+    store = RecordingStore({"user-1": {"amount_zscore_1h": 0.5, "label": 1}}, latency_ms=5)
+    svc = FeatureService(store=store)
+
+    vectors = await asyncio.gather(*(svc.fetch_async(_event("user-1")) for _ in range(3)))
+
+    assert {vector.amount_zscore for vector in vectors} == {0.5}
+    assert store.entity_batches == [["user-1"]]
+
+
+@pytest.mark.asyncio
+async def test_fetch_async_leaves_zscore_unset_without_aggregates():
+    class BrokenStore:
+        def get_online_features(self, *args, **kwargs):
+            raise RuntimeError("redis down")
+
+    svc = FeatureService(store=BrokenStore())
+    missing = FeatureService(store=InMemoryOnlineStore())
+
+    broken_vector = await svc.fetch_async(_event("user-9", amount=42.0))
+    missing_vector = await missing.fetch_async(_event("user-9", amount=42.0))
+
+    assert broken_vector.amount_zscore is None
+    assert missing_vector.amount_zscore is None
+    assert broken_vector.transaction_amount == pytest.approx(42.0)
@@ -0,0 +1,131 @@
+import numpy as np
+import pyarrow as pa
+
+from services.feature_service.feast_repo.snapshot import write_snapshot
+from services.serving.app.feature_client import FeatureService, InMemoryOnlineStore
+from services.serving.app.feature_snapshot import FeatureSnapshot
+from services.serving.tests.test_feature_cache import FakeClock
+
+
+def _table(users, amounts, labels=None):
+    return pa.table(
+        {
+            "user_id": users,
+            "transaction_amount": pa.array(amounts, pa.float64()),
+            "label": pa.array(labels or [0] * len(users), pa.int64()),
+        }
+    )
+
+
+def test_lookups_binary_search_the_mapped_file(tmp_path):
+    path = write_snapshot(
+        _table(["u-10", "u-2", "u-1", "ü-3"], [10.0, 2.0, 1.0, 3.0], [1, None, 0, 0]),
+        tmp_path / "features.arrow",
+        metadata={"feature_view": "transaction_features"},
+    )
+    snapshot = FeatureSnapshot(path)
+
+    assert len(snapshot) == 4
+    assert snapshot.features == {"transaction_amount", "label"}
+    assert snapshot.metadata == {"feature_view": "transaction_features"}
+    assert snapshot.get("u-10") == {"transaction_amount": 10.0, "label": 1}
+    assert snapshot.get("u-2") == {"transaction_amount": 2.0, "label": None}
+    assert snapshot.get("ü-3") == {"transaction_amount": 3.0, "label": 0}
+    assert snapshot.get("u-0") is None
+    assert snapshot.get("u-100") is None  # longer than every key, must not match "u-10"
+    assert snapshot.get_many(["u-1", "missing", "u-10", "u-100", "u-1"]) == [
+        {"transaction_amount": 1.0, "label": 0},
+        None,
+        {"transaction_amount": 10.0, "label": 1},
+        None,
+        {"transaction_amount": 1.0, "label": 0},
+    ]
+    assert (snapshot.hits, snapshot.misses) == (6, 4)
+    # Columns are views of the mapping, not copies.
+    assert not snapshot._mapped.keys.flags.owndata
+    assert snapshot._mapped.columns["transaction_amount"].values.readonly
+
+
+def test_swapped_file_is_remapped_after_the_check_interval(tmp_path):
+    path = tmp_path / "features.arrow"
+    clock = FakeClock()
+    snapshot = FeatureSnapshot(path, check_interval_s=5.0, clock=clock)
+    assert snapshot.get("u-1") is None  # nothing exported yet
+
+    write_snapshot(_table(["u-1"], [1.0]), path)
+    clock.now = 5.0
+    assert snapshot.get("u-1") == {"transaction_amount": 1.0, "label": 0}
+    old = snapshot._mapped
+
+    write_snapshot(_table(["u-1", "u-2"], [11.0, 2.0]), path)
+    clock.now = 6.0
+    assert snapshot.get("u-2") is None  # not re-checked yet
+    clock.now = 10.0
+    assert snapshot.get("u-2") == {"transaction_amount": 2.0, "label": 0}
+    assert snapshot.get("u-1")["transaction_amount"] == 11.0
+    # A reader still holding the replaced mapping keeps seeing its rows.
+    assert old.row(int(old.keys.searchsorted(b"u-1"))) == {"transaction_amount": 1.0, "label": 0}
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_empty_snapshot_misses_everything(tmp_path):
+    snapshot = FeatureSnapshot(write_snapshot(_table([], []), tmp_path / "features.arrow"))
+
+    assert len(snapshot) == 0
+    assert snapshot.get("u-1") is None
+    assert snapshot.get_many(["u-1"]) == [None]
+
+
+class RecordingStore(InMemoryOnlineStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+
+    def get_online_features(self, features, entity_rows):
+        self.requests.append((list(features), [row["user_id"] for row in entity_rows]))
+        return super().get_online_features(features, entity_rows)
+
+
+def test_feature_service_reads_the_snapshot_and_falls_back_for_misses(tmp_path):
+    path = write_snapshot(_table(["u-1", "u-2"], [1.0, 2.0]), tmp_path / "features.arrow")
+    store = RecordingStore(
+        {
+            "u-1": {"transaction_amount": 9.0, "amount_zscore_1h": 0.5},
+            "u-3": {"transaction_amount": 3.0, "label": 1, "amount_zscore_1h": 1.5},
+        }
+    )
+    svc = FeatureService(store=store, snapshot=FeatureSnapshot(path))
+
+    rows = svc._lookup_rows(["u-1", "u-2"])
+
+    assert store.requests == [(["transaction_aggregates:amount_zscore_1h"], ["u-1", "u-2"])]
+    assert rows == [
+        {"transaction_amount": 1.0, "label": 0, "amount_zscore_1h": 0.5},
+        {"transaction_amount": 2.0, "label": 0, "amount_zscore_1h": None},
+    ]
+
+    store.requests.clear()
+    rows = svc._lookup_rows(["u-3", "u-1"])
+
+    assert [features for features, _ in store.requests] == [
+        [
+            "transaction_features:transaction_amount",
+            "transaction_features:label",
+            "transaction_aggregates:amount_zscore_1h",
+        ]
+    ]
+    assert rows[0] == {"transaction_amount": 3.0, "label": 1, "amount_zscore_1h": 1.5}
+    assert rows[1]["transaction_amount"] == 1.0  # the snapshot wins for the features it holds
+
+
+def test_feature_service_skips_the_store_when_the_snapshot_covers_everything(tmp_path):
+    table = _table(["u-1"], [1.0]).append_column("amount_zscore_1h", pa.array([np.float32(0.25)]))
+    store = RecordingStore()
+    svc = FeatureService(
+        store=store, snapshot=FeatureSnapshot(write_snapshot(table, tmp_path / "f.arrow"))
+    )
+
+    assert svc._lookup_rows(["u-1"]) == [
+        {"transaction_amount": 1.0, "label": 0, "amount_zscore_1h": 0.25}
+    ]
+    assert store.requests == []
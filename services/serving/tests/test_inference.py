@@ -1,20 +1,32 @@
-from services.common.schemas import InferenceRequest, InferenceResponse
+import asyncio
+import json
+import time
 
+import pytest
+from fastapi.testclient import TestClient
 
-def test_inference_request_schema():
-    payload = {
+from services.common.schemas import FeatureVector, InferenceRequest, InferenceResponse
+from services.serving.app.metrics import MULTIPROCESS_MODE
+from services.serving.app.model_manager import ModelManager
+from services.serving.app.registry import FileModelRegistry
+from services.serving.app.stages import STAGE_LATENCY, StageTimer
+
+PAYLOAD = {
+    "user_id": "user-1",
+    "event": {
+        "event_id": "01HQA7F9G4G1YJ2R4D8K2J3A5S",
         "user_id": "user-1",
-        "event": {
-            "event_id": "01HQA7F9G4G1YJ2R4D8K2J3A5S",
-            "user_id": "user-1",
-            "transaction_amount": 12.3,
-            "country": "US",
-            "device": "ios",
-            "event_ts": "2024-02-01T00:00:00Z",
-            "label": 0,
-        },
-    }
-    req = InferenceRequest(**payload)
+        "transaction_amount": 12.3,
+        "country": "US",
+        "device": "ios",
+        "event_ts": "2024-02-01T00:00:00Z",
+        "label": 0,
+    },
+}
+
+
+def test_inference_request_schema():
+    req = InferenceRequest(**PAYLOAD)
     assert req.user_id == "user-1"
 
 
@@ -27,3 +39,86 @@ def test_inference_response_schema():
         canary_variant="baseline",
     )
     assert resp.score == 0.42
+
+
+class StubFeatureService:
+    async def fetch_async(self, event):
+        return FeatureVector(
+            user_id=event.user_id,
+            transaction_amount=event.transaction_amount,
+            amount_zscore=0.0,
+            event_ts=event.event_ts,
+        )
+
+
+class ConstantModel:
+    def predict_proba(self, frame):
+        return [[0.7, 0.3]] * len(frame)
+
+
+def _stage_exemplars(stage):
+    return [
+        sample.exemplar.labels["trace_id"]
+        for metric in STAGE_LATENCY.collect()
+        for sample in metric.samples
+        if sample.exemplar is not None and sample.labels.get("stage") == stage
+    ]
+
+
+class SlowModel(ConstantModel):
+    def predict_proba(self, frame):
+        time.sleep(0.2)
+        return super().predict_proba(frame)
+
+
+def _service(monkeypatch, tmp_path, model):
+    monkeypatch.setenv("ENABLE_RAY_SERVE", "0")  # the module may be imported here first
+    from services.serving.app import inference
+
+    registry = FileModelRegistry(tmp_path)
+    registry.register("fraud-detector", "3", model)
+    registry.set_alias("fraud-detector", "Production", "3")
+    models = ModelManager(
+        registry, "fraud-detector", "Production", poll_interval_s=0, warmup_requests=0
+    )
+    models.load_initial()
+    monkeypatch.setattr(inference, "FeatureService", StubFeatureService)
+    monkeypatch.setattr(inference, "configure_mlflow_env", lambda settings: None)
+    monkeypatch.setattr(inference.mlflow, "set_tracking_uri", lambda uri: None)
+    return inference, inference.InferenceService(models)
+
+
+@pytest.mark.skipif(MULTIPROCESS_MODE, reason="multiprocess metrics cannot carry exemplars")
+def test_predict_through_the_app_is_traced_and_times_every_stage(monkeypatch, tmp_path):
+    inference, service = _service(monkeypatch, tmp_path, ConstantModel())
+    monkeypatch.setattr(StageTimer, "exemplar_threshold_s", 0.0)
+    monkeypatch.setattr(inference, "_service_provider", lambda: service)
+
+    with TestClient(inference.app) as client:
+        response = client.post("/predict", content=json.dumps(PAYLOAD))
+
+    assert response.status_code == 200
+    trace_id = response.json()["trace_id"]
+    assert trace_id and int(trace_id, 16)
+    for stage in ("parse", "feature_fetch", "score", "serialize"):
+        assert trace_id in _stage_exemplars(stage)
+
+
+@pytest.mark.asyncio
+async def test_batch_scoring_leaves_the_event_loop_free(monkeypatch, tmp_path):
+    _, service = _service(monkeypatch, tmp_path, SlowModel())
+    row = {"transaction_amount": 12.3, "country": "US", "device": "ios", "event_ts": None}
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    [(score, version)] = await service._score_batch("baseline", [row])
+    ticker.cancel()
+
+    assert (score, version) == (pytest.approx(0.3), "3")
+    assert ticks >= 5  # a 200ms score on the loop would have allowed none
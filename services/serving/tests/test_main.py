@@ -0,0 +1,36 @@
+import os
+import shutil
+
+from services.serving.app import main
+
+
+def test_multiprocess_dir_set_by_the_operator_is_left_alone(tmp_path, monkeypatch):
+    path = tmp_path / "metrics"
+    path.mkdir()
+    (path / "counter_1.db").write_bytes(b"")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(path))
+
+    assert main._prepare_multiprocess_dir() is None
+    assert (path / "counter_1.db").exists()
+
+
+def test_multiprocess_dir_is_created_when_unset(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    created = main._prepare_multiprocess_dir()
+
+    try:
+        assert created is not None and os.path.isdir(created)
+        assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == created
+    finally:
+        shutil.rmtree(created, ignore_errors=True)
+
+
+def test_workers_that_crash_on_start_are_restarted_with_growing_delays():
+    delays = [0.0]
+    for _ in range(8):
+        delays.append(main._restart_delay(0.1, delays[-1]))
+
+    assert delays[1:5] == [0.5, 1.0, 2.0, 4.0]
+    assert delays[-1] == main.RESTART_BACKOFF_MAX_S
+    assert main._restart_delay(main.RESTART_MIN_UPTIME_S, delays[-1]) == 0.0
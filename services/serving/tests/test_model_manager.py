@@ -0,0 +1,69 @@
+import pytest
+
+from services.serving.app.model_loader import ModelLoadError
+from services.serving.app.model_manager import ModelManager
+from services.serving.app.registry import FileModelRegistry
+
+
+class ConstantModel:
+    def __init__(self, score: float) -> None:
+        self.score = score
+
+    def predict_proba(self, frame):
+        return [[1 - self.score, self.score]] * len(frame)
+
+
+class CountingModel(ConstantModel):
+    calls: list[int] = []
+
+    def predict_proba(self, frame):
+        CountingModel.calls.append(len(frame))
+        return super().predict_proba(frame)
+
+
+ROW = {"transaction_amount": 10.0, "country": "US", "device": "ios", "event_ts": None}
+
+
+@pytest.fixture()
+def registry(tmp_path):
+    registry = FileModelRegistry(tmp_path)
+    registry.register("fraud-detector", "1", ConstantModel(0.1))
+    registry.set_alias("fraud-detector", "Staging", "1")
+    return registry
+
+
+def test_manager_swaps_when_alias_moves(registry):
+    manager = ModelManager(registry, "fraud-detector", "Staging", warmup_requests=4)
+    before = manager.load_initial()
+    assert before.version == "1"
+    assert manager.poll_once() is False
+
+    registry.register("fraud-detector", "2", ConstantModel(0.9))
+    registry.set_alias("fraud-detector", "Staging", "2")
+
+    assert manager.poll_once() is True
+    assert manager.current.version == "2"
+    assert manager.current.scorer.score_rows([ROW])[0] == pytest.approx(0.9)
+    # A request that grabbed the old reference still finishes on it.
+    assert before.scorer.score_rows([ROW])[0] == pytest.approx(0.1)
+
+
+def test_manager_keeps_serving_when_new_version_fails_to_load(registry):
+    manager = ModelManager(registry, "fraud-detector", "Staging", warmup_requests=0)
+    manager.load_initial()
+    registry.set_alias("fraud-detector", "Staging", "3")
+
+    with pytest.raises(ModelLoadError):
+        manager.poll_once()
+    assert manager.current.version == "1"
+
+
+def test_manager_warms_new_model_before_swap(registry):
+    CountingModel.calls.clear()
+    registry.register("fraud-detector", "2", CountingModel(0.5))
+    registry.set_alias("fraud-detector", "Staging", "2")
+    manager = ModelManager(registry, "fraud-detector", "Staging", warmup_requests=3)
+
+    manager.load_initial()
+
+    assert CountingModel.calls == [1, 1, 1, 3]
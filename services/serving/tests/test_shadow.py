@@ -1,22 +1,102 @@
+import asyncio
+
 import pandas as pd
+import pytest
 
+from services.serving.app.model_manager import ModelManager
+from services.serving.app.registry import FileModelRegistry
 from services.serving.app.shadow import ShadowInvoker
 
 
 class DummyModel:
     def __init__(self) -> None:
         self.calls = 0
+        self.batch_sizes: list[int] = []
 
     def predict_proba(self, frame: pd.DataFrame):  # type: ignore[override]
         self.calls += 1
-        return [[0.4, 0.6]]
+        self.batch_sizes.append(len(frame))
+        return [[0.4, 0.6]] * len(frame)
+
+
+PAYLOAD = {"transaction_amount": 10, "country": "US", "device": "ios", "event_ts": "2024-01-01"}
 
 
 def test_shadow_invoker_executes(monkeypatch):
     model = DummyModel()
     invoker = ShadowInvoker(model)
-    frame = {"transaction_amount": 10, "country": "US", "device": "ios", "event_ts": "2024-01-01"}
-    import asyncio
 
-    asyncio.run(invoker.submit(frame))
+    async def scenario():
+        await invoker.submit(PAYLOAD, baseline_score=0.2)
+        await invoker.drain()
+        await invoker.close()
+
+    asyncio.run(scenario())
     assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_shadow_invoker_scores_queued_payloads_in_batches():
+    model = DummyModel()
+    invoker = ShadowInvoker(model, max_queue=100, batch_size=8)
+
+    for idx in range(20):
+        await invoker.submit({**PAYLOAD, "transaction_amount": idx})
+    await invoker.drain()
+    await invoker.close()
+
+    assert model.batch_sizes == [8, 8, 4]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [("drop_oldest", [2.0, 3.0]), ("drop_new", [0.0, 1.0])],
+)
+async def test_shadow_invoker_drop_policies(policy, expected):
+    seen: list[float] = []
+
+    class RecordingModel(DummyModel):
+        def predict_proba(self, frame):
+            seen.extend(frame["transaction_amount"].tolist())
+            return super().predict_proba(frame)
+
+    invoker = ShadowInvoker(RecordingModel(), max_queue=2, batch_size=8, drop_policy=policy)
+    for idx in range(4):
+        await invoker.submit({**PAYLOAD, "transaction_amount": float(idx)})
+    await invoker.drain()
+    await invoker.close()
+
+    assert seen == expected
+
+
+class VersionedModel:
+    scored: list[str] = []  # class-level: the registry hands back copies
+
+    def __init__(self, version: str) -> None:
+        self.version = version
+
+    def predict_proba(self, frame: pd.DataFrame):
+        VersionedModel.scored.append(self.version)
+        return [[0.4, 0.6]] * len(frame)
+
+
+@pytest.mark.asyncio
+async def test_shadow_invoker_follows_the_managers_hot_swaps(tmp_path):
+    registry = FileModelRegistry(tmp_path)
+    registry.register("fraud-detector", "1", VersionedModel("1"))
+    registry.set_alias("fraud-detector", "Staging", "1")
+    manager = ModelManager(registry, "fraud-detector", "Staging", warmup_requests=0)
+    manager.load_initial()
+    invoker = ShadowInvoker(manager)
+
+    await invoker.submit(PAYLOAD, baseline_score=0.2)
+    await invoker.drain()
+    registry.register("fraud-detector", "2", VersionedModel("2"))
+    registry.set_alias("fraud-detector", "Staging", "2")
+    assert manager.poll_once() is True
+    await invoker.submit(PAYLOAD, baseline_score=0.2)
+    await invoker.drain()
+    await invoker.close()
+
+    assert VersionedModel.scored == ["1", "2"]
@@ -0,0 +1,48 @@
+import pytest
+from opentelemetry import trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext
+from prometheus_client import REGISTRY
+
+from services.serving.app.metrics import MULTIPROCESS_MODE
+from services.serving.app.stages import STAGE_LATENCY, StageTimer
+
+
+def _count(stage: str, variant: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "serving_app_stage_latency_seconds_count",
+            {"stage": stage, "model_variant": variant},
+        )
+        or 0.0
+    )
+
+
+def test_flush_records_each_marked_stage_under_the_variant():
+    before = {stage: _count(stage, "canary") for stage in ("parse", "score")}
+    timer = StageTimer()
+    timer.mark("parse")
+    timer.mark("score")
+    timer.flush("canary")
+    timer.flush("canary")  # durations are consumed by the first flush
+
+    for stage, count in before.items():
+        assert _count(stage, "canary") == count + 1
+
+
+@pytest.mark.skipif(MULTIPROCESS_MODE, reason="multiprocess metrics cannot carry exemplars")
+def test_slow_stages_carry_trace_exemplar(monkeypatch):
+    monkeypatch.setattr(StageTimer, "exemplar_threshold_s", 0.0)
+    context = SpanContext(trace_id=0xABC, span_id=0x1, is_remote=False)
+    timer = StageTimer()
+    with trace.use_span(NonRecordingSpan(context)):
+        timer.mark("serialize")
+        timer.flush("baseline")
+
+    exemplars = [
+        sample.exemplar
+        for metric in STAGE_LATENCY.collect()
+        for sample in metric.samples
+        if sample.exemplar is not None and sample.labels.get("stage") == "serialize"
+    ]
+    assert exemplars
+    assert {"trace_id": format(0xABC, "032x")} in [exemplar.labels for exemplar in exemplars]
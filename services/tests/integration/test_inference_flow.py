@@ -4,13 +4,14 @@ import pytest
 
 from services.common.data import SyntheticEventGenerator
 from services.common.schemas import FeatureVector, InferenceRequest
+from services.serving.app.artifact_cache import ArtifactCache
 from services.serving.app.canary import CanaryDecision
 from services.serving.app.metrics import REQUEST_COUNTER
 
 
 @pytest.mark.integration
 @pytest.mark.asyncio
-async def test_inference_pipeline(monkeypatch):
+async def test_inference_pipeline(monkeypatch, tmp_path):
     from types import SimpleNamespace
 
     from ray import serve as ray_serve
@@ -44,6 +45,9 @@ async def test_inference_pipeline(monkeypatch):
                 event_ts=_event.event_ts,
             )
 
+        async def fetch_async(self, _event):
+            return self.fetch(_event)
+
     class StubModel:
         def predict_proba(self, frame):
             return [[0.6, 0.4]]
@@ -52,7 +56,7 @@ async def test_inference_pipeline(monkeypatch):
         def __init__(self, _model):
             self.model = _model
 
-        async def submit(self, payload):
+        async def submit(self, payload, baseline_score=None):
             shadow_calls.append(payload)
 
     class StubCanary:
@@ -62,8 +66,18 @@ async def test_inference_pipeline(monkeypatch):
     monkeypatch.setattr(inference, "FeatureService", lambda: StubFeatureService())
     monkeypatch.setattr(inference, "ShadowInvoker", lambda model: StubShadow(model))
     monkeypatch.setattr(inference, "CanaryStrategy", StubCanary)
-    monkeypatch.setattr(inference, "load_model", lambda _: StubModel())
-    monkeypatch.setattr("services.serving.app.model_loader.load_model", lambda _: StubModel())
+
+    class StubRegistry:
+        def resolve(self, name, alias):
+            return "7"
+
+        def load(self, name, version):
+            return StubModel()
+
+    monkeypatch.setattr(inference, "build_registry", lambda _settings: StubRegistry())
+    monkeypatch.setattr(
+        inference, "ArtifactCache", lambda _root, max_bytes: ArtifactCache(tmp_path, max_bytes)
+    )
 
     REQUEST_COUNTER.clear()
     deployment_cls = inference.InferenceDeployment.func_or_class
@@ -73,6 +87,7 @@ async def test_inference_pipeline(monkeypatch):
 
     assert response.user_id == request.user_id
     assert response.canary_variant == "baseline"
+    assert response.model_version == "7"
     assert 0.0 <= response.score <= 1.0
 
     samples = REQUEST_COUNTER.collect()[0].samples